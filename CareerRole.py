@@ -4,15 +4,17 @@ import json
 from dotenv import load_dotenv
 from typing import TypedDict, Dict, List, Optional
 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
-from langgraph.graph import StateGraph, END
+from llm_clients import get_chat_model
+from model_router import route
+from prompt_budget import to_prompt_json
+import deadline
 
 # --- Load environment variables ---
 load_dotenv()
 
-# --- Initialize model ---
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.4)
+# --- Model (built on first use) ---
+def get_llm():
+    return get_chat_model(route("CareerRole"), temperature=0.4)
 
 # --- Shared graph state ---
 class State(TypedDict):
@@ -22,6 +24,8 @@ class State(TypedDict):
 
 # --- Main agent ---
 def career_role_suggester(state: State):
+    from langchain_core.prompts import ChatPromptTemplate
+
     prompt = ChatPromptTemplate.from_template("""
     You are an AI career advisor.
 
@@ -52,9 +56,9 @@ def career_role_suggester(state: State):
     ]
     """)
 
-    response = llm.invoke(prompt.format(
-        job_analysis=json.dumps(state["job_analysis"], ensure_ascii=False),
-        user_profile=json.dumps(state["user_profile"], ensure_ascii=False)
+    response = get_llm().invoke(prompt.format(
+        job_analysis=to_prompt_json(state["job_analysis"], max_items=8, max_chars=400),
+        user_profile=to_prompt_json(state["user_profile"], max_items=15)
     ))
 
     # Parse JSON from response content
@@ -82,17 +86,43 @@ def career_role_suggester(state: State):
     
     return state
 
-# --- Build LangGraph ---
-graph = StateGraph(State)
-graph.add_node("CareerRoleSuggester", career_role_suggester)
-graph.set_entry_point("CareerRoleSuggester")
-graph.add_edge("CareerRoleSuggester", END)
-career_graph = graph.compile()
+# --- Build LangGraph (compiled on first use) ---
+_career_graph = None
+
+def get_workflow():
+    global _career_graph
+    if _career_graph is None:
+        from langgraph.graph import StateGraph, END
+        from instrumentation import instrument
+
+        graph = StateGraph(State)
+        graph.add_node("CareerRoleSuggester", career_role_suggester)
+        graph.set_entry_point("CareerRoleSuggester")
+        graph.add_edge("CareerRoleSuggester", END)
+        _career_graph = instrument(graph.compile(), "CareerRole")
+    return _career_graph
+
+def __getattr__(name):
+    # Keep `CareerRole.career_graph` / `CareerRole.llm` working without import-time setup
+    if name == "career_graph":
+        return get_workflow()
+    if name == "llm":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# --- Runner ---
+def run_career_roles(job_analysis: Dict, user_profile: Dict, budget: Optional[float] = None) -> Dict:
+    """Suggest career roles for a profile and return the JSON-ready output (budget: seconds)."""
+    state = {"user_profile": user_profile, "job_analysis": job_analysis}
+    with deadline.within(budget):
+        result = get_workflow().invoke(state)
+    return {"suggested_roles": result.get("suggested_roles", [])}
 
 # --- Main execution ---
 if __name__ == "__main__":
-    # CLI usage: python CareerRole.py <job_analysis_json> <user_profile_json>
+    # CLI usage: python CareerRole.py <job_analysis_json> <user_profile_json> [--budget SECONDS]
     # Both arguments are JSON strings
+    budget = deadline.budget_from_argv(sys.argv)
     if len(sys.argv) < 3:
         print(json.dumps({"error": "Usage: python CareerRole.py <job_analysis_json> <user_profile_json>"}), file=sys.stderr)
         sys.exit(1)
@@ -104,10 +134,6 @@ if __name__ == "__main__":
         print(json.dumps({"error": f"Invalid JSON input: {e}"}), file=sys.stderr)
         sys.exit(1)
     
-    # Run the graph
-    state = {"user_profile": user_profile, "job_analysis": job_analysis}
-    result = career_graph.invoke(state)
-    
-    # Output clean JSON to stdout (logs go to stderr)
-    output = {"suggested_roles": result.get("suggested_roles", [])}
+    # Run the graph and output clean JSON to stdout (logs go to stderr)
+    output = run_career_roles(job_analysis, user_profile, budget=budget)
     print(json.dumps(output, ensure_ascii=False))
\ No newline at end of file
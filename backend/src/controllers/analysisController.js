@@ -1,37 +1,12 @@
 import path from "path";
 import { fileURLToPath } from "url";
-import { spawn } from "child_process";
 import fs from "fs";
 import Analysis from "../models/analysisModel.js";
+import { runAgent } from "../lib/pythonWorker.js";
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
 
-const runPython = (scriptPath, args = []) => {
-  return new Promise((resolve, reject) => {
-    const py = spawn("python", [scriptPath, ...args], {
-      shell: false,
-      cwd: path.dirname(scriptPath),
-    });
-    let stdout = "";
-    let stderr = "";
-    py.stdout.on("data", (d) => (stdout += d.toString()));
-    py.stderr.on("data", (d) => (stderr += d.toString()));
-    py.on("close", (code) => {
-      if (code !== 0) {
-        return reject(new Error(`Python exited with code ${code}: ${stderr}`));
-      }
-      try {
-        const parsed = JSON.parse(stdout.trim());
-        resolve(parsed);
-      } catch (err) {
-        // If not JSON, return raw text
-        resolve({ output: stdout.trim() });
-      }
-    });
-  });
-};
-
 export const runPersonalityReview = async (req, res) => {
   try {
     const userId = req.user._id;
@@ -40,11 +15,7 @@ export const runPersonalityReview = async (req, res) => {
       return res.status(400).json({ message: "riasecCode is required" });
     }
 
-    const backendDir = path.resolve(__dirname, "../../");
-    const repoRoot = path.resolve(backendDir, "..");
-    const script = path.resolve(repoRoot, "personality.py");
-
-    const result = await runPython(script, [riasecCode]);
+    const result = await runAgent("personality", { riasec_code: riasecCode });
 
     const analysisDoc = await Analysis.findOneAndUpdate(
       { userId },
@@ -61,10 +32,7 @@ export const runPersonalityReview = async (req, res) => {
 
 export const getPersonalityInstructions = async (req, res) => {
   try {
-    const backendDir = path.resolve(__dirname, "../../");
-    const repoRoot = path.resolve(backendDir, "..");
-    const script = path.resolve(repoRoot, "personality.py");
-    const out = await runPython(script, ["--instructions"]);
+    const out = await runAgent("personality_instructions");
     return res.status(200).json(out);
   } catch (error) {
     console.error("getPersonalityInstructions error:", error);
@@ -81,9 +49,7 @@ export const uploadAndAnalyze = async (req, res) => {
 
     // Proceed to run scripts and then upsert results into a single per-user document
 
-    // Resolve Python script absolute paths (repo root has python files)
     const backendDir = path.resolve(__dirname, "../../");
-    const repoRoot = path.resolve(backendDir, "..");
     const uploadsRoot = path.resolve(backendDir, "uploads");
     const username = (req.user?.name || req.user?.email || String(req.user?._id))
       .toLowerCase()
@@ -109,28 +75,28 @@ export const uploadAndAnalyze = async (req, res) => {
       return res.status(400).json({ message: "Resume, Transcript, Certificate, and GitHub URL are required" });
     }
 
-    if (resumePath) {
-      const script = path.resolve(repoRoot, "resume.py");
-      results.resume = await runPython(script, [resumePath]);
-    }
-    if (transcriptPath) {
-      const script = path.resolve(repoRoot, "transcript.py");
-      results.transcript = await runPython(script, [transcriptPath]);
-    }
-    if (certificatePath) {
-      const script = path.resolve(repoRoot, "certificate.py");
-      results.certificate = await runPython(script, [certificatePath]);
-    }
-    if (githubUrl) {
-      const script = path.resolve(repoRoot, "github.py");
-      results.github = await runPython(script, [githubUrl]);
-    }
+    // One request runs all four analyses concurrently on the resident Python worker
+    Object.assign(results, await runAgent("profile", {
+      resume_path: resumePath,
+      transcript_path: transcriptPath,
+      certificate_path: certificatePath,
+      github_url: githubUrl,
+    }));
 
+    // A failed branch comes back as { error }; keep that section's previous result instead of saving the error
+    const sections = { resume: "resumeResult", transcript: "transcriptResult", certificate: "certificateResult", github: "githubResult" };
     const updates = {};
-    if (results.resume) updates.resumeResult = results.resume;
-    if (results.transcript) updates.transcriptResult = results.transcript;
-    if (results.certificate) updates.certificateResult = results.certificate;
-    if (results.github) updates.githubResult = results.github;
+    const failed = {};
+    for (const [section, field] of Object.entries(sections)) {
+      const result = results[section];
+      if (!result) continue;
+      if (result.error) failed[section] = result.error;
+      else updates[field] = result;
+    }
+    if (Object.keys(failed).length) console.error("Upload/Analyze failed sections:", failed);
+    if (!Object.keys(updates).length) {
+      return res.status(502).json({ message: "Analysis failed", failed });
+    }
 
     const analysisDoc = await Analysis.findOneAndUpdate(
       { userId },
@@ -138,7 +104,7 @@ export const uploadAndAnalyze = async (req, res) => {
       { upsert: true, new: true }
     );
 
-    res.status(200).json({ analysisId: analysisDoc._id, message: "Analysis saved" });
+    res.status(200).json({ analysisId: analysisDoc._id, message: "Analysis saved", failed });
   } catch (error) {
     console.error("Upload/Analyze error:", error);
     res.status(500).json({ message: "Internal Server Error" });
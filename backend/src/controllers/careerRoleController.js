@@ -1,35 +1,6 @@
-import path from "path";
-import { fileURLToPath } from "url";
-import { spawn } from "child_process";
 import IndustryDemand from "../models/industryDemandModel.js";
 import StudentResult from "../models/studentResultModel.js";
-
-const __filename = fileURLToPath(import.meta.url);
-const __dirname = path.dirname(__filename);
-
-const runPythonJson = (scriptPath, args = []) => {
-  return new Promise((resolve, reject) => {
-    const py = spawn("python", [scriptPath, ...args], {
-      shell: false,
-      cwd: path.dirname(scriptPath),
-    });
-    let stdout = "";
-    let stderr = "";
-    py.stdout.on("data", (d) => (stdout += d.toString()));
-    py.stderr.on("data", (d) => (stderr += d.toString()));
-    py.on("close", (code) => {
-      if (code !== 0) {
-        return reject(new Error(`Python exited with code ${code}: ${stderr}`));
-      }
-      try {
-        const parsed = JSON.parse(stdout.trim());
-        resolve(parsed);
-      } catch (err) {
-        reject(new Error(`Failed to parse JSON from Python: ${err.message}. Raw: ${stdout}`));
-      }
-    });
-  });
-};
+import { runAgent } from "../lib/pythonWorker.js";
 
 export const getCareerRoles = async (req, res) => {
   try {
@@ -76,17 +47,8 @@ export const getCareerRoles = async (req, res) => {
       location: industryDemand.location || location,
     };
 
-    // Resolve Python script path
-    const backendDir = path.resolve(__dirname, "../../");
-    const repoRoot = path.resolve(backendDir, "..");
-    const script = path.resolve(repoRoot, "CareerRole.py");
-
-    // Convert to JSON strings for command line arguments
-    const jobAnalysisJson = JSON.stringify(jobAnalysis);
-    const userProfileJson = JSON.stringify(userProfile);
-
-    // Run CareerRole.py
-    const result = await runPythonJson(script, [jobAnalysisJson, userProfileJson]);
+    // Run CareerRole.py on the resident Python worker
+    const result = await runAgent("career_role", { job_analysis: jobAnalysis, user_profile: userProfile });
 
     return res.status(200).json({ 
       message: "Career roles generated successfully",
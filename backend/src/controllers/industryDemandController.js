@@ -1,45 +1,13 @@
-import path from "path";
-import { fileURLToPath } from "url";
-import { spawn } from "child_process";
 import IndustryDemand from "../models/industryDemandModel.js";
-
-const __filename = fileURLToPath(import.meta.url);
-const __dirname = path.dirname(__filename);
-
-const runPythonJson = (scriptPath, args = []) => {
-  return new Promise((resolve, reject) => {
-    const py = spawn("python", [scriptPath, ...args], {
-      shell: false,
-      cwd: path.dirname(scriptPath),
-    });
-    let stdout = "";
-    let stderr = "";
-    py.stdout.on("data", (d) => (stdout += d.toString()));
-    py.stderr.on("data", (d) => (stderr += d.toString()));
-    py.on("close", (code) => {
-      if (code !== 0) {
-        return reject(new Error(`Python exited with code ${code}: ${stderr}`));
-      }
-      try {
-        const parsed = JSON.parse(stdout.trim());
-        resolve(parsed);
-      } catch (err) {
-        reject(new Error(`Failed to parse JSON from Python: ${err.message}. Raw: ${stdout}`));
-      }
-    });
-  });
-};
+import { runAgent } from "../lib/pythonWorker.js";
 
 export const runIndustryDemand = async (req, res) => {
   try {
     const userId = req.user._id;
-    const { location = "India" } = req.body || {};
-
-    const backendDir = path.resolve(__dirname, "../../");
-    const repoRoot = path.resolve(backendDir, "..");
-    const script = path.resolve(repoRoot, "jobDemand.py");
+    const { location = "India", forceRefresh = false } = req.body || {};
 
-    const result = await runPythonJson(script, [location]);
+    // Served from the per-location cache unless forceRefresh is set
+    const result = await runAgent("job_demand", { location, force_refresh: Boolean(forceRefresh) });
 
     const doc = await IndustryDemand.create({
       userId,
@@ -156,36 +156,8 @@ export const getStudentResult = async (req, res) => {
   }
 };
 
-// Utility to run python script
-import { spawn } from "child_process";
-import fs from "fs";
-import path from "path";
-import { fileURLToPath } from "url";
-
-const __filename = fileURLToPath(import.meta.url);
-const __dirname = path.dirname(__filename);
-const backendDir = path.resolve(__dirname, "../../");
-const repoRoot = path.resolve(backendDir, "..");
-
-const runPython = (scriptPath, args = []) => {
-  return new Promise((resolve, reject) => {
-    const py = spawn("python", [scriptPath, ...args], { shell: false, cwd: path.dirname(scriptPath) });
-    let stdout = "";
-    let stderr = "";
-    py.stdout.on("data", (d) => (stdout += d.toString()));
-    py.stderr.on("data", (d) => (stderr += d.toString()));
-    py.on("close", (code) => {
-      if (code !== 0) {
-        return reject(new Error(`Python exited with code ${code}: ${stderr}`));
-      }
-      try {
-        resolve(JSON.parse(stdout.trim()));
-      } catch {
-        resolve({ output: stdout.trim() });
-      }
-    });
-  });
-};
+// Python agents run on the resident worker (see lib/pythonWorker.js)
+import { runAgent } from "../lib/pythonWorker.js";
 
 export const runSkillPathway = async (req, res) => {
   try {
@@ -212,14 +184,7 @@ export const runSkillPathway = async (req, res) => {
       return res.status(400).json({ message: "text_report not found in rawResponse" });
     }
 
-    // Write to a temporary file for the Python script to read
-    const tmpDir = path.resolve(backendDir, "tmp");
-    if (!fs.existsSync(tmpDir)) fs.mkdirSync(tmpDir, { recursive: true });
-    const tmpFile = path.join(tmpDir, `userdoc_${req.user._id}.txt`);
-    fs.writeFileSync(tmpFile, textReport, "utf-8");
-
-    const script = path.resolve(repoRoot, "skillpath.py");
-    const out = await runPython(script, [targetCareer, tmpFile]);
+    const out = await runAgent("skill_pathway", { target_career: targetCareer, user_document: textReport });
 
     return res.status(200).json({ status: "success", pathway: out });
   } catch (error) {
@@ -304,13 +269,7 @@ export const portfolioBuilder = async (req, res) => {
       return res.status(400).json({ message: "text_report not found in rawResponse" });
     }
 
-    const tmpDir = path.resolve(backendDir, "tmp");
-    if (!fs.existsSync(tmpDir)) fs.mkdirSync(tmpDir, { recursive: true });
-    const tmpFile = path.join(tmpDir, `portfolio_${req.user._id}.txt`);
-    fs.writeFileSync(tmpFile, textReport, "utf-8");
-
-    const script = path.resolve(repoRoot, "portfolioBuilder.py");
-    const out = await runPython(script, [tmpFile]);
+    const out = await runAgent("portfolio", { profile_text: textReport });
 
     return res.status(200).json({ status: "success", portfolio: out });
   } catch (error) {
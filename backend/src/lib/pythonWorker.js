@@ -0,0 +1,95 @@
+import path from "path";
+import readline from "readline";
+import { fileURLToPath } from "url";
+import { spawn } from "child_process";
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+const repoRoot = path.resolve(__dirname, "../../..");
+
+// Single resident Python process (see worker.py) shared by every controller
+let worker = null;
+let nextId = 1;
+const pending = new Map();
+
+// Seconds each agent may take; the worker runs it under this deadline (deadline.py) and
+// returns partial results or an error when it runs out. AGENT_BUDGET_SECONDS overrides all.
+const DEFAULT_BUDGET_SECONDS = 120;
+const AGENT_BUDGETS_SECONDS = {
+  personality: 60,
+  personality_instructions: 10,
+  job_demand: 90,
+  career_role: 60,
+  skill_pathway: 150,
+  portfolio: 150,
+  profile: 150,
+};
+// Extra time for the worker to send its (partial) result after the deadline
+const RESPONSE_GRACE_SECONDS = 10;
+
+const budgetFor = (agent) => {
+  const override = Number(process.env.AGENT_BUDGET_SECONDS);
+  if (override > 0) return override;
+  return AGENT_BUDGETS_SECONDS[agent] ?? DEFAULT_BUDGET_SECONDS;
+};
+
+const failPending = (error) => {
+  for (const { reject, timer } of pending.values()) {
+    clearTimeout(timer);
+    reject(error);
+  }
+  pending.clear();
+};
+
+const startWorker = () => {
+  const py = spawn("python", ["-m", "worker"], { shell: false, cwd: repoRoot });
+
+  const lines = readline.createInterface({ input: py.stdout });
+  lines.on("line", (line) => {
+    let message;
+    try {
+      message = JSON.parse(line);
+    } catch {
+      return;
+    }
+    const entry = pending.get(String(message.id));
+    if (!entry) return;
+    pending.delete(String(message.id));
+    clearTimeout(entry.timer);
+    if (message.ok) {
+      entry.resolve(message.result);
+    } else {
+      entry.reject(new Error(message.error || "Python worker request failed"));
+    }
+  });
+
+  py.stderr.on("data", (d) => process.stderr.write(d));
+  py.on("error", (err) => {
+    if (worker === py) worker = null;
+    failPending(err);
+  });
+  py.on("close", (code) => {
+    if (worker === py) worker = null;
+    failPending(new Error(`Python worker exited with code ${code}`));
+  });
+  return py;
+};
+
+// Run one agent request on the resident worker, starting it on first use.
+// args.budget (seconds) overrides the agent's default budget; the promise rejects if no
+// response arrives within the budget plus a grace period.
+const runAgent = (agent, args = {}) => {
+  return new Promise((resolve, reject) => {
+    if (!worker) worker = startWorker();
+    const id = String(nextId++);
+    const budget = args.budget ?? budgetFor(agent);
+    const timer = setTimeout(() => {
+      pending.delete(id);
+      reject(new Error(`Python worker request '${agent}' timed out after ${budget}s`));
+    }, (budget + RESPONSE_GRACE_SECONDS) * 1000);
+    pending.set(id, { resolve, reject, timer });
+    worker.stdin.write(JSON.stringify({ id, agent, args: { ...args, budget } }) + "\n");
+  });
+};
+
+export { runAgent };
@@ -0,0 +1,217 @@
+"""
+Batch Runner
+Runs the resume, transcript or certificate pipeline over many files in one
+process with bounded concurrency. Each result is appended to a JSONL file as
+soon as it finishes. The same file doubles as the progress record: re-running
+the same command skips every item that already has a successful line, so an
+interrupted run picks up where it stopped.
+
+Usage:
+    python batch.py resume ./intake/resumes -o resumes.jsonl --concurrency 8
+    python batch.py transcript manifest.txt -o transcripts.jsonl
+    python batch.py certificate manifest.jsonl --retry-failed
+
+Manifests are either plain text (one path per line) or JSONL with a "path"
+and an optional "id" per line. For directories, the id is the file path
+relative to the directory.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterator, Set, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+AGENTS = {
+    "resume": ("resume", "run_resume_analysis"),
+    "transcript": ("transcript", "run_transcript_analysis"),
+    "certificate": ("certificate", "run_certificate_analysis"),
+}
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".heic", ".heif", ".gif", ".bmp", ".tif", ".tiff"}
+
+
+def get_runner(agent: str):
+    import importlib
+    module_name, func_name = AGENTS[agent]
+    return getattr(importlib.import_module(module_name), func_name)
+
+# ============================================================
+# 1. INPUTS
+# ============================================================
+
+def iter_directory(root: str) -> Iterator[Tuple[str, str]]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                path = os.path.join(dirpath, name)
+                yield os.path.relpath(path, root), path
+
+
+def iter_manifest(manifest: str) -> Iterator[Tuple[str, str]]:
+    base = os.path.dirname(os.path.abspath(manifest))
+    with open(manifest, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                entry = json.loads(line)
+                path = entry["path"]
+                item_id = str(entry.get("id") or path)
+            else:
+                path = item_id = line
+            if not os.path.isabs(path):
+                path = os.path.join(base, path)
+            yield item_id, path
+
+
+def iter_items(source: str) -> Iterator[Tuple[str, str]]:
+    return iter_directory(source) if os.path.isdir(source) else iter_manifest(source)
+
+# ============================================================
+# 2. PROGRESS RECORD
+# ============================================================
+
+def load_completed(output_path: str, retry_failed: bool) -> Set[str]:
+    """Ids already recorded in the output file (only successful ones when retry_failed)."""
+    done: Set[str] = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # partial last line from a killed run
+            if record.get("ok") or not retry_failed:
+                done.add(record.get("id"))
+    return done
+
+
+class JsonlWriter:
+    """Append-only, line-buffered JSONL output shared by the worker threads."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        needs_newline = False
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        self._file = open(path, "a", encoding="utf-8")
+        if needs_newline:
+            # Terminate a line cut off by a killed run so the next record starts cleanly
+            self._file.write("\n")
+
+    def write(self, record: Dict) -> None:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+# ============================================================
+# 3. EXECUTION
+# ============================================================
+
+def process_item(runner, agent: str, item_id: str, path: str) -> Dict:
+    start = time.perf_counter()
+    record: Dict = {"id": item_id, "path": path, "agent": agent}
+    try:
+        result = runner(path)
+        if isinstance(result, dict) and "error" in result:
+            record.update(ok=False, error=result["error"])
+        else:
+            record.update(ok=True, result=result)
+    except Exception as e:
+        record.update(ok=False, error=f"{type(e).__name__}: {e}")
+    record["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return record
+
+
+def run_batch(agent: str, source: str, output_path: str, concurrency: int = 4,
+              retry_failed: bool = False, limit: int = 0) -> Dict:
+    """Process every pending item from source, appending one JSON line per item to output_path."""
+    runner = get_runner(agent)
+    completed = load_completed(output_path, retry_failed)
+    writer = JsonlWriter(output_path)
+    counts = {"ok": 0, "failed": 0, "skipped": 0}
+    started = time.perf_counter()
+
+    def log_progress():
+        done = counts["ok"] + counts["failed"]
+        rate = done / max(time.perf_counter() - started, 1e-9)
+        print(f"[batch] {done} done ({counts['failed']} failed), {counts['skipped']} skipped, {rate:.2f}/s",
+              file=sys.stderr)
+
+    def collect(finished):
+        for future in finished:
+            record = future.result()
+            writer.write(record)
+            counts["ok" if record["ok"] else "failed"] += 1
+            if not record["ok"]:
+                print(f"[batch] failed {record['id']}: {record['error']}", file=sys.stderr)
+        if (counts["ok"] + counts["failed"]) % 25 == 0:
+            log_progress()
+
+    submitted = 0
+    pending = set()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for item_id, path in iter_items(source):
+                if item_id in completed:
+                    counts["skipped"] += 1
+                    continue
+                if limit and submitted >= limit:
+                    break
+                # Keep the queue bounded so huge manifests aren't all materialized as futures
+                if len(pending) >= concurrency * 2:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(finished)
+                pending.add(pool.submit(process_item, runner, agent, item_id, path))
+                submitted += 1
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+    finally:
+        writer.close()
+    log_progress()
+    return {**counts, "output": output_path, "elapsed_s": round(time.perf_counter() - started, 1)}
+
+# ============================================================
+# 4. MAIN
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a document agent over a directory or manifest of files.")
+    parser.add_argument("agent", choices=sorted(AGENTS))
+    parser.add_argument("source", help="Directory of images, or a manifest (.txt paths or .jsonl with 'path'/'id')")
+    parser.add_argument("-o", "--output", help="JSONL results file (default: <agent>_results.jsonl)")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="Files processed at once (default: 4)")
+    parser.add_argument("--retry-failed", action="store_true", help="Re-run items whose recorded result failed")
+    parser.add_argument("--limit", type=int, default=0, help="Process at most N pending items")
+    args = parser.parse_args()
+
+    output_path = args.output or f"{args.agent}_results.jsonl"
+    # Agents print progress to stdout; keep stdout for the final summary only
+    with contextlib.redirect_stdout(sys.stderr):
+        summary = run_batch(args.agent, args.source, output_path, max(1, args.concurrency),
+                            retry_failed=args.retry_failed, limit=args.limit)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Performance benchmarks for the agent scripts (run from the repo root with `python -m benchmarks.<name>`)."""
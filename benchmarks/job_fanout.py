@@ -0,0 +1,138 @@
+"""
+Job Demand Fan-out Benchmark
+Runs the jobDemand graph (sync and async variants) and compares end-to-end wall
+time with the sum of per-node times. With real overlap, wall time should be close
+to the slowest of demand/salary/skills plus summary, not the total of all four.
+
+Usage:
+    python -m benchmarks.job_fanout                       # stubbed search + LLM (offline)
+    python -m benchmarks.job_fanout --search-latency 0.3 --llm-latency 1.2
+    python -m benchmarks.job_fanout --live "Bangalore, India"   # real Serper + Gemini
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import functools
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Measure real work, not cache hits
+os.environ.setdefault("LLM_CACHE_DISABLED", "1")
+os.environ.setdefault("SERPER_CACHE_TTL", "0")
+
+import jobDemand  # noqa: E402
+
+BRANCHES = ("demand", "salary", "skills")
+NODES = BRANCHES + ("summary",)
+
+
+def make_stub_llm(latency: float):
+    """Chat model stand-in that sleeps (sync or async) and returns an empty JSON object."""
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    class SleepyChatModel(BaseChatModel):
+        delay: float = 1.0
+
+        @property
+        def _llm_type(self) -> str:
+            return "sleepy-stub"
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            time.sleep(self.delay)
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content="{}"))])
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            await asyncio.sleep(self.delay)
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content="{}"))])
+
+    return SleepyChatModel(delay=latency, cache=False)
+
+
+def install_stubs(search_latency: float, llm_latency: float) -> None:
+    stub_llm = make_stub_llm(llm_latency)
+
+    def fake_search(query: str, use_cache: bool = True) -> str:
+        time.sleep(search_latency)
+        return json.dumps({"organic": [], "query": query})
+
+    jobDemand.serper_search = fake_search
+    jobDemand.initialize_gemini_llm = lambda temp=0.3: stub_llm
+
+
+def instrument(timings: dict) -> None:
+    """Wrap the node functions so each records its own duration."""
+    for name in NODES:
+        sync_fn = getattr(jobDemand, f"node_{name}")
+        async_fn = getattr(jobDemand, f"anode_{name}")
+
+        def timed_sync(state, _fn=sync_fn, _name=name):
+            start = time.perf_counter()
+            try:
+                return _fn(state)
+            finally:
+                timings[_name] = (time.perf_counter() - start) * 1000
+
+        async def timed_async(state, _fn=async_fn, _name=name):
+            start = time.perf_counter()
+            try:
+                return await _fn(state)
+            finally:
+                timings[_name] = (time.perf_counter() - start) * 1000
+
+        setattr(jobDemand, f"node_{name}", functools.wraps(sync_fn)(timed_sync))
+        setattr(jobDemand, f"anode_{name}", functools.wraps(async_fn)(timed_async))
+
+
+def report(mode: str, wall_ms: float, timings: dict) -> dict:
+    node_ms = {name: round(timings.get(name, 0.0), 1) for name in NODES}
+    critical = max(node_ms[b] for b in BRANCHES) + node_ms["summary"]
+    return {
+        "mode": mode,
+        "wall_ms": round(wall_ms, 1),
+        "node_ms": node_ms,
+        "sum_node_ms": round(sum(node_ms.values()), 1),
+        "critical_path_ms": round(critical, 1),
+        "overlap_efficiency": round(critical / wall_ms, 3) if wall_ms else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare wall time with the sum of node times for jobDemand.")
+    parser.add_argument("location", nargs="?", default="Bangalore, India")
+    parser.add_argument("--live", action="store_true", help="Use real Serper and Gemini instead of stubs")
+    parser.add_argument("--search-latency", type=float, default=0.4, help="Stub search latency in seconds")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Stub LLM latency in seconds")
+    args = parser.parse_args()
+
+    if not args.live:
+        install_stubs(args.search_latency, args.llm_latency)
+
+    timings: dict = {}
+    instrument(timings)
+    sync_graph = jobDemand.build_workflow()
+    async_graph = jobDemand.build_async_workflow()
+    state = jobDemand._initial_state(args.location)
+
+    results = []
+    start = time.perf_counter()
+    sync_graph.invoke(dict(state))
+    results.append(report("sync", (time.perf_counter() - start) * 1000, timings))
+
+    timings.clear()
+    start = time.perf_counter()
+    asyncio.run(async_graph.ainvoke(dict(state)))
+    results.append(report("async", (time.perf_counter() - start) * 1000, timings))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Offline Agent Benchmark
+Runs every agent pipeline end to end with no network access and no API keys:
+Gemini is replaced by a deterministic stub with configurable latency
+(benchmarks/stubs.py). Serper, Tavily, Coursera and GitHub are served by local
+HTTP stand-ins running in a child process (benchmarks/standins.py). Caches live
+in a temporary directory, so the first iteration of each agent is cold and the
+rest show the warm path. The LLM response cache is disabled.
+
+Per agent it reports wall time, process CPU time and RSS, plus per-node wall
+times taken from the instrumentation records (instrumentation.py). Cold and warm
+iterations are reported separately.
+
+Usage:
+    python -m benchmarks.offline                                  # every agent, 3 iterations
+    python -m benchmarks.offline skillpath jobDemand --iterations 5
+    python -m benchmarks.offline --llm-latency 0.5 --http-latency 0.05 -o baseline.json
+    python -m benchmarks.offline --baseline baseline.json         # adds % change vs a previous report
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import statistics
+import contextlib
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+USER_DOCUMENT = (
+    "Alex Bench, B.Tech Computer Science (2024). Data analyst intern at Example Corp for six months. "
+    "Skills: Python, SQL, pandas, Tableau, basic machine learning with scikit-learn. "
+    "Projects: sales dashboard, churn prediction notebook. Interested in becoming a data scientist."
+)
+GAP_SKILLS = ["Docker", "Kubernetes", "Causal inference", "Statistics"]
+GITHUB_USER = "alexbench"
+
+
+def configure_environment(workdir: str) -> None:
+    """Point every cache and sink at workdir and satisfy key checks with placeholders."""
+    os.environ.update({
+        "LLM_CACHE_DISABLED": "1",
+        "GOOGLE_API_KEY": "benchmark-placeholder",
+        "TAVILY_API_KEY": "benchmark-placeholder",
+        "SERPER_API_KEY": "benchmark-placeholder",
+        "GITHUB_TOKEN": "",
+        "GITHUB_FETCH_BACKEND": "api",
+        "SERPER_CACHE_DIR": os.path.join(workdir, "serper"),
+        "JOB_ANALYSIS_CACHE_DIR": os.path.join(workdir, "job_analysis"),
+        "GITHUB_API_CACHE_DIR": os.path.join(workdir, "github_api"),
+        "GITHUB_ANALYSIS_STORE_DIR": os.path.join(workdir, "github_analysis"),
+        "COURSE_CATALOG_PATH": os.path.join(workdir, "course_catalog.sqlite3"),
+        "CAREER_CACHE_PATH": os.path.join(workdir, "career_requirements.sqlite3"),
+        "CERTIFICATE_CACHE_PATH": os.path.join(workdir, "certificate_cache.sqlite3"),
+        "RIASEC_SUMMARIES_PATH": os.path.join(workdir, "riasec_summaries.json.gz"),
+        "AGENT_METRICS": os.path.join(workdir, "metrics.jsonl"),
+    })
+
+
+def make_image(path: str, title: str) -> str:
+    """A document-like PNG (white page, dark text bars) for the vision pipelines."""
+    from PIL import Image, ImageDraw
+    image = Image.new("RGB", (1240, 1754), "white")
+    draw = ImageDraw.Draw(image)
+    draw.text((80, 60), title, fill="black")
+    for row in range(40):
+        width = 400 + (row * 97) % 700
+        draw.rectangle((80, 140 + row * 38, 80 + width, 156 + row * 38), fill=(40, 40, 40))
+    image.save(path, "PNG")
+    return path
+
+
+def point_at_standins(base_url: str) -> None:
+    """Redirect the modules' external endpoints to the local stand-ins."""
+    import requests
+    import jobDemand
+    import course
+    import github_api
+    import certificate
+
+    jobDemand.SERPER_URL = f"{base_url}/serper/search"
+    course.COURSERA_SEARCH_URL = f"{base_url}/coursera/search"
+    github_api.API_URL = f"{base_url}/github-api"
+    github_api.GRAPHQL_URL = f"{base_url}/github-graphql"
+
+    class LocalTavilyClient:
+        def search(self, query, timeout=60, **kwargs):
+            response = requests.post(f"{base_url}/tavily/search", json={"query": query, **kwargs}, timeout=timeout)
+            response.raise_for_status()
+            return response.json()
+
+    certificate.get_tavily_client = lambda: LocalTavilyClient()
+
+
+def build_agents(workdir: str) -> Dict[str, Callable[[], object]]:
+    import resume
+    import transcript
+    import certificate
+    import github
+    import personality
+    import jobDemand
+    import skillpath
+    import portfolioBuilder
+    import CareerRole
+    import course
+    import profileAnalysis
+
+    resume_png = make_image(os.path.join(workdir, "resume.png"), "ALEX BENCH - RESUME")
+    transcript_png = make_image(os.path.join(workdir, "transcript.png"), "OFFICIAL TRANSCRIPT")
+    certificate_png = make_image(os.path.join(workdir, "certificate.png"), "CERTIFICATE OF COMPLETION")
+    job_analysis = {"location": "Bangalore, India", "summary": {"overview": "Strong demand for data roles."}}
+    profile = {"skills": ["Python", "SQL"], "education": "B.Tech", "interests": ["AI"]}
+
+    return {
+        "resume": lambda: resume.run_resume_analysis(resume_png),
+        "transcript": lambda: transcript.run_transcript_analysis(transcript_png),
+        "certificate": lambda: certificate.run_certificate_analysis(certificate_png),
+        "github": lambda: github.run_github_analysis(GITHUB_USER),
+        "personality": lambda: personality.run_personality_review("RIA"),
+        "jobDemand": lambda: jobDemand.get_job_analysis("Bangalore, India"),
+        "skillpath": lambda: skillpath.run_skill_pathway("Data Scientist", USER_DOCUMENT),
+        "portfolioBuilder": lambda: portfolioBuilder.run_app_from_text(USER_DOCUMENT),
+        "CareerRole": lambda: CareerRole.run_career_roles(job_analysis, profile),
+        "course": lambda: course.run_course_recommendations(GAP_SKILLS),
+        "profileAnalysis": lambda: profileAnalysis.run_profile_analysis(
+            resume_png, transcript_png, certificate_png, GITHUB_USER
+        ),
+    }
+
+# ============================================================
+# MEASUREMENT
+# ============================================================
+
+def _cpu_ms() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return (usage.ru_utime + usage.ru_stime) * 1000
+
+
+def _rss_mb() -> float:
+    """Current resident set size (Linux /proc; falls back to peak RSS elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return _peak_rss_mb()
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+
+def _new_records(path: str, offset: int) -> (List[dict], int):
+    if not os.path.exists(path):
+        return [], offset
+    with open(path, "r", encoding="utf-8") as f:
+        f.seek(offset)
+        lines = f.read()
+        offset = f.tell()
+    return [json.loads(line) for line in lines.splitlines() if line.strip()], offset
+
+
+def run_iteration(fn: Callable[[], object], metrics_path: str, offset: int) -> (dict, int):
+    cpu_before = _cpu_ms()
+    start = time.perf_counter()
+    error = None
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            result = fn()
+        if isinstance(result, dict) and result.get("error"):
+            error = str(result["error"])
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    wall_ms = (time.perf_counter() - start) * 1000
+    cpu_ms = _cpu_ms() - cpu_before
+    records, offset = _new_records(metrics_path, offset)
+    nodes: Dict[str, float] = {}
+    for record in records:
+        if record.get("type") == "node":
+            key = f"{record['graph']}.{record['node']}"
+            nodes[key] = nodes.get(key, 0.0) + record["wall_ms"]
+    sample = {"wall_ms": wall_ms, "cpu_ms": cpu_ms, "rss_mb": _rss_mb(), "nodes": nodes,
+              "llm_calls": sum(r.get("llm_calls", 0) for r in records if r.get("type") == "node"),
+              "http_calls": sum(r.get("http_calls", 0) for r in records if r.get("type") == "node")}
+    if error:
+        sample["error"] = error
+    return sample, offset
+
+
+def summarize(samples: List[dict]) -> dict:
+    """Medians over samples (one sample is reported as is)."""
+    node_names = sorted({name for s in samples for name in s["nodes"]})
+    return {
+        "iterations": len(samples),
+        "wall_ms": round(statistics.median(s["wall_ms"] for s in samples), 1),
+        "cpu_ms": round(statistics.median(s["cpu_ms"] for s in samples), 1),
+        "llm_calls": statistics.median(s["llm_calls"] for s in samples),
+        "http_calls": statistics.median(s["http_calls"] for s in samples),
+        "nodes": {
+            name: round(statistics.median(s["nodes"].get(name, 0.0) for s in samples), 1)
+            for name in node_names
+        },
+    }
+
+
+def compare(report: dict, baseline: dict) -> None:
+    """Add percentage change in wall time against a previous report, per agent and phase."""
+    for name, entry in report["agents"].items():
+        previous = baseline.get("agents", {}).get(name)
+        if not previous:
+            continue
+        entry["vs_baseline_pct"] = {}
+        for phase in ("cold", "warm"):
+            if phase in entry and phase in previous and previous[phase]["wall_ms"]:
+                change = 100.0 * (entry[phase]["wall_ms"] - previous[phase]["wall_ms"]) / previous[phase]["wall_ms"]
+                entry["vs_baseline_pct"][phase] = round(change, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every agent offline with a stub LLM and local HTTP stand-ins.")
+    parser.add_argument("agents", nargs="*", help="Agents to run (default: all)")
+    parser.add_argument("--iterations", type=int, default=3, help="Runs per agent; the first is cold (default: 3)")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Stub LLM latency in seconds (default: 0.2)")
+    parser.add_argument("--http-latency", type=float, default=0.02, help="Stand-in response delay in seconds (default: 0.02)")
+    parser.add_argument("-o", "--output", help="Also write the JSON report to this file")
+    parser.add_argument("--baseline", help="Previous report to compare wall times against")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary cache/metrics directory")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="agent-bench-")
+    configure_environment(workdir)
+
+    from benchmarks import stubs, standins
+    stubs.install(args.llm_latency)
+    base_url, server = standins.start_in_background(args.http_latency)
+    try:
+        point_at_standins(base_url)
+        agents = build_agents(workdir)
+        unknown = [a for a in args.agents if a not in agents]
+        if unknown:
+            parser.error(f"unknown agents {unknown}; choose from {sorted(agents)}")
+
+        metrics_path = os.environ["AGENT_METRICS"]
+        offset = 0
+        cpu_start = _cpu_ms()
+        report = {
+            "config": {"iterations": args.iterations, "llm_latency_s": args.llm_latency,
+                       "http_latency_s": args.http_latency, "python": sys.version.split()[0]},
+            "agents": {},
+        }
+        for name in args.agents or list(agents):
+            samples = []
+            for _ in range(max(1, args.iterations)):
+                sample, offset = run_iteration(agents[name], metrics_path, offset)
+                samples.append(sample)
+            entry = {"cold": summarize(samples[:1])}
+            if len(samples) > 1:
+                entry["warm"] = summarize(samples[1:])
+            entry["rss_mb"] = round(samples[-1]["rss_mb"], 1)
+            errors = sorted({s["error"] for s in samples if "error" in s})
+            if errors:
+                entry["errors"] = errors
+            report["agents"][name] = entry
+            warm = entry.get("warm", entry["cold"])
+            print(f"{name:18s} cold {entry['cold']['wall_ms']:>9.1f} ms   warm {warm['wall_ms']:>9.1f} ms   "
+                  f"cpu {warm['cpu_ms']:>8.1f} ms   rss {entry['rss_mb']:.0f} MB"
+                  + (f"   ERRORS: {errors}" if errors else ""), file=sys.stderr)
+
+        report["process"] = {"cpu_ms": round(_cpu_ms() - cpu_start, 1), "peak_rss_mb": round(_peak_rss_mb(), 1)}
+        if args.baseline:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                compare(report, json.load(f))
+    finally:
+        server.terminate()
+        if args.keep:
+            print(f"[offline] caches and metrics kept in {workdir}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
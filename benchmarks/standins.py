@@ -0,0 +1,160 @@
+"""
+Local HTTP stand-ins for the external services the agents call.
+One threaded HTTP server answers, with canned payloads after a configurable delay:
+
+    POST /serper/search                    Serper web search        (jobDemand.serper_search)
+    POST /tavily/search                    Tavily search            (certificate.run_tavily_search)
+    GET  /coursera/search?query=...        Coursera search page     (course.search_courses_coursera)
+    GET  /github-api/users/<user>[/repos]  GitHub REST API, with ETags (github_api.fetch_profile)
+    GET  /github-api/repos/<user>/<repo>/languages|readme
+    GET  /github/<user>                    GitHub profile HTML      (github.scrape_profile_text)
+
+Run it on its own with `python -m benchmarks.standins --port 8765`. benchmarks.offline
+starts it in a child process so its CPU time isn't counted against the agents.
+"""
+
+import sys
+import json
+import time
+import base64
+import hashlib
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+REPOS = [
+    {"name": f"project-{i}", "description": f"Benchmark project {i}", "language": lang,
+     "topics": ["benchmark"], "stargazers_count": 10 - i, "forks_count": i, "fork": False,
+     "pushed_at": f"2025-0{1 + i % 9}-01T00:00:00Z", "homepage": ""}
+    for i, lang in enumerate(["Python", "TypeScript", "Go", "Python", "Rust", "Jupyter Notebook"])
+]
+
+
+def github_api(path: str):
+    parts = [p for p in path.split("/") if p]
+    if len(parts) == 2 and parts[0] == "users":
+        return {"login": parts[1], "name": "Alex Bench", "bio": "Builds data tools.", "company": None,
+                "location": "Bangalore", "blog": "", "hireable": True, "public_repos": len(REPOS),
+                "followers": 42, "following": 7, "created_at": "2019-01-01T00:00:00Z"}
+    if len(parts) == 3 and parts[0] == "users" and parts[2] == "repos":
+        return REPOS
+    if len(parts) == 4 and parts[0] == "repos" and parts[3] == "languages":
+        return {"Python": 52000, "Jupyter Notebook": 8000, "Shell": 900}
+    if len(parts) == 4 and parts[0] == "repos" and parts[3] == "readme":
+        content = "# Hi, I'm Alex\n\nI build data tools and benchmark everything.\n" * 5
+        return {"encoding": "base64", "content": base64.b64encode(content.encode()).decode()}
+    return None
+
+
+def coursera_page(query: str) -> str:
+    slug = "-".join(query.lower().split()) or "course"
+    links = "".join(
+        f'<a href="/learn/{slug}-{i}" aria-label="{query.title()} Course {i}">{query} {i}</a>'
+        for i in range(10)
+    )
+    return f"<html><body><main>{links}</main></body></html>"
+
+
+class Handler(BaseHTTPRequestHandler):
+    delay = 0.0
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", content_type: str = "application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _json(self, payload, headers=None):
+        self._send(200, json.dumps(payload).encode("utf-8"), headers=headers)
+
+    def do_POST(self):
+        time.sleep(self.delay)
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        query = request.get("q") or request.get("query") or ""
+        if self.path.startswith("/serper/search"):
+            self._json({
+                "searchParameters": {"q": query, "type": "search"},
+                "organic": [{"title": f"{query} result {i}", "link": f"https://example.com/{i}",
+                             "snippet": f"Snippet {i} about {query}: demand, salaries and skills."}
+                            for i in range(10)],
+                "credits": 1,
+            })
+        elif self.path.startswith("/tavily/search"):
+            self._json({"query": query, "results": [
+                {"title": f"{query} overview {i}", "url": f"https://example.com/cert/{i}",
+                 "content": f"{query} covers data cleaning, SQL, R and Tableau. Source {i}.", "score": 0.9}
+                for i in range(5)
+            ]})
+        else:
+            self._send(404)
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        url = urlparse(self.path)
+        if url.path.startswith("/coursera/search"):
+            query = parse_qs(url.query).get("query", [""])[0]
+            self._send(200, coursera_page(query).encode("utf-8"), "text/html")
+        elif url.path.startswith("/github-api/"):
+            payload = github_api(url.path[len("/github-api"):])
+            if payload is None:
+                self._send(404, b'{"message": "Not Found"}')
+                return
+            body = json.dumps(payload).encode("utf-8")
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, headers={"ETag": etag})
+            else:
+                self._send(200, body, headers={"ETag": etag})
+        elif url.path.startswith("/github/"):
+            user = url.path.split("/")[2]
+            repos = "".join(f"<li>{r['name']}: {r['description']} ({r['language']})</li>" for r in REPOS)
+            page = f"<html><body><h1>{user}</h1><p>Builds data tools.</p><ul>{repos}</ul></body></html>"
+            self._send(200, page.encode("utf-8"), "text/html")
+        else:
+            self._send(404)
+
+
+def serve(port: int = 0, delay: float = 0.0, ready=None) -> None:
+    """Serve forever; reports the bound port through ready (a multiprocessing queue) if given."""
+    Handler.delay = delay
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    if ready is not None:
+        ready.put(server.server_address[1])
+    print(f"[standins] listening on http://127.0.0.1:{server.server_address[1]}", file=sys.stderr)
+    server.serve_forever()
+
+
+def start_in_background(delay: float = 0.0) -> tuple:
+    """Start the stand-ins in a child process; returns (base_url, process)."""
+    import multiprocessing
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    process = context.Process(target=serve, kwargs={"port": 0, "delay": delay, "ready": ready}, daemon=True)
+    process.start()
+    port = ready.get(timeout=30)
+    return f"http://127.0.0.1:{port}", process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve local stand-ins for Serper, Tavily, Coursera and GitHub.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before each response")
+    args = parser.parse_args()
+    try:
+        serve(args.port, args.delay)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Startup Benchmark
+Measures, for every agent module, in a fresh interpreter:
+  - import_ms:      `import <module>`
+  - compile_ms:     building the LangGraph graph via get_workflow()
+  - client_ms:      constructing the first Gemini client (SDK import included)
+  - first_node_ms:  import + compile + client, i.e. the time until the graph
+                    is ready to execute its first node (no network calls are made)
+
+Usage:
+    python -m benchmarks.startup                 # all agents, 3 runs each
+    python -m benchmarks.startup --runs 5 resume skillpath
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+AGENTS = [
+    "resume",
+    "transcript",
+    "certificate",
+    "github",
+    "personality",
+    "jobDemand",
+    "skillpath",
+    "portfolioBuilder",
+    "CareerRole",
+    "course",
+]
+
+# Runs inside a fresh interpreter; prints one JSON line with the timings
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+mod = __import__(sys.argv[1])
+t1 = time.perf_counter()
+mod.get_workflow()
+t2 = time.perf_counter()
+from llm_clients import get_chat_model
+get_chat_model("gemini-2.5-flash", temperature=0.2)
+t3 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "compile_ms": (t2 - t1) * 1000,
+    "client_ms": (t3 - t2) * 1000,
+    "first_node_ms": (t3 - t0) * 1000,
+}))
+"""
+
+
+def probe(module: str) -> dict:
+    env = dict(os.environ)
+    # Client construction needs a key but never contacts the API here
+    env.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+    env.setdefault("TAVILY_API_KEY", "benchmark-placeholder")
+    proc = subprocess.run(
+        [sys.executable, "-c", PROBE, module],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        last = proc.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        return {"error": last[0]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time and time-to-first-node per agent.")
+    parser.add_argument("agents", nargs="*", default=AGENTS, help="Agent modules to measure (default: all)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per agent (default: 3)")
+    args = parser.parse_args()
+
+    report = {}
+    for module in args.agents:
+        runs = [probe(module) for _ in range(max(1, args.runs))]
+        errors = [r["error"] for r in runs if "error" in r]
+        if errors:
+            report[module] = {"error": errors[0]}
+        else:
+            report[module] = {
+                key: round(statistics.median(r[key] for r in runs), 1)
+                for key in ("import_ms", "compile_ms", "client_ms", "first_node_ms")
+            }
+        print(f"{module:18s} {report[module]}", file=sys.stderr)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
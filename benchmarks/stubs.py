@@ -0,0 +1,167 @@
+"""
+Deterministic stand-in for the Gemini chat model.
+install() replaces the provider class used by llm_clients.get_chat_model, so every
+agent gets a stub that sleeps for a configurable latency and answers with a canned
+response picked by a marker phrase in the prompt. The responses satisfy each
+module's parser (JSON schemas, Pydantic models, structured output). Token usage is
+reported as chars/4 so token accounting and metrics behave as in production.
+"""
+
+import re
+import json
+import time
+import asyncio
+from typing import Any, List, Optional
+
+ROLE_SKILLS = ["Python", "SQL", "Machine Learning", "Docker", "Kubernetes", "Statistics", "Data Visualization"]
+
+_PROJECT = {
+    "step_title": "Step 1: The Foundation",
+    "project_title": "Benchmark Tracker",
+    "project_description": "A small web service that records and charts benchmark results over time.",
+    "portfolio_value": "Shows end-to-end ownership of a data-backed web application.",
+    "key_skills_to_learn": ["FastAPI", "PostgreSQL", "CI/CD Pipelines"],
+}
+
+# (marker phrase in the prompt, response); the first match wins, prose is the fallback
+CANNED = [
+    ("resume parsing expert", {
+        "name": "Alex Bench", "email": "alex@example.com", "phone": "", "linkedin": "", "github": "alexbench",
+        "education": [{"degree": "B.Tech Computer Science", "institution": "Example University", "year": "2024"}],
+        "skills": {"technical": ROLE_SKILLS[:4], "soft": ["Communication", "Teamwork"]},
+        "projects": [{"title": "Benchmark Tracker", "description": "Tracks benchmarks.", "technologies_used": ["Python"]}],
+        "experience": [{"role": "Intern", "organization": "Example Corp", "duration": "6 months", "achievements": ""}],
+        "certifications": ["Google Data Analytics"], "achievements": [], "career_objective": "Data Scientist",
+    }),
+    ("academic data extractor", {
+        "name": "Alex Bench", "registration_number": "21BCE0001", "semester_year": "2024", "gpa": "8.7",
+        "courses": [{"course_code": f"CSE10{i}", "course_name": f"Course {i}", "credits": "4", "grade": "A"}
+                    for i in range(8)],
+    }),
+    ("course completed", {"certificate_name": "Google Data Analytics Professional Certificate"}),
+    ("intelligent profile analyzer", {
+        "technical_skills": ROLE_SKILLS[:3], "soft_skills": ["Communication"],
+        "education_level": "Bachelor's", "experience_level": "Entry", "interests": ["AI"],
+    }),
+    ("career intelligence assistant", {
+        "career": "Data Scientist", "required_technical_skills": ROLE_SKILLS,
+        "required_soft_skills": ["Communication", "Problem Solving", "Storytelling with data"],
+    }),
+    ("skill gap analyst", {"missing_technical_skills": ["Causal inference"], "missing_soft_skills": []}),
+    ("progressive skill pathway", {
+        "technical_pathway": [
+            {"stage": stage, "skills": ROLE_SKILLS[i * 2:i * 2 + 2], "reasoning": "Builds on the previous stage."}
+            for i, stage in enumerate(("Beginner", "Intermediate", "Advanced"))
+        ],
+        "soft_skill_pathway": [
+            {"stage": "Foundational", "skills": ["Communication"], "reasoning": "Core habit."},
+            {"stage": "Growth", "skills": ["Storytelling with data"], "reasoning": "Presents results."},
+        ],
+    }),
+    ("senior tech recruiter", {
+        "name": "Alex Bench", "current_role": "Data Analyst", "key_skills": ROLE_SKILLS[:4],
+        "experience_summary": "Two years of analytics work with Python and SQL.",
+        "inferred_goals": ["Move into Data Science"],
+    }),
+    ("project incubator", [f"Project {i}: a portfolio project idea number {i}." for i in range(1, 7)]),
+    ("senior engineering manager", {
+        "intro_summary": "Three projects that move you from analytics to data science.",
+        "foundation_project": _PROJECT,
+        "growth_project": {**_PROJECT, "step_title": "Step 2: Growth"},
+        "capstone_project": {**_PROJECT, "step_title": "Step 3: Capstone"},
+    }),
+    ("AI career advisor", [
+        {"role": role, "reason": "Matches the profile.", "market_trend": "High",
+         "salary_range": "10-20 LPA", "skills_to_learn": ROLE_SKILLS[:2]}
+        for role in ("Data Scientist", "ML Engineer", "Data Engineer", "Analytics Engineer", "BI Developer")
+    ]),
+    ("Analyze job demand data", {
+        "top_10_in_demand_roles": ROLE_SKILLS, "total_job_postings_estimate": "12000",
+        "growth_rate_percentage": "14", "top_hiring_companies": ["Example Corp"],
+    }),
+    ("compensation analyst", {"average_salaries_by_role": {"Data Scientist": "18 LPA"}, "salary_growth_trends": "up"}),
+    ("job skills analyst", {"top_10_in_demand_technical_skills": ROLE_SKILLS, "emerging_technologies": ["LLMs"]}),
+    ("Synthesize a strategic summary", {
+        "overview": "Strong demand.", "key_opportunities": "AI roles.", "salary_competitiveness": "Good.",
+        "recommended_skills": "Python, SQL.", "market_outlook": "Positive.", "recommendations": "Upskill in ML.",
+    }),
+    ("scraped online courses", {}),
+]
+
+PROSE = (
+    "Overall summary: the candidate shows a solid foundation in Python, SQL and data analysis. "
+    "Strengths include structured problem solving and clear communication. "
+    "Recommended next steps are deeper statistics, production machine learning and a capstone project. "
+) * 6
+
+
+def _prompt_text(messages) -> str:
+    parts = []
+    for message in messages:
+        content = message.content
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(p.get("text", "") for p in content if isinstance(p, dict))
+    return "\n".join(parts)
+
+
+def canned_response(prompt: str) -> str:
+    for marker, response in CANNED:
+        if marker in prompt:
+            return json.dumps(response)
+    return PROSE
+
+
+def make_stub_model_class(latency: float):
+    """A ChatGoogleGenerativeAI stand-in with the same constructor signature."""
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+    from langchain_core.runnables import RunnableLambda
+
+    class StubChatModel(BaseChatModel):
+        model: str = "stub"
+        temperature: float = 0.0
+        delay: float = latency
+
+        def __init__(self, model: str = "stub", temperature: float = 0.0, google_api_key: Optional[str] = None,
+                     api_key: Optional[str] = None, **kwargs: Any):
+            super().__init__(model=model, temperature=temperature, **kwargs)
+
+        @property
+        def _llm_type(self) -> str:
+            return "benchmark-stub"
+
+        @property
+        def _identifying_params(self):
+            return {"model": self.model, "temperature": self.temperature}
+
+        def _result(self, messages) -> "ChatResult":
+            prompt = _prompt_text(messages)
+            text = canned_response(prompt)
+            usage = {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4,
+                     "total_tokens": (len(prompt) + len(text)) // 4}
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+        def _generate(self, messages: List, stop=None, run_manager=None, **kwargs):
+            time.sleep(self.delay)
+            return self._result(messages)
+
+        async def _agenerate(self, messages: List, stop=None, run_manager=None, **kwargs):
+            await asyncio.sleep(self.delay)
+            return self._result(messages)
+
+        def with_structured_output(self, schema, **kwargs):
+            def parse(message):
+                match = re.search(r"\{.*\}", message.content, re.DOTALL)
+                return schema.model_validate_json(match.group() if match else "{}")
+            return self | RunnableLambda(parse)
+
+    return StubChatModel
+
+
+def install(latency: float) -> None:
+    """Route every llm_clients.get_chat_model() client created from now on to the stub."""
+    import langchain_google_genai
+    langchain_google_genai.ChatGoogleGenerativeAI = make_stub_model_class(latency)
@@ -0,0 +1,153 @@
+"""
+Shared cache of career requirements for skillpath.py.
+The skills required for a target career don't depend on the user, so
+career_analyzer_node output is stored by normalized career name with a long
+TTL. The cache also counts requests per career so `python skillpath.py
+--prefetch` can warm the most-requested careers ahead of time.
+
+Entries are tagged with a version string (prompt + model fingerprint) and
+ignored if it no longer matches, so editing the prompt invalidates old entries.
+
+Configuration (environment):
+    CAREER_CACHE_PATH      SQLite file (default: .cache/career_requirements.sqlite3 in the repo root)
+    CAREER_CACHE_TTL       Entry lifetime in seconds (default: 2592000 = 30 days)
+    CAREER_CACHE_DISABLED  Set to 1 to bypass the cache
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from instrumentation import record_cache
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "career_requirements.sqlite3")
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+
+# Expanded before lookup so "ML Engineer" and "Machine Learning Engineer" share an entry
+_ABBREVIATIONS = {
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "sde": "software development engineer",
+    "swe": "software engineer",
+    "ui": "user interface",
+    "ux": "user experience",
+    "qa": "quality assurance",
+    "devops": "devops",
+    "sr": "senior",
+    "jr": "junior",
+}
+
+
+def normalize_career(career: str) -> str:
+    """'  Sr. ML-Engineer ' -> 'senior machine learning engineer'"""
+    tokens = re.sub(r"[^a-z0-9+#]+", " ", career.lower()).split()
+    return " ".join(_ABBREVIATIONS.get(t, t) for t in tokens)
+
+
+class CareerRequirementsCache:
+    def __init__(self, path: str = DEFAULT_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.counters: Dict[str, int] = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS requirements (
+                   career TEXT PRIMARY KEY,
+                   version TEXT NOT NULL,
+                   value TEXT NOT NULL,
+                   created_at REAL NOT NULL
+               )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS requests (
+                   career TEXT PRIMARY KEY,
+                   display TEXT NOT NULL,
+                   count INTEGER NOT NULL,
+                   last_requested_at REAL NOT NULL
+               )"""
+        )
+        self._conn.commit()
+
+    def get(self, career: str, version: str) -> Optional[Dict]:
+        key = normalize_career(career)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, version, created_at FROM requirements WHERE career = ?", (key,)
+            ).fetchone()
+            fresh = (
+                row is not None and row[1] == version
+                and (not self.ttl_seconds or time.time() - row[2] <= self.ttl_seconds)
+            )
+            self.counters["hits" if fresh else "misses"] += 1
+        record_cache(fresh)
+        return json.loads(row[0]) if fresh else None
+
+    def put(self, career: str, version: str, value: Dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO requirements (career, version, value, created_at) VALUES (?, ?, ?, ?)",
+                (normalize_career(career), version, json.dumps(value, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+
+    def age(self, career: str, version: str) -> Optional[float]:
+        """Seconds since the entry was stored (None if missing or from another version)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, created_at FROM requirements WHERE career = ?", (normalize_career(career),)
+            ).fetchone()
+        return time.time() - row[1] if row and row[0] == version else None
+
+    def record_request(self, career: str) -> None:
+        key = normalize_career(career)
+        if not key:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO requests (career, display, count, last_requested_at) VALUES (?, ?, 1, ?) "
+                "ON CONFLICT(career) DO UPDATE SET count = count + 1, display = excluded.display, "
+                "last_requested_at = excluded.last_requested_at",
+                (key, career.strip(), time.time()),
+            )
+            self._conn.commit()
+
+    def most_requested(self, limit: int) -> List[Tuple[str, int]]:
+        """(career as last typed, request count), most requested first."""
+        with self._lock:
+            return [
+                (display, count) for display, count in self._conn.execute(
+                    "SELECT display, count FROM requests ORDER BY count DESC, last_requested_at DESC LIMIT ?",
+                    (limit,),
+                )
+            ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM requirements").fetchone()[0]
+        return {**self.counters, "entries": entries, "path": self.path}
+
+
+_cache: Optional[CareerRequirementsCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[CareerRequirementsCache]:
+    """Process-wide cache, opened on first use (None when disabled)."""
+    global _cache
+    if os.getenv("CAREER_CACHE_DISABLED") == "1":
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CareerRequirementsCache(
+                    path=os.getenv("CAREER_CACHE_PATH", DEFAULT_PATH),
+                    ttl_seconds=float(os.getenv("CAREER_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+                )
+    return _cache
@@ -3,33 +3,48 @@ import sys
 import json
 import base64
 from dotenv import load_dotenv
-from typing import TypedDict, List # <-- Removed 'Literal'
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import HumanMessage, SystemMessage
+from typing import TypedDict, List, Optional, Tuple # <-- Removed 'Literal'
 from pydantic import BaseModel, Field
-from langgraph.graph import StateGraph, END
-from tavily import TavilyClient
+
+from llm_clients import get_chat_model
+from model_router import route
+from image_loader import image_to_data_uri
+from certificate_cache import get_cache
+import deadline
 
 # --- 1. Load API Keys ---
 load_dotenv()
 
-# Check if keys are set
-if not os.getenv("GOOGLE_API_KEY"):
-    raise ValueError("GOOGLE_API_KEY not found in environment variables. Get one from Google AI Studio.")
-if not os.getenv("TAVILY_API_KEY"):
-    raise ValueError("TAVILY_API_KEY not found in environment variables.")
 
-# --- Instantiate Tavily Client ---
-tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+def check_api_keys():
+    """Fail fast (at run time, not import time) if the required keys are missing."""
+    if not os.getenv("GOOGLE_API_KEY"):
+        raise ValueError("GOOGLE_API_KEY not found in environment variables. Get one from Google AI Studio.")
+    if not os.getenv("TAVILY_API_KEY"):
+        raise ValueError("TAVILY_API_KEY not found in environment variables.")
+
+# --- Tavily Client (created on first use) ---
+TAVILY_TIMEOUT_SECONDS = 60
+_tavily_client = None
+
+def get_tavily_client():
+    global _tavily_client
+    if _tavily_client is None:
+        check_api_keys()
+        from tavily import TavilyClient
+        _tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+    return _tavily_client
 
 
 # --- 2. Define the Graph's State ---
 
-class GraphState(TypedDict):
+class GraphState(TypedDict, total=False):
     image_url: str
+    image_hash: Optional[int]
     certificate_name: str
     search_results: List[dict]
     summary: str
+    error: str  # set instead of summary when no summary could be generated
 
 # --- 3. Define Helper Functions and Tools ---
 
@@ -39,15 +54,8 @@ def image_to_data_url(file_path: str) -> str:
     that vision models can read.
     """
     try:
-        with open(file_path, "rb") as image_file:
-            encoded_string = base64.b64encode(image_file.read()).decode()
-        mime_type = "image/png"
-        if file_path.endswith(".jpg") or file_path.endswith(".jpeg"):
-            mime_type = "image/jpeg"
-        elif file_path.endswith(".webp"):
-            mime_type = "image/webp"
-        
-        return f"data:{mime_type};base64,{encoded_string}"
+        # Format is sniffed from the file contents; oversized images are downscaled
+        return image_to_data_uri(file_path)
     except FileNotFoundError:
         print(f"Error: File not found at {file_path}")
         return ""
@@ -74,20 +82,33 @@ def run_tavily_search(
     Returns:
         Search results dictionary
     """
+    from instrumentation import http_timer
+    tavily_client = get_tavily_client()
     try:
-        result = tavily_client.search(
-            search_query,
-            search_depth="basic",
-            max_results=max_results,
-            include_raw_content=include_raw_content,
-            include_answer=include_answer,
-            # 'topic' parameter removed as it's not supported
-        )
+        with http_timer():
+            result = tavily_client.search(
+                search_query,
+                search_depth="basic",
+                max_results=max_results,
+                include_raw_content=include_raw_content,
+                include_answer=include_answer,
+                timeout=deadline.timeout(TAVILY_TIMEOUT_SECONDS),
+                # 'topic' parameter removed as it's not supported
+            )
         return result
     except Exception as e:
         print(f"Error during Tavily search: {e}")
         return {"results": []}
 
+def image_fingerprint_from_url(image_url: str, cache) -> Optional[Tuple[int, bytes]]:
+    """Cache fingerprint (hash, detail thumbnail) of a data-URL image (None for remote URLs or undecodable data)."""
+    if not image_url.startswith("data:"):
+        return None
+    try:
+        return cache.fingerprint(base64.b64decode(image_url.split(",", 1)[1]))
+    except Exception:
+        return None
+
 class CertificateInfo(BaseModel):
     certificate_name: str = Field(description="The exact, full name of the certificate or award found in the image")
 
@@ -99,8 +120,20 @@ def analyze_certificate(state: GraphState):
     """
     print("--- 1. Analyzing Certificate Image (using Gemini) ---")
     image_url = state['image_url']
-    
-    vision_model = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0)
+
+    # Repeat certificates are recognized by perceptual hash (confirmed by a detail thumbnail) and skip the vision call
+    cache = get_cache()
+    fingerprint = image_fingerprint_from_url(image_url, cache) if cache else None
+    image_hash = fingerprint[0] if fingerprint else None
+    if fingerprint:
+        known_name = cache.lookup_name(*fingerprint)
+        if known_name:
+            print(f"Recognized certificate from cache: {known_name}")
+            return _with_cached_summary({"certificate_name": known_name, "image_hash": image_hash})
+
+    from langchain_core.messages import HumanMessage
+
+    vision_model = get_chat_model(route("certificate.analyze_certificate"), temperature=0)
     structured_vision_model = vision_model.with_structured_output(CertificateInfo)
     
     prompt = HumanMessage(
@@ -119,12 +152,27 @@ def analyze_certificate(state: GraphState):
     try:
         response = structured_vision_model.invoke([prompt])
         print(f"Extracted Name: {response.certificate_name}")
-        return {"certificate_name": response.certificate_name}
+        if fingerprint and response.certificate_name.strip():
+            cache.store_name(fingerprint[0], response.certificate_name, fingerprint[1])
+        return _with_cached_summary({"certificate_name": response.certificate_name, "image_hash": image_hash})
     except Exception as e:
         print(f"Error analyzing image: {e}")
         return {"certificate_name": "Error: Could not analyze image."}
 
 
+def _with_cached_summary(update: dict) -> dict:
+    """Attach the stored summary for this certificate name, if any (the graph then ends early)."""
+    cache = get_cache()
+    if cache:
+        summary = cache.get_summary(update["certificate_name"])
+        if summary:
+            print("Using cached summary for this certificate.")
+            update["summary"] = summary
+    return update
+
+def route_after_analysis(state: GraphState) -> str:
+    return "done" if state.get("summary") else "search"
+
 def search_tavily(state: GraphState):
     """
     Node 2: Search Tavily for information about the certificate.
@@ -136,6 +184,13 @@ def search_tavily(state: GraphState):
         print("Skipping search due to previous error.")
         return {"search_results": []}
     
+    cache = get_cache()
+    if cache:
+        cached_results = cache.get_search(certificate_name)
+        if cached_results is not None:
+            print(f"Using {len(cached_results)} cached search results.")
+            return {"search_results": cached_results}
+
     query = f"what skills and knowledge are gained from completing the '{certificate_name}'"
     
     # --- MODIFIED SECTION ---
@@ -150,6 +205,8 @@ def search_tavily(state: GraphState):
     results_list = tavily_response_dict.get("results", [])
     
     print(f"Found {len(results_list)} search results.")
+    if cache and results_list:
+        cache.store_search(certificate_name, results_list)
     return {"search_results": results_list}
 
 def generate_summary(state: GraphState):
@@ -161,14 +218,16 @@ def generate_summary(state: GraphState):
     search_results = state['search_results']
     
     if "Error:" in certificate_name:
-        return {"summary": "Could not generate summary because the certificate name could not be extracted from the image."}
+        return {"error": "Could not generate summary because the certificate name could not be extracted from the image."}
 
     if not search_results:
-        return {"summary": f"Could not find any reliable information online about the skills gained from '{certificate_name}'."}
+        return {"error": f"Could not find any reliable information online about the skills gained from '{certificate_name}'."}
+
+    from langchain_core.messages import HumanMessage, SystemMessage
 
     context = "\n\n".join([f"Source URL: {res['url']}\nSnippet: {res['content']}" for res in search_results if 'url' in res and 'content' in res])
     
-    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.2)
+    llm = get_chat_model(route("certificate.generate_summary"), temperature=0.2)
     
     system_prompt = """
     You are an expert career and skills analyst. Your task is to provide a detailed summary of the skills, knowledge, and value a person has gained by completing a specific certificate.
@@ -198,36 +257,73 @@ def generate_summary(state: GraphState):
             HumanMessage(content=human_prompt)
         ])
         print("--- 4. Summary Generated ---")
+        cache = get_cache()
+        if cache and response.content:
+            cache.store_summary(certificate_name, response.content)
         return {"summary": response.content}
     except Exception as e:
         print(f"Error generating summary: {e}")
-        return {"summary": "An error occurred while generating the final summary."}
+        return {"error": f"An error occurred while generating the final summary: {e}"}
 
-# --- 5. Build the Graph ---
+# --- 5. Build the Graph (compiled on first use) ---
 
-workflow = StateGraph(GraphState)
+_app = None
 
-workflow.add_node("analyze_certificate", analyze_certificate)
-workflow.add_node("search_tavily", search_tavily)
-workflow.add_node("generate_summary", generate_summary)
+def get_workflow():
+    global _app
+    if _app is None:
+        from langgraph.graph import StateGraph, END
+        from instrumentation import instrument
 
-workflow.set_entry_point("analyze_certificate")
-workflow.add_edge("analyze_certificate", "search_tavily")
-workflow.add_edge("search_tavily", "generate_summary")
-workflow.add_edge("generate_summary", END)
+        workflow = StateGraph(GraphState)
 
-app = workflow.compile()
+        workflow.add_node("analyze_certificate", analyze_certificate)
+        workflow.add_node("search_tavily", search_tavily)
+        workflow.add_node("generate_summary", generate_summary)
 
-if __name__ == "__main__":
-    # Accept CLI path, fallback to default
-    local_image_path = sys.argv[1] if len(sys.argv) > 1 else "hello.png"
-    image_url = image_to_data_url(local_image_path)
-    if image_url:
-        inputs = {"image_url": image_url}
-        final_summary = ""
-        for event in app.stream(inputs, stream_mode="values"):
+        workflow.set_entry_point("analyze_certificate")
+        workflow.add_conditional_edges(
+            "analyze_certificate", route_after_analysis, {"search": "search_tavily", "done": END}
+        )
+        workflow.add_edge("search_tavily", "generate_summary")
+        workflow.add_edge("generate_summary", END)
+
+        _app = instrument(workflow.compile(), "certificate")
+    return _app
+
+def __getattr__(name):
+    # Keep `certificate.app` / `certificate.tavily_client` working without import-time setup
+    if name == "app":
+        return get_workflow()
+    if name == "tavily_client":
+        return get_tavily_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# --- 6. Runner ---
+
+def run_certificate_analysis(image_path: str, budget: Optional[float] = None) -> dict:
+    """
+    Run the certificate workflow on a local image and return the JSON-ready output (budget: seconds):
+    {"summary": ...}, or {"error": ...} when no summary could be generated.
+    """
+    check_api_keys()
+    image_url = image_to_data_url(image_path)
+    if not image_url:
+        return {"error": f"Could not process image at: {image_path}"}
+    final_summary = ""
+    error = ""
+    with deadline.within(budget):
+        for event in get_workflow().stream({"image_url": image_url}, stream_mode="values"):
             if "summary" in event and event["summary"]:
                 final_summary = event["summary"]
-        print(json.dumps({"summary": final_summary}))
-    else:
-        print(json.dumps({"error": f"Could not process image at: {local_image_path}"}))
\ No newline at end of file
+            if event.get("error"):
+                error = event["error"]
+    if error or not final_summary:
+        return {"error": error or "No summary was generated."}
+    return {"summary": final_summary}
+
+if __name__ == "__main__":
+    # Accept CLI path (plus optional --budget SECONDS), fallback to default
+    budget = deadline.budget_from_argv(sys.argv)
+    local_image_path = sys.argv[1] if len(sys.argv) > 1 else "hello.png"
+    print(json.dumps(run_certificate_analysis(local_image_path, budget=budget)))
\ No newline at end of file
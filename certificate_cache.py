@@ -0,0 +1,193 @@
+"""
+Recognition and result caches for certificate.py.
+
+- Image -> certificate_name: keyed by a 256-bit perceptual hash (image_loader.perceptual_hash).
+  Known images within CERT_HASH_MAX_DISTANCE bits of a new upload are only candidates:
+  certificates from the same template that differ only in the course title hash a few
+  bits apart. A candidate is reused only if its detail thumbnail
+  (image_loader.detail_thumbnail) also matches, i.e. no 8x8 tile differs by more than
+  CERT_TILE_MAX_DIFF on average. Re-encoded or rescaled copies pass, while a
+  different title fails.
+  Both fingerprints blank the recipient band (CERT_RECIPIENT_BAND, fractions of the image
+  height) first. This lets the same course certificate issued to another student match.
+- Normalized certificate name -> Tavily results, and -> final summary.
+
+Everything lives in one SQLite file.
+
+Configuration (environment):
+    CERTIFICATE_CACHE_PATH    SQLite file (default: .cache/certificate_cache.sqlite3 in the repo root)
+    CERTIFICATE_CACHE_TTL     Lifetime of search results and summaries in seconds (default: 7776000 = 90 days)
+    CERT_HASH_MAX_DISTANCE    Max differing hash bits (of 256) for a candidate match (default: 32)
+    CERT_TILE_MAX_DIFF        Max mean tile difference (0-255) to confirm a candidate (default: 8)
+    CERT_RECIPIENT_BAND       "top,bottom" height fractions ignored when fingerprinting (default: 0.30,0.52;
+                              "none" compares the whole image)
+    CERTIFICATE_CACHE_DISABLED  Set to 1 to bypass all three caches
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from image_loader import detail_thumbnail, hamming_distance, perceptual_hash, tile_difference
+from instrumentation import record_cache
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "certificate_cache.sqlite3")
+DEFAULT_TTL_SECONDS = 90 * 24 * 3600
+DEFAULT_MAX_DISTANCE = 32
+DEFAULT_MAX_TILE_DIFF = 8.0
+# Where common certificate templates print the recipient's name ("This certifies that / <name>")
+DEFAULT_RECIPIENT_BAND = (0.30, 0.52)
+
+
+def parse_band(value: str) -> Optional[Tuple[float, float]]:
+    """'0.30,0.52' -> (0.3, 0.52); 'none' or '' -> None."""
+    if not value.strip() or value.strip().lower() == "none":
+        return None
+    top, bottom = (float(part) for part in value.split(","))
+    if not 0 <= top < bottom <= 1:
+        raise ValueError(f"CERT_RECIPIENT_BAND must be 'top,bottom' with 0 <= top < bottom <= 1, got {value!r}")
+    return top, bottom
+
+
+def normalize_name(name: str) -> str:
+    """'Google  Data Analytics Professional Certificate.' -> 'google data analytics professional certificate'"""
+    return " ".join(re.sub(r"[^a-z0-9+#]+", " ", name.lower()).split())
+
+
+class CertificateCache:
+    def __init__(self, path: str = DEFAULT_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_distance: int = DEFAULT_MAX_DISTANCE, max_tile_diff: float = DEFAULT_MAX_TILE_DIFF,
+                 recipient_band: Optional[Tuple[float, float]] = DEFAULT_RECIPIENT_BAND):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = max_distance
+        self.max_tile_diff = max_tile_diff
+        self.recipient_band = recipient_band
+        self.counters: Dict[str, int] = {
+            "name_hits": 0, "name_misses": 0, "name_rejected": 0, "search_hits": 0, "search_misses": 0,
+            "summary_hits": 0, "summary_misses": 0,
+        }
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS image_names"
+            " (hash TEXT PRIMARY KEY, name TEXT NOT NULL, created_at REAL NOT NULL, thumbnail BLOB)"
+        )
+        if "thumbnail" not in {row[1] for row in self._conn.execute("PRAGMA table_info(image_names)")}:
+            # Rows from before thumbnails can't be confirmed, so they never match
+            self._conn.execute("ALTER TABLE image_names ADD COLUMN thumbnail BLOB")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS searches (name TEXT PRIMARY KEY, results TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries (name TEXT PRIMARY KEY, summary TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        # Hashes are few (one per distinct certificate image), so nearest-match is a linear scan in memory
+        self._hashes: List[Tuple[int, str, Optional[bytes]]] = [
+            (int(h, 16), name, thumbnail)
+            for h, name, thumbnail in self._conn.execute("SELECT hash, name, thumbnail FROM image_names")
+        ]
+
+    # --- Image hash -> certificate name ---
+
+    def fingerprint(self, data: bytes) -> Tuple[int, bytes]:
+        """Perceptual hash and detail thumbnail of an image, with the recipient band blanked."""
+        return (perceptual_hash(data, mask=self.recipient_band),
+                detail_thumbnail(data, mask=self.recipient_band))
+
+    def lookup_name(self, image_hash: int, thumbnail: bytes) -> Optional[str]:
+        """Name of a known image that is near by hash and confirmed by its detail thumbnail."""
+        with self._lock:
+            candidates = []
+            for known, name, known_thumbnail in self._hashes:
+                distance = hamming_distance(image_hash, known)
+                if distance <= self.max_distance:
+                    candidates.append((distance, name, known_thumbnail))
+        candidates.sort(key=lambda candidate: candidate[0])
+        match = None
+        for _, name, known_thumbnail in candidates:
+            if known_thumbnail is not None and tile_difference(thumbnail, known_thumbnail) <= self.max_tile_diff:
+                match = name
+                break
+        with self._lock:
+            if match is None and candidates:
+                self.counters["name_rejected"] += 1
+            self.counters["name_hits" if match else "name_misses"] += 1
+        record_cache(match is not None)
+        return match
+
+    def store_name(self, image_hash: int, name: str, thumbnail: bytes) -> None:
+        key = f"{image_hash:064x}"
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO image_names (hash, name, created_at, thumbnail) VALUES (?, ?, ?, ?)",
+                (key, name, time.time(), thumbnail),
+            )
+            self._conn.commit()
+            self._hashes = [entry for entry in self._hashes if entry[0] != image_hash] + [(image_hash, name, thumbnail)]
+
+    # --- Normalized name -> search results / summary ---
+
+    def _get(self, table: str, column: str, name: str, counter: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {column}, created_at FROM {table} WHERE name = ?", (normalize_name(name),)
+            ).fetchone()
+            fresh = row is not None and (not self.ttl_seconds or time.time() - row[1] <= self.ttl_seconds)
+            self.counters[f"{counter}_hits" if fresh else f"{counter}_misses"] += 1
+        record_cache(fresh)
+        return row[0] if fresh else None
+
+    def _put(self, table: str, column: str, name: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {table} (name, {column}, created_at) VALUES (?, ?, ?)",
+                (normalize_name(name), value, time.time()),
+            )
+            self._conn.commit()
+
+    def get_search(self, name: str) -> Optional[List[dict]]:
+        value = self._get("searches", "results", name, "search")
+        return json.loads(value) if value is not None else None
+
+    def store_search(self, name: str, results: List[dict]) -> None:
+        self._put("searches", "results", name, json.dumps(results))
+
+    def get_summary(self, name: str) -> Optional[str]:
+        return self._get("summaries", "summary", name, "summary")
+
+    def store_summary(self, name: str, summary: str) -> None:
+        self._put("summaries", "summary", name, summary)
+
+    def stats(self) -> dict:
+        return {**self.counters, "known_images": len(self._hashes), "path": self.path}
+
+
+_cache: Optional[CertificateCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[CertificateCache]:
+    """Process-wide cache, opened on first use (None when disabled)."""
+    global _cache
+    if os.getenv("CERTIFICATE_CACHE_DISABLED") == "1":
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CertificateCache(
+                    path=os.getenv("CERTIFICATE_CACHE_PATH", DEFAULT_PATH),
+                    ttl_seconds=float(os.getenv("CERTIFICATE_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+                    max_distance=int(os.getenv("CERT_HASH_MAX_DISTANCE", DEFAULT_MAX_DISTANCE)),
+                    max_tile_diff=float(os.getenv("CERT_TILE_MAX_DIFF", DEFAULT_MAX_TILE_DIFF)),
+                    recipient_band=(parse_band(os.environ["CERT_RECIPIENT_BAND"]) if "CERT_RECIPIENT_BAND" in os.environ
+                                    else DEFAULT_RECIPIENT_BAND),
+                )
+    return _cache
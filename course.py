@@ -1,16 +1,48 @@
 import os
 import re
+import sys
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import requests
-from bs4 import BeautifulSoup
-from typing import TypedDict
-from langgraph.graph import StateGraph, END
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import HumanMessage, SystemMessage
+from typing import TypedDict, Dict, List, Optional
+
+from llm_clients import get_chat_model
+from model_router import route
+from prompt_budget import to_prompt_json
+import instrumentation
+import deadline
 
 load_dotenv()
 
+# Skills scraped at once; Coursera is the bottleneck, not local CPU
+COURSE_FETCH_WORKERS = int(os.getenv("COURSE_FETCH_WORKERS", 5))
+# Set to 1 to have Gemini pick/format the top courses instead of using catalog ranking as-is
+COURSE_LLM_RANKING = os.getenv("COURSE_LLM_RANKING") == "1"
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_http_session():
+    """Keep-alive connection pool shared by the concurrent Coursera scrapes."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(COURSE_FETCH_WORKERS, 1))
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
 def smart_skill_query(skill):
+    # Known skills search by their canonical name ("k8s", "Kubernetes basics" -> "kubernetes")
+    import skill_taxonomy
+    canonical = skill_taxonomy.search_term(skill)
+    if canonical:
+        return canonical
     for sep in [':', '.', ',', '(']:
         if sep in skill:
             skill = skill.split(sep)[0]
@@ -37,63 +69,120 @@ def extract_skill_gaps(filename="skill_pathway.txt"):
         skills = ["Python", "Machine Learning", "Communication", "Presentation"]
     return skills[:5]
 
-def search_courses_coursera(query):
-    url = f"https://www.coursera.org/search?query={query.replace(' ', '+')}"
+# Courses kept per scrape for the local catalog; lookups still return the top 2
+CATALOG_SCRAPE_LIMIT = 10
+
+COURSERA_SEARCH_URL = "https://www.coursera.org/search"
+
+def scrape_coursera(query, limit=2):
+    """Scrape Coursera search results for query; network/HTTP errors propagate."""
+    url = f"{COURSERA_SEARCH_URL}?query={query.replace(' ', '+')}"
+    from bs4 import BeautifulSoup
+
     headers = {'User-Agent': 'Mozilla/5.0'}
     results = []
+    with instrumentation.http_timer():
+        resp = get_http_session().get(url, headers=headers, timeout=deadline.timeout(15))
+    resp.raise_for_status()
+    soup = BeautifulSoup(resp.text, 'html.parser')
+    seen = set()
+    # Use robust anchor selector; look for course "learn" URLs anywhere in anchors
+    for card in soup.select('a'):
+        href = card.get('href', '')
+        if href and '/learn/' in href:
+            title = card.get('aria-label', '') or card.get_text(strip=True)
+            if not href.startswith('http'):
+                href = "https://www.coursera.org" + href
+            platform = "Coursera"
+            desc = ""
+            if title and href and href not in seen:
+                seen.add(href)
+                results.append({'platform': platform, 'title': title, 'desc': desc, 'url': href})
+            if len(results) == limit:
+                break
+    return results
+
+def search_courses_coursera(query, limit=2):
     try:
-        resp = requests.get(url, headers=headers, timeout=15)
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        # Use robust anchor selector; look for course "learn" URLs anywhere in anchors
-        for card in soup.select('a'):
-            href = card.get('href', '')
-            if href and '/learn/' in href:
-                title = card.get('aria-label', '') or card.get_text(strip=True)
-                if not href.startswith('http'):
-                    href = "https://www.coursera.org" + href
-                platform = "Coursera"
-                desc = ""
-                if title and href:
-                    results.append({'platform': platform, 'title': title, 'desc': desc, 'url': href})
-                if len(results) == 2:
-                    break
-        return results
+        return scrape_coursera(query, limit)
     except Exception as e:
-        print("Coursera error:", e)
+        print("Coursera error:", e, file=sys.stderr)
         return []
 
+def lookup_courses(query, k=2):
+    """Top-k courses from the local catalog, scraping Coursera only on a miss or stale entry."""
+    from course_catalog import get_catalog
+    return get_catalog().lookup(query, lambda q: scrape_coursera(q, CATALOG_SCRAPE_LIMIT), k=k)
+
 class GraphState(TypedDict):
     gap_skills: list
     course_details: dict
     course_recommendations: str
 
+def format_courses(courses: List[dict]) -> str:
+    """Plain Markdown listing, used when the ranking call fails or skips a skill."""
+    return "\n".join(
+        f"- *{c['platform']}*: {c['title']}  \n  {c['desc']}  \n  {c['url']}" for c in courses[:2]
+    )
+
+def scrape_all_skills(skills: List[str]) -> Dict[str, List[dict]]:
+    """Look up every skill concurrently (catalog first, Coursera on misses); identical terms run once."""
+    terms = {skill: smart_skill_query(skill) for skill in skills}
+    unique_terms = list(dict.fromkeys(terms.values()))
+    workers = max(1, min(COURSE_FETCH_WORKERS, len(unique_terms)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = dict(zip(unique_terms, pool.map(instrumentation.bind(lookup_courses), unique_terms)))
+    for skill, term in terms.items():
+        print(f"Skill: {skill} | Search Term: {term} | Courses: {len(results[term])}", file=sys.stderr)
+    return {skill: results[term] for skill, term in terms.items()}
+
+def parse_ranking(text: str) -> Dict[str, str]:
+    text = text.strip()
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if not match:
+        return {}
+    try:
+        parsed = json.loads(match.group())
+    except json.JSONDecodeError:
+        return {}
+    return {k: v.strip() for k, v in parsed.items() if isinstance(v, str)} if isinstance(parsed, dict) else {}
+
+def rank_courses(courses_by_skill: Dict[str, List[dict]]) -> Dict[str, str]:
+    """One LLM call that picks and formats the top 2 courses for every skill at once."""
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    llm = get_chat_model(route("course.recommend_courses"), temperature=0)
+    payload = {skill: courses for skill, courses in courses_by_skill.items() if courses}
+    if not payload:
+        return {}
+    prompt = (
+        "For each skill below there is a list of scraped online courses "
+        "with platform, title, description, link. For every skill, pick the 2 most relevant and actionable "
+        "and format them in Markdown (platform, title, desc, url as requested).\n"
+        "Return ONLY a JSON object mapping each skill name exactly as given to its Markdown string."
+        "\n\n"
+        f"{to_prompt_json(payload, max_chars=300)}"
+    )
+    messages = [
+        SystemMessage(content="Select top 2 per skill and format (platform, title, description, url)."),
+        HumanMessage(content=prompt)
+    ]
+    return parse_ranking(llm.invoke(messages).content)
+
 def fetch_courses_node(state: GraphState):
     skills = state.get("gap_skills", [])
-    all_courses = {}
-    for skill in skills:
-        search_term = smart_skill_query(skill)
-        print(f"Skill: {skill} | Search Term: {search_term}")
-        courses = search_courses_coursera(search_term)
-        print("Scraped courses for Gemini:", courses)
-        llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0)
-        prompt = (
-            f"For '{search_term}', here is a list of scraped online courses "
-            "with platform, title, description, link. Pick the 2 most relevant and actionable. "
-            "Output in Markdown (platform, title, desc, url as requested)."
-            "\n\n"
-            f"{courses}"
-        )
-        messages = [
-            SystemMessage(content="Select top 2 and format (platform, title, description, url)."),
-            HumanMessage(content=prompt)
-        ]
+    courses_by_skill = scrape_all_skills(skills)
+    ranked = {}
+    # Catalog results are already BM25-ranked; the LLM pass only rewrites the Markdown
+    if COURSE_LLM_RANKING:
         try:
-            response = llm.invoke(messages)
-            all_courses[skill] = response.content.strip()
-        except Exception:
-            all_courses[skill] = "\n".join(
-                f"- *{c['platform']}*: {c['title']}  \n  {c['desc']}  \n  {c['url']}" for c in courses[:2]
-            )
+            ranked = rank_courses(courses_by_skill)
+        except Exception as e:
+            print("Course ranking error:", e, file=sys.stderr)
+    all_courses = {
+        skill: ranked.get(skill) or format_courses(courses_by_skill[skill])
+        for skill in skills
+    }
     return {"course_details": all_courses}
 
 def recommend_courses_node(state: GraphState):
@@ -104,20 +193,48 @@ def recommend_courses_node(state: GraphState):
         )
     }
 
-workflow = StateGraph(GraphState)
-workflow.add_node("fetch_courses", fetch_courses_node)
-workflow.add_node("recommend_courses", recommend_courses_node)
-workflow.set_entry_point("fetch_courses")
-workflow.add_edge("fetch_courses", "recommend_courses")
-workflow.add_edge("recommend_courses", END)
-app = workflow.compile()
-
-if _name_ == "_main_":
-    print("Extracting skills to improve from skill_pathway.txt...")
-    gap_skills = extract_skill_gaps("skill_pathway.txt")
-    print("Top 5 Skills identified for improvement:", gap_skills)
-    initial_state = {"gap_skills": gap_skills}
-    print("\nScraping course offerings and generating recommendations ...\n")
-    final_state = app.invoke(initial_state)
-    print("\n=== Recommended Courses ===\n")
-    print(final_state.get('course_recommendations', 'No recommendations output.'))
\ No newline at end of file
+_app = None
+
+def get_workflow():
+    global _app
+    if _app is None:
+        from langgraph.graph import StateGraph, END
+        from instrumentation import instrument
+
+        workflow = StateGraph(GraphState)
+        workflow.add_node("fetch_courses", fetch_courses_node)
+        workflow.add_node("recommend_courses", recommend_courses_node)
+        workflow.set_entry_point("fetch_courses")
+        workflow.add_edge("fetch_courses", "recommend_courses")
+        workflow.add_edge("recommend_courses", END)
+        _app = instrument(workflow.compile(), "course")
+    return _app
+
+def __getattr__(name):
+    # Keep `course.app` working without compiling the graph at import time
+    if name == "app":
+        return get_workflow()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def run_course_recommendations(gap_skills: List[str], budget: Optional[float] = None) -> dict:
+    """Run the course workflow for a list of skills and return the JSON-ready output (budget: seconds)."""
+    with deadline.within(budget):
+        final_state = get_workflow().invoke({"gap_skills": gap_skills})
+    return {
+        "gap_skills": gap_skills,
+        "course_details": final_state.get("course_details", {}),
+        "course_recommendations": final_state.get("course_recommendations", ""),
+    }
+
+if __name__ == "__main__":
+    # CLI usage: python course.py [skill_pathway.txt] [--budget SECONDS]
+    # Outputs JSON with gap_skills, course_details and course_recommendations; logs go to stderr
+    budget = deadline.budget_from_argv(sys.argv)
+    source = sys.argv[1] if len(sys.argv) > 1 else "skill_pathway.txt"
+    try:
+        gap_skills = extract_skill_gaps(source)
+    except Exception as e:
+        print(json.dumps({"error": f"Failed to read skill gaps: {e}"}))
+        sys.exit(1)
+    print(f"Skills identified for improvement: {gap_skills}", file=sys.stderr)
+    print(json.dumps(run_course_recommendations(gap_skills, budget=budget), ensure_ascii=False))
@@ -0,0 +1,208 @@
+"""
+Local course catalog for course.py.
+Courses scraped by course.search_courses_coursera are accumulated in a SQLite
+file and indexed by normalized tokens (title, description and the search
+terms that found them). Lookups are ranked with BM25 from an in-memory
+inverted index. Coursera is only scraped when a query has never been fetched,
+its last fetch is older than the TTL, or the index has no matching course.
+
+Configuration (environment):
+    COURSE_CATALOG_PATH   SQLite file (default: .cache/course_catalog.sqlite3 in the repo root)
+    COURSE_CATALOG_TTL    Seconds before a fetched query is re-scraped (default: 2592000 = 30 days)
+"""
+
+import os
+import re
+import sys
+import math
+import time
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional
+
+from instrumentation import record_cache
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "course_catalog.sqlite3")
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+_STOPWORDS = {"a", "an", "and", "the", "of", "for", "to", "in", "on", "with", "by", "from", "your", "course"}
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+class CourseCatalog:
+    """Persistent course store with an in-memory BM25 inverted index."""
+
+    def __init__(self, path: str = DEFAULT_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.counters: Dict[str, int] = {"hits": 0, "misses": 0, "stale": 0, "scrapes": 0}
+        self._lock = threading.RLock()
+        # Concurrent lookups of the same query share one scrape
+        self._query_locks: Dict[str, threading.Lock] = {}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS courses (
+                   url TEXT PRIMARY KEY,
+                   platform TEXT NOT NULL,
+                   title TEXT NOT NULL,
+                   description TEXT NOT NULL,
+                   terms TEXT NOT NULL,
+                   updated_at REAL NOT NULL
+               )"""
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS queries (query TEXT PRIMARY KEY, fetched_at REAL NOT NULL, results INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+        self._docs: Dict[str, dict] = {}
+        self._doc_len: Dict[str, int] = {}
+        self._doc_tokens: Dict[str, set] = {}
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._total_len = 0
+        for url, platform, title, desc, terms in self._conn.execute(
+            "SELECT url, platform, title, description, terms FROM courses"
+        ):
+            self._index({"platform": platform, "title": title, "desc": desc, "url": url}, terms)
+
+    # --- Index maintenance ---
+
+    def _index(self, course: dict, terms: str) -> None:
+        url = course["url"]
+        if url in self._docs:
+            for token in self._doc_tokens[url]:
+                self._postings[token].pop(url, None)
+            self._total_len -= self._doc_len[url]
+        tokens = tokenize(f"{course['title']} {course.get('desc', '')} {terms}")
+        counts = Counter(tokens)
+        for token, tf in counts.items():
+            self._postings[token][url] = tf
+        self._docs[url] = course
+        self._doc_tokens[url] = set(counts)
+        self._doc_len[url] = len(tokens)
+        self._total_len += len(tokens)
+
+    def add(self, query: str, courses: List[dict]) -> None:
+        """Store scraped courses, tagging each with the query that found it, and mark the query fetched."""
+        now = time.time()
+        with self._lock:
+            for course in courses:
+                url = course["url"]
+                row = self._conn.execute("SELECT terms FROM courses WHERE url = ?", (url,)).fetchone()
+                terms = set(row[0].split("|")) if row and row[0] else set()
+                terms.add(query)
+                terms_str = "|".join(sorted(terms))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO courses (url, platform, title, description, terms, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, course.get("platform", ""), course.get("title", ""), course.get("desc", ""), terms_str, now),
+                )
+                self._index(dict(course), terms_str.replace("|", " "))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO queries (query, fetched_at, results) VALUES (?, ?, ?)",
+                (query, now, len(courses)),
+            )
+            self._conn.commit()
+
+    # --- Search ---
+
+    def search(self, query: str, k: int = 2, require_all_terms: bool = False) -> List[dict]:
+        """BM25 top-k courses for query from the local index only."""
+        q_tokens = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            n_docs = len(self._docs)
+            if not n_docs or not q_tokens:
+                return []
+            avgdl = self._total_len / n_docs
+            scores: Dict[str, float] = defaultdict(float)
+            matched: Dict[str, int] = defaultdict(int)
+            for token in q_tokens:
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for url, tf in postings.items():
+                    norm = K1 * (1 - B + B * self._doc_len[url] / avgdl)
+                    scores[url] += idf * tf * (K1 + 1) / (tf + norm)
+                    matched[url] += 1
+            if require_all_terms:
+                scores = {url: s for url, s in scores.items() if matched[url] == len(q_tokens)}
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+            return [dict(self._docs[url], score=round(score, 4)) for url, score in ranked]
+
+    def _query_age(self, query: str) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute("SELECT fetched_at FROM queries WHERE query = ?", (query,)).fetchone()
+        return None if row is None else time.time() - row[0]
+
+    def _query_lock(self, query: str) -> threading.Lock:
+        # Created under the catalog lock so concurrent scrape threads get the same lock per query
+        with self._lock:
+            return self._query_locks.setdefault(query, threading.Lock())
+
+    def lookup(self, query: str, fetch: Callable[[str], List[dict]], k: int = 2) -> List[dict]:
+        """
+        Answer from the index when the query is fresh (or fully covered by indexed courses);
+        otherwise scrape with fetch(query), ingest the results and rank again.
+        """
+        with self._query_lock(query):
+            age = self._query_age(query)
+            fresh = age is not None and (not self.ttl_seconds or age <= self.ttl_seconds)
+            if fresh:
+                with self._lock:
+                    self.counters["hits"] += 1
+                record_cache(True)
+                return self.search(query, k)
+            if age is None:
+                covered = self.search(query, k, require_all_terms=True)
+                if len(covered) >= k:
+                    with self._lock:
+                        self.counters["hits"] += 1
+                    record_cache(True)
+                    return covered
+            with self._lock:
+                self.counters["misses" if age is None else "stale"] += 1
+                self.counters["scrapes"] += 1
+            record_cache(False)
+            try:
+                courses = fetch(query)
+            except Exception as e:
+                # Not recorded, so the next lookup retries the scrape
+                print(f"Course scrape failed for '{query}': {e}", file=sys.stderr)
+                return self.search(query, k)
+            self.add(query, courses)
+            # Stale queries keep serving their old courses when a re-scrape comes back empty
+            return self.search(query, k)
+
+    def stats(self) -> dict:
+        with self._lock:
+            queries = self._conn.execute("SELECT COUNT(*) FROM queries").fetchone()[0]
+            return {**self.counters, "courses": len(self._docs), "terms": len(self._postings),
+                    "queries": queries, "path": self.path}
+
+
+_catalog: Optional[CourseCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> CourseCatalog:
+    """Process-wide catalog, opened on first use."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = CourseCatalog(
+                    path=os.getenv("COURSE_CATALOG_PATH", DEFAULT_PATH),
+                    ttl_seconds=float(os.getenv("COURSE_CATALOG_TTL", DEFAULT_TTL_SECONDS)),
+                )
+    return _catalog
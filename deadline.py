@@ -0,0 +1,122 @@
+"""
+Request deadlines.
+within(seconds) sets a deadline for everything that runs in the current context.
+LangGraph runs sync nodes in threads that inherit the caller's context, so nodes
+see the deadline of the request that started the graph. Nested calls keep the
+earlier of the two deadlines.
+
+Blocking calls take their timeout from timeout(default), which caps the call's
+usual timeout at the time left and raises DeadlineExceeded once none is left.
+LLM calls get theirs from rate_limiter.py. Optional stages ask allows(seconds)
+first, and skip themselves (reported under "partial" in the result) when they
+would not finish in time.
+
+Every run_* entry point takes budget=<seconds>. CLIs accept --budget SECONDS and
+the worker reads "budget" from each request's args; both default to
+AGENT_BUDGET_SECONDS (unset: no deadline).
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import contextlib
+import contextvars
+from typing import List, Optional, Tuple, Union
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar("deadline", default=None)
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's deadline passed before a stage could run."""
+
+
+@contextlib.contextmanager
+def within(seconds: Optional[float]):
+    """Run the block with a deadline `seconds` from now (None: keep the current one, if any)."""
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + max(0.0, seconds)
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline (never negative), or None when there is none."""
+    deadline = _deadline.get()
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def check(stage: str = "") -> None:
+    """Raise DeadlineExceeded if the deadline has passed."""
+    if expired():
+        raise DeadlineExceeded(f"deadline exceeded before {stage}" if stage else "deadline exceeded")
+
+
+def allows(seconds: float) -> bool:
+    """Whether a stage expected to take `seconds` fits in the time left (always True without a deadline)."""
+    left = remaining()
+    return left is None or left >= seconds
+
+
+def timeout(default: Timeout) -> Timeout:
+    """
+    Timeout for one blocking call: `default` (seconds, or a requests-style (connect, read)
+    tuple) capped at the time left. Raises DeadlineExceeded when no time is left.
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded("deadline exceeded")
+    if isinstance(default, tuple):
+        return tuple(min(part, left) for part in default)
+    return min(default, left)
+
+
+def parse_budget(value, source: str = "budget") -> float:
+    """A budget in seconds: a finite, non-negative number. Raises ValueError naming `source` otherwise."""
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        seconds = math.nan
+    if not math.isfinite(seconds) or seconds < 0:
+        got = "nothing" if value is None else repr(value)
+        raise ValueError(f"{source} expects a number of seconds, got {got}")
+    return seconds
+
+
+def default_budget() -> Optional[float]:
+    """AGENT_BUDGET_SECONDS, or None (no deadline) when unset."""
+    env = os.getenv("AGENT_BUDGET_SECONDS")
+    return parse_budget(env, "AGENT_BUDGET_SECONDS") if env else None
+
+
+def budget_from_argv(argv: List[str]) -> Optional[float]:
+    """
+    Remove `--budget SECONDS` from argv (in place) and return it; AGENT_BUDGET_SECONDS otherwise.
+    An invalid value is a usage error: it prints the CLIs' usual JSON {"error": ...} and exits.
+    """
+    try:
+        if "--budget" in argv:
+            i = argv.index("--budget")
+            value = argv[i + 1] if i + 1 < len(argv) else None
+            del argv[i:i + 2]
+            return parse_budget(value, "--budget")
+        return default_budget()
+    except ValueError as e:
+        print(json.dumps({"error": f"Usage: {e}"}))
+        sys.exit(1)
@@ -1,30 +1,39 @@
-import requests
 import os
+import re
 import sys
 import json
-from bs4 import BeautifulSoup
+import time
+import hashlib
+import threading
 from dotenv import load_dotenv
-from langchain_core.tools import tool
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import HumanMessage, SystemMessage
-from langgraph.graph import StateGraph, END
-from typing import TypedDict
+from typing import TypedDict, Optional
+
+from llm_clients import get_chat_model
+from model_router import policy_for, route
+import instrumentation
+import deadline
 
 # 1. Load .env
 load_dotenv()
 
-# 2. Scrape profile tool (WITH DOCSTRING!)
-@tool
+# "api" (default) uses github_api.py with ETag revalidation; "html" scrapes the profile page
+GITHUB_FETCH_BACKEND = os.getenv("GITHUB_FETCH_BACKEND", "api")
+
+# 2. Scrape profile helper (plain function; HTTP/parsing libs are imported on first use)
 def scrape_profile_text(url: str) -> str:
     """
     Fetches the text content of a GitHub profile page.
     This is a simple scraper and may not get all dynamic content.
-    For a full, robust analysis, the GitHub API is recommended.
+    Used as the fallback when the API backend (fetch_profile_content) fails.
     """
+    import requests
+    from bs4 import BeautifulSoup
+
     headers = {
         "User-Agent": "Mozilla/5.0"
     }
-    response = requests.get(url, headers=headers)
+    with instrumentation.http_timer():
+        response = requests.get(url, headers=headers, timeout=deadline.timeout(15))
     response.raise_for_status()
     soup = BeautifulSoup(response.text, 'html.parser')
     main_content = soup.find('body')
@@ -35,26 +44,93 @@ def scrape_profile_text(url: str) -> str:
     else:
         return "Could not find main content."
 
+def fetch_profile_content(url: str) -> str:
+    """Structured profile text from the GitHub API, falling back to the HTML scraper."""
+    if GITHUB_FETCH_BACKEND == "api":
+        import github_api
+        try:
+            return github_api.profile_to_text(github_api.fetch_profile(url))
+        except Exception as e:
+            print(f"GitHub API fetch failed ({e}); falling back to HTML scrape", file=sys.stderr)
+    return scrape_profile_text(url)
+
 # 3. State
-class GraphState(TypedDict):
+class GraphState(TypedDict, total=False):
     github_url: str
     question: str
+    force_refresh: bool
     scraped_content: str
+    fingerprint: str
+    reused: bool
     analysis: str
 
+# 3b. Analysis store: fingerprint of (normalized profile content, question, prompt, model) -> analysis
+ANALYSIS_STORE_DIR = os.getenv(
+    "GITHUB_ANALYSIS_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "github_analysis")
+)
+
+def normalize_content(content: str) -> str:
+    """Canonical form of fetched profile content: sorted-key JSON for API data, collapsed whitespace otherwise."""
+    try:
+        return json.dumps(json.loads(content), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    except ValueError:
+        return re.sub(r"\s+", " ", content).strip()
+
+def content_fingerprint(content: str, question: str) -> str:
+    digest = hashlib.sha256()
+    for part in (ANALYSIS_MODEL, SYSTEM_PROMPT, question.strip(), normalize_content(content)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+def _analysis_path(fingerprint: str) -> str:
+    return os.path.join(ANALYSIS_STORE_DIR, f"{fingerprint[:32]}.json")
+
+def load_analysis(fingerprint: str) -> Optional[str]:
+    try:
+        with open(_analysis_path(fingerprint), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return entry.get("analysis") if entry.get("fingerprint") == fingerprint else None
+
+def save_analysis(fingerprint: str, analysis: str) -> None:
+    try:
+        os.makedirs(ANALYSIS_STORE_DIR, exist_ok=True)
+        path = _analysis_path(fingerprint)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": fingerprint, "created_at": time.time(), "analysis": analysis}, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Could not store GitHub analysis: {e}", file=sys.stderr)
+
 # 4. Fetch content node
 def fetch_content_node(state: GraphState):
     url = state['github_url']
-    content = scrape_profile_text.invoke({"url": url})
+    content = fetch_profile_content(url)
     return {"scraped_content": content}
 
-# 5. Analyze node
-def analyze_content_node(state: GraphState):
-    content = state['scraped_content']
-    question = state['question']
-    system_prompt = """
+# 5. Fingerprint node: reuse the stored analysis when the profile hasn't changed
+def fingerprint_node(state: GraphState):
+    fingerprint = content_fingerprint(state['scraped_content'], state['question'])
+    if not state.get('force_refresh'):
+        stored = load_analysis(fingerprint)
+        instrumentation.record_cache(stored is not None)
+        if stored is not None:
+            return {"fingerprint": fingerprint, "analysis": stored, "reused": True}
+    return {"fingerprint": fingerprint, "reused": False}
+
+def route_after_fingerprint(state: GraphState) -> str:
+    return "done" if state.get('reused') else "analyze"
+
+# 6. Analyze node
+# The policy's preferred model identifies stored analyses; each call is routed (fast mode, latency, size)
+ANALYSIS_MODEL = policy_for("github").model
+SYSTEM_PROMPT = """
     You are a career-oriented GitHub profile and personal branding analyst.
-You are given the scraped text content of a GitHub user's profile.
+You are given the content of a GitHub user's profile (structured JSON from the GitHub API: profile fields, pinned/top repositories, language percentages and profile README; or scraped page text).
 Your task is to generate a deep, humanized, and descriptive review that not only analyzes the technical aspects of the GitHub profile but also infers personality traits, learning attitude, career direction, and growth trajectory from the available data.
 
 Your analysis should be comprehensive, narrative-driven, and personalized, not robotic or surface-level.
@@ -141,30 +217,78 @@ You may use mild storytelling language (e.g., “Harshit’s work reveals a buil
 
 Keep it grounded in the evidence provided — no wild assumptions.”
     """
-    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0)
+
+def analyze_content_node(state: GraphState):
+    content = state['scraped_content']
+    question = state['question']
+    from langchain_core.messages import HumanMessage, SystemMessage
+    import llm_cache
+
     messages = [
-        SystemMessage(content=system_prompt),
+        SystemMessage(content=SYSTEM_PROMPT),
         HumanMessage(content=f"Profile:\n{content}\n\nSpecific query: {question}")
     ]
-    response = llm.invoke(messages)
-    return {"analysis": response.content}
-
-# 6. Wire the graph
-workflow = StateGraph(GraphState)
-workflow.add_node("fetcher", fetch_content_node)
-workflow.add_node("analyzer", analyze_content_node)
-workflow.set_entry_point("fetcher")
-workflow.add_edge("fetcher", "analyzer")
-workflow.add_edge("analyzer", END)
-app = workflow.compile()
-
-if __name__ == "__main__":
-    # Accept URL via CLI arg; fallback to prompt
-    github_url_to_analyze = sys.argv[1].strip() if len(sys.argv) > 1 else input("Enter GitHub profile URL: ").strip()
-    question = "Give me a detailed, professional analysis of this user."
+    llm = get_chat_model(route("github.analyze_content_node", len(SYSTEM_PROMPT) + len(messages[1].content)),
+                         temperature=0)
+    # At temperature 0 the same messages hit the LLM cache; a forced refresh must reach the model
+    with llm_cache.bypass(bool(state.get('force_refresh'))):
+        response = llm.invoke(messages)
+    if state.get('fingerprint'):
+        save_analysis(state['fingerprint'], response.content)
+    return {"analysis": response.content, "reused": False}
+
+# 7. Wire the graph (compiled on first use)
+_app = None
+
+def get_workflow():
+    global _app
+    if _app is None:
+        from langgraph.graph import StateGraph, END
+        from instrumentation import instrument
+
+        workflow = StateGraph(GraphState)
+        workflow.add_node("fetcher", fetch_content_node)
+        workflow.add_node("fingerprint", fingerprint_node)
+        workflow.add_node("analyzer", analyze_content_node)
+        workflow.set_entry_point("fetcher")
+        workflow.add_edge("fetcher", "fingerprint")
+        workflow.add_conditional_edges(
+            "fingerprint", route_after_fingerprint, {"analyze": "analyzer", "done": END}
+        )
+        workflow.add_edge("analyzer", END)
+        _app = instrument(workflow.compile(), "github")
+    return _app
+
+def __getattr__(name):
+    # Keep `github.app` working without compiling the graph at import time
+    if name == "app":
+        return get_workflow()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# 8. Runner
+DEFAULT_QUESTION = "Give me a detailed, professional analysis of this user."
+
+def run_github_analysis(github_url: str, question: str = DEFAULT_QUESTION, force_refresh: bool = False,
+                        budget: Optional[float] = None) -> dict:
+    """
+    Analyze a GitHub profile URL and return the JSON-ready output.
+    An unchanged profile returns its stored analysis ("reused": true) unless force_refresh is set.
+    budget (seconds) caps the GitHub requests and the analysis call.
+    """
     inputs = {
-        "github_url": github_url_to_analyze,
-        "question": question
+        "github_url": github_url.strip(),
+        "question": question,
+        "force_refresh": force_refresh,
     }
-    final_state = app.invoke(inputs)
-    print(json.dumps({"analysis": final_state.get('analysis', '')}))
\ No newline at end of file
+    with deadline.within(budget):
+        final_state = get_workflow().invoke(inputs)
+    return {"analysis": final_state.get('analysis', ''), "reused": bool(final_state.get('reused'))}
+
+if __name__ == "__main__":
+    # Accept URL via CLI arg; fallback to prompt. --force-refresh regenerates even if the profile is unchanged.
+    # --budget SECONDS sets a deadline for the whole run.
+    force = "--force-refresh" in sys.argv
+    args = [a for a in sys.argv[1:] if a != "--force-refresh"]
+    budget = deadline.budget_from_argv(args)
+    github_url_to_analyze = args[0].strip() if args else input("Enter GitHub profile URL: ").strip()
+    print(json.dumps(run_github_analysis(github_url_to_analyze, force_refresh=force, budget=budget)))
\ No newline at end of file
@@ -0,0 +1,243 @@
+"""
+GitHub REST API fetcher for github.py.
+Pulls the user profile, top repositories, language stats and the profile
+README as structured data over one pooled session with timeouts. Every GET
+response is cached on disk with its ETag/Last-Modified and revalidated with
+If-None-Match / If-Modified-Since. An unchanged profile costs 304s, which
+don't count against the authenticated rate limit, instead of a full page
+download and parse.
+
+Configuration (environment):
+    GITHUB_TOKEN            Optional token (raises the rate limit, enables pinned repositories)
+    GITHUB_API_CACHE_DIR    ETag cache directory (default: .cache/github_api in the repo root)
+"""
+
+import os
+import re
+import json
+import base64
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import instrumentation
+import deadline
+
+API_URL = "https://api.github.com"
+GRAPHQL_URL = "https://api.github.com/graphql"
+CACHE_DIR = os.getenv(
+    "GITHUB_API_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "github_api"),
+)
+TIMEOUT = (5, 15)  # (connect, read) seconds
+TOP_REPOS = 8
+README_CHARS = 3000
+
+_session = None
+_session_lock = threading.Lock()
+_stats_lock = threading.Lock()
+
+
+class GitHubAPIError(Exception):
+    pass
+
+
+def get_http_session():
+    """Keep-alive session shared by every GitHub API call."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=8))
+                session.headers.update({
+                    "Accept": "application/vnd.github+json",
+                    "X-GitHub-Api-Version": "2022-11-28",
+                    "User-Agent": "skillsync-github-analyzer",
+                })
+                token = os.getenv("GITHUB_TOKEN")
+                if token:
+                    session.headers["Authorization"] = f"Bearer {token}"
+                _session = session
+    return _session
+
+
+def parse_username(url_or_name: str) -> str:
+    """Accept a profile URL (https://github.com/<user>[/...]) or a bare username."""
+    text = url_or_name.strip()
+    match = re.match(r"^(?:https?://)?(?:www\.)?github\.com/([^/?#]+)", text, re.IGNORECASE)
+    username = match.group(1) if match else text.strip("/")
+    if not re.fullmatch(r"[A-Za-z0-9](?:[A-Za-z0-9-]{0,38})", username):
+        raise ValueError(f"Not a GitHub profile URL or username: {url_or_name!r}")
+    return username
+
+# ============================================================
+# CONDITIONAL GET WITH ON-DISK ETAG CACHE
+# ============================================================
+
+def _cache_path(url: str) -> str:
+    return os.path.join(CACHE_DIR, hashlib.sha256(url.encode("utf-8")).hexdigest()[:32] + ".json")
+
+
+def _load_entry(url: str) -> Optional[dict]:
+    try:
+        with open(_cache_path(url), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_entry(url: str, entry: dict) -> None:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _cache_path(url)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(tmp, path)
+
+
+def api_get(path: str, params: Optional[Dict] = None, stats: Optional[Dict] = None):
+    """GET an API path, revalidating a cached copy; returns parsed JSON (None on 404)."""
+    url = f"{API_URL}{path}"
+    if params:
+        url += "?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+    cached = _load_entry(url)
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    with instrumentation.http_timer():
+        response = get_http_session().get(url, headers=headers, timeout=deadline.timeout(TIMEOUT))
+    if stats is not None:
+        with _stats_lock:
+            stats[str(response.status_code)] = stats.get(str(response.status_code), 0) + 1
+    if response.status_code == 304 and cached:
+        instrumentation.record_cache(True)
+        return cached["body"]
+    if response.status_code == 404:
+        return None
+    if response.status_code in (403, 429) and response.headers.get("X-RateLimit-Remaining") == "0":
+        raise GitHubAPIError("GitHub API rate limit exceeded (set GITHUB_TOKEN to raise it)")
+    if response.status_code >= 400:
+        raise GitHubAPIError(f"GitHub API {response.status_code} for {path}")
+
+    body = response.json()
+    if response.headers.get("ETag") or response.headers.get("Last-Modified"):
+        _save_entry(url, {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "body": body,
+        })
+    return body
+
+
+def fetch_pinned_repos(username: str) -> List[str]:
+    """Pinned repository names via GraphQL (requires GITHUB_TOKEN; GraphQL has no ETags)."""
+    if not os.getenv("GITHUB_TOKEN"):
+        return []
+    query = """query($login: String!) { user(login: $login) { pinnedItems(first: 6, types: REPOSITORY) {
+        nodes { ... on Repository { name } } } } }"""
+    try:
+        with instrumentation.http_timer():
+            response = get_http_session().post(
+                GRAPHQL_URL, json={"query": query, "variables": {"login": username}},
+                timeout=deadline.timeout(TIMEOUT)
+            )
+        response.raise_for_status()
+        nodes = (((response.json().get("data") or {}).get("user") or {}).get("pinnedItems") or {}).get("nodes") or []
+        return [n["name"] for n in nodes if n and n.get("name")]
+    except Exception:
+        return []
+
+# ============================================================
+# PROFILE ASSEMBLY
+# ============================================================
+
+def _repo_summary(repo: dict) -> dict:
+    return {
+        "name": repo.get("name"),
+        "description": repo.get("description"),
+        "language": repo.get("language"),
+        "topics": repo.get("topics") or [],
+        "stars": repo.get("stargazers_count", 0),
+        "forks": repo.get("forks_count", 0),
+        "pushed_at": repo.get("pushed_at"),
+        "homepage": repo.get("homepage") or None,
+    }
+
+
+def fetch_profile(url_or_name: str) -> Dict:
+    """Structured profile: user fields, pinned/top repositories, language bytes and README excerpt."""
+    username = parse_username(url_or_name)
+    stats: Dict[str, int] = {}
+    user = api_get(f"/users/{username}", stats=stats)
+    if user is None:
+        raise GitHubAPIError(f"GitHub user not found: {username}")
+
+    repos = api_get(f"/users/{username}/repos", {"per_page": 100, "sort": "pushed"}, stats=stats) or []
+    own = [r for r in repos if not r.get("fork")]
+    pinned = fetch_pinned_repos(username)
+    by_name = {r["name"]: r for r in own}
+    top = [by_name[n] for n in pinned if n in by_name]
+    for repo in sorted(own, key=lambda r: (r.get("stargazers_count", 0), r.get("pushed_at") or ""), reverse=True):
+        if len(top) >= TOP_REPOS:
+            break
+        if repo not in top:
+            top.append(repo)
+
+    def repo_languages(repo):
+        return api_get(f"/repos/{username}/{repo['name']}/languages", stats=stats) or {}
+
+    def profile_readme():
+        readme = api_get(f"/repos/{username}/{username}/readme", stats=stats)
+        if not readme or readme.get("encoding") != "base64":
+            return None
+        return base64.b64decode(readme["content"]).decode("utf-8", "replace")[:README_CHARS]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        readme_future = pool.submit(instrumentation.bind(profile_readme))
+        language_maps = list(pool.map(instrumentation.bind(repo_languages), top))
+
+    languages: Dict[str, int] = {}
+    for mapping in language_maps:
+        for language, size in mapping.items():
+            languages[language] = languages.get(language, 0) + size
+    total = sum(languages.values()) or 1
+
+    return {
+        "user": {
+            "login": user.get("login"),
+            "name": user.get("name"),
+            "bio": user.get("bio"),
+            "company": user.get("company"),
+            "location": user.get("location"),
+            "blog": user.get("blog") or None,
+            "hireable": user.get("hireable"),
+            "public_repos": user.get("public_repos"),
+            "followers": user.get("followers"),
+            "following": user.get("following"),
+            "created_at": user.get("created_at"),
+        },
+        "pinned": pinned,
+        "top_repositories": [_repo_summary(r) for r in top],
+        "original_repo_count": len(own),
+        "forked_repo_count": len(repos) - len(own),
+        "languages": {
+            lang: round(100.0 * size / total, 1)
+            for lang, size in sorted(languages.items(), key=lambda item: -item[1])
+        },
+        "profile_readme": readme_future.result(),
+        "http": stats,
+    }
+
+
+def profile_to_text(profile: Dict) -> str:
+    """Compact text handed to the analyzer in place of scraped page text."""
+    data = {k: v for k, v in profile.items() if k != "http"}
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,51 @@
+"""
+Node-level streaming for LangGraph workflows.
+Turns graph.stream(..., stream_mode="updates") into one JSON-ready event per
+completed node, so callers can render partial results while later nodes run.
+
+Event shapes (one JSON object per line on the CLI):
+    {"event": "node", "node": "<name>", "elapsed_ms": 812.4, "output": {...state keys written...}}
+    {"event": "error", "elapsed_ms": 1530.2, "error": "..."}
+    {"event": "done", "elapsed_ms": 30211.7}
+"""
+
+import sys
+import json
+import time
+from typing import Any, Dict, Iterator
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert node output (pydantic models, nested containers) into JSON-serializable data."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if isinstance(value, dict):
+        return {k: to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    return value
+
+
+def stream_node_updates(graph, inputs: Dict) -> Iterator[Dict]:
+    """Run a compiled graph and yield an event as each node finishes."""
+    start = time.perf_counter()
+
+    def elapsed() -> float:
+        return round((time.perf_counter() - start) * 1000, 1)
+
+    try:
+        for chunk in graph.stream(inputs, stream_mode="updates"):
+            for node, update in chunk.items():
+                yield {"event": "node", "node": node, "elapsed_ms": elapsed(), "output": to_jsonable(update or {})}
+    except Exception as e:
+        yield {"event": "error", "elapsed_ms": elapsed(), "error": str(e)}
+        return
+    yield {"event": "done", "elapsed_ms": elapsed()}
+
+
+def emit_jsonl(events: Iterator[Dict], stream=None) -> None:
+    """Write events as JSON lines, flushing each so consumers see it immediately."""
+    stream = stream or sys.stdout
+    for event in events:
+        stream.write(json.dumps(event, ensure_ascii=False) + "\n")
+        stream.flush()
@@ -0,0 +1,190 @@
+"""
+Shared image ingestion for the vision agents (resume, transcript, certificate).
+
+- The format is detected from magic bytes, not the file extension.
+- Files already in a format Gemini accepts and within the pixel budget are sent
+  as their original bytes (no decode, no re-encode). Accepted formats PIL can't
+  read (HEIC/HEIF without pillow-heif) are sent unchanged, size unknown.
+- Oversized images are downscaled to the budget; unsupported formats are converted.
+  Only those two cases decode and re-encode the image.
+
+Configuration (environment):
+    IMAGE_MAX_SIDE     Longest side in pixels after downscaling (default: 2048)
+    IMAGE_MAX_PIXELS   Total pixel budget (default: 4194304, i.e. 2048 x 2048)
+"""
+
+import os
+import base64
+from io import BytesIO
+from typing import NamedTuple, Optional, Tuple
+
+DEFAULT_MAX_SIDE = int(os.getenv("IMAGE_MAX_SIDE", 2048))
+DEFAULT_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", 2048 * 2048))
+
+# Formats the Gemini vision API accepts as-is
+ACCEPTED_MIME_TYPES = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+    "heic": "image/heic",
+    "heif": "image/heif",
+}
+
+# Formats PIL can encode for the re-encode path
+_PIL_FORMATS = {"png": "PNG", "jpeg": "JPEG", "webp": "WEBP"}
+
+
+class LoadedImage(NamedTuple):
+    data: bytes
+    mime_type: str
+    width: Optional[int]
+    height: Optional[int]
+    reencoded: bool
+
+    def to_data_uri(self) -> str:
+        return f"data:{self.mime_type};base64,{base64.b64encode(self.data).decode('utf-8')}"
+
+
+def sniff_format(data: bytes) -> Optional[str]:
+    """Identify an image format from its leading bytes."""
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if data.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    if data[4:8] == b"ftyp":
+        brand = data[8:12]
+        if brand in (b"heic", b"heix", b"heim", b"heis"):
+            return "heic"
+        if brand in (b"mif1", b"msf1", b"heif"):
+            return "heif"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if data.startswith(b"BM"):
+        return "bmp"
+    if data[:4] in (b"II*\x00", b"MM\x00*"):
+        return "tiff"
+    return None
+
+
+def _fits(width: int, height: int, max_side: int, max_pixels: int) -> bool:
+    return max(width, height) <= max_side and width * height <= max_pixels
+
+
+def _target_size(width: int, height: int, max_side: int, max_pixels: int):
+    scale = min(1.0, max_side / max(width, height), (max_pixels / float(width * height)) ** 0.5)
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def load_image(path: str, max_side: int = DEFAULT_MAX_SIDE, max_pixels: int = DEFAULT_MAX_PIXELS) -> LoadedImage:
+    """Read an image file and return model-ready bytes, re-encoding only when necessary."""
+    with open(path, "rb") as f:
+        data = f.read()
+    return load_image_bytes(data, max_side=max_side, max_pixels=max_pixels)
+
+
+def load_image_bytes(data: bytes, max_side: int = DEFAULT_MAX_SIDE, max_pixels: int = DEFAULT_MAX_PIXELS) -> LoadedImage:
+    fmt = sniff_format(data)
+
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    # Image.open only parses the header here; pixels are decoded lazily
+    try:
+        image = Image.open(BytesIO(data))
+    except UnidentifiedImageError:
+        # PIL can't read HEIC/HEIF without the pillow-heif plugin; Gemini accepts them as-is
+        if fmt in ACCEPTED_MIME_TYPES:
+            return LoadedImage(data, ACCEPTED_MIME_TYPES[fmt], None, None, reencoded=False)
+        raise
+    width, height = image.size
+    if fmt in ACCEPTED_MIME_TYPES and _fits(width, height, max_side, max_pixels):
+        return LoadedImage(data, ACCEPTED_MIME_TYPES[fmt], width, height, reencoded=False)
+
+    # Re-encode path: apply EXIF orientation before resizing so it isn't lost
+    image = ImageOps.exif_transpose(image)
+    width, height = image.size
+    if not _fits(width, height, max_side, max_pixels):
+        image.draft("RGB", _target_size(width, height, max_side, max_pixels))  # fast JPEG DCT scaling
+        image = image.resize(_target_size(*image.size, max_side, max_pixels), Image.LANCZOS)
+
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+    if fmt in _PIL_FORMATS:
+        out_fmt = fmt
+    elif has_alpha or image.mode in ("1", "L", "P"):
+        out_fmt = "png"
+    else:
+        out_fmt = "jpeg"
+
+    if out_fmt == "jpeg" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    elif out_fmt == "png" and image.mode not in ("1", "L", "LA", "P", "RGB", "RGBA"):
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    buffered = BytesIO()
+    save_kwargs = {"quality": 90, "optimize": True} if out_fmt == "jpeg" else {}
+    if out_fmt == "webp":
+        save_kwargs = {"quality": 90}
+    image.save(buffered, format=_PIL_FORMATS[out_fmt], **save_kwargs)
+    return LoadedImage(buffered.getvalue(), ACCEPTED_MIME_TYPES[out_fmt], image.width, image.height, reencoded=True)
+
+
+def image_to_data_uri(path: str, max_side: int = DEFAULT_MAX_SIDE, max_pixels: int = DEFAULT_MAX_PIXELS) -> str:
+    """Convenience wrapper: load an image file and return it as a base64 data URI."""
+    return load_image(path, max_side=max_side, max_pixels=max_pixels).to_data_uri()
+
+
+def _grayscale(data: bytes, draft_size: int, mask: Optional[Tuple[float, float]] = None):
+    """Decode to grayscale (EXIF-oriented), with the rows between mask=(top, bottom) height fractions blanked."""
+    from PIL import Image, ImageOps
+
+    image = ImageOps.exif_transpose(Image.open(BytesIO(data)))
+    image.draft("L", (draft_size, draft_size))
+    image = image.convert("L")
+    if mask:
+        top, bottom = (int(round(fraction * image.height)) for fraction in mask)
+        image.paste(255, (0, top, image.width, bottom))
+    return image
+
+
+def perceptual_hash(data: bytes, size: int = 16, mask: Optional[Tuple[float, float]] = None) -> int:
+    """
+    Difference hash (dHash) of an image: size*size bits comparing adjacent grayscale pixels.
+    Robust to re-encoding, rescaling and mild compression; compare hashes with hamming_distance.
+    mask blanks a horizontal band (fractions of the height) that should not count, e.g. a name line.
+    """
+    from PIL import Image
+
+    pixels = _grayscale(data, size * 4, mask).resize((size + 1, size), Image.LANCZOS).tobytes()
+    value = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def detail_thumbnail(data: bytes, size: int = 160, mask: Optional[Tuple[float, float]] = None) -> bytes:
+    """
+    size x size grayscale pixels of an image, fine enough to show text differences.
+    Used to confirm a perceptual-hash match with tile_difference; mask as in perceptual_hash.
+    """
+    from PIL import Image
+
+    return _grayscale(data, size * 4, mask).resize((size, size), Image.LANCZOS).tobytes()
+
+
+def tile_difference(a: bytes, b: bytes, size: int = 160, tile: int = 8) -> float:
+    """
+    Largest mean absolute difference (0-255) over tile x tile blocks of two detail thumbnails.
+    Re-encoding or rescaling changes every block a little; different text changes some blocks a lot.
+    """
+    from PIL import Image, ImageChops
+
+    diff = ImageChops.difference(Image.frombytes("L", (size, size), a), Image.frombytes("L", (size, size), b))
+    # BOX resampling by a whole factor averages each tile exactly
+    return float(diff.resize((size // tile, size // tile), Image.BOX).getextrema()[1])
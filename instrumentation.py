@@ -0,0 +1,304 @@
+"""
+Per-node metrics for every compiled LangGraph graph.
+instrument(graph, name) attaches one shared callback handler to a compiled
+graph. For each node run it records wall time, LLM calls/latency/tokens, LLM
+cache hits, plus the external HTTP time, retries and cache hits that code inside
+the node reports through record_http() / record_retry() / record_cache().
+A record is emitted per node and a summary record per graph run.
+
+Events are attributed through LangChain's run tree. Inside a node,
+var_child_runnable_config points at the node's run (or a child run of it), so no
+state has to be threaded through the agents. Work done in helper threads is
+attributed when the task was submitted via bind().
+
+    {"type": "node", "graph": "skillpath", "node": "gap_analyzer", "run_id": "...", "wall_ms": 812.4,
+     "llm_calls": 1, "llm_ms": 790.2, "input_tokens": 431, "output_tokens": 96, "retries": 0,
+     "http_calls": 0, "http_ms": 0.0, "cache_hits": 0, "cache_misses": 1}
+    {"type": "run", "graph": "skillpath", "run_id": "...", "wall_ms": 30211.7, "nodes": 5, ...totals...}
+
+Configuration (environment):
+    AGENT_METRICS       "stderr", or a file path to append JSON lines to (unset: no records)
+    AGENT_METRICS_PROM  Prometheus textfile-collector path, rewritten after every graph run
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import contextvars
+from typing import Any, Dict, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+import token_usage
+
+COUNTERS = (
+    "llm_calls", "llm_ms", "input_tokens", "output_tokens", "retries",
+    "http_calls", "http_ms", "cache_hits", "cache_misses",
+)
+
+_write_lock = threading.Lock()
+_prom_lock = threading.Lock()
+# (graph, node) -> accumulated counters for the Prometheus textfile; node "" holds whole runs
+_prom_totals: Dict[tuple, Dict[str, float]] = {}
+
+
+def _new_counters() -> Dict[str, float]:
+    return {name: 0 for name in COUNTERS}
+
+# ============================================================
+# 1. SINKS
+# ============================================================
+
+def emit(record: dict) -> None:
+    """Write one record to the configured sink (AGENT_METRICS)."""
+    target = os.getenv("AGENT_METRICS")
+    if not target:
+        return
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    with _write_lock:
+        if target == "stderr":
+            sys.stderr.write(line)
+            sys.stderr.flush()
+        else:
+            with open(target, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+def _prom_add(graph: str, node: str, wall_ms: float, counters: Dict[str, float], error: bool) -> None:
+    with _prom_lock:
+        totals = _prom_totals.setdefault((graph, node), {"runs": 0, "errors": 0, "wall_ms": 0, **_new_counters()})
+        totals["runs"] += 1
+        totals["errors"] += int(error)
+        totals["wall_ms"] += wall_ms
+        for name in COUNTERS:
+            totals[name] += counters[name]
+
+
+_PROM_METRICS = (
+    # (metric, source field, scale, help)
+    ("agent_runs_total", "runs", 1, "Completed runs"),
+    ("agent_errors_total", "errors", 1, "Runs that raised"),
+    ("agent_wall_seconds_total", "wall_ms", 0.001, "Wall time"),
+    ("agent_llm_calls_total", "llm_calls", 1, "Chat model calls"),
+    ("agent_llm_seconds_total", "llm_ms", 0.001, "Time spent in chat model calls"),
+    ("agent_input_tokens_total", "input_tokens", 1, "LLM input tokens (cache hits excluded)"),
+    ("agent_output_tokens_total", "output_tokens", 1, "LLM output tokens (cache hits excluded)"),
+    ("agent_retries_total", "retries", 1, "Retried external calls"),
+    ("agent_http_calls_total", "http_calls", 1, "External HTTP calls"),
+    ("agent_http_seconds_total", "http_ms", 0.001, "Time spent in external HTTP calls"),
+    ("agent_cache_hits_total", "cache_hits", 1, "Cache hits (LLM and result caches)"),
+    ("agent_cache_misses_total", "cache_misses", 1, "Cache misses"),
+)
+
+
+def totals() -> Dict[str, Dict[str, dict]]:
+    """Accumulated counters per graph: {"graph": {"": whole runs, "<node>": per node}}."""
+    with _prom_lock:
+        out: Dict[str, Dict[str, dict]] = {}
+        for (graph, node), values in _prom_totals.items():
+            out.setdefault(graph, {})[node] = {k: round(v, 1) for k, v in values.items()}
+    return out
+
+
+def write_prometheus(path: str) -> None:
+    """Atomically rewrite the textfile with per-graph (node="") and per-node counters."""
+    with _prom_lock:
+        snapshot = {key: dict(value) for key, value in _prom_totals.items()}
+    lines = []
+    for metric, field, scale, help_text in _PROM_METRICS:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for (graph, node), values in sorted(snapshot.items()):
+            value = values[field] * scale
+            lines.append(f'{metric}{{graph="{graph}",node="{node}"}} {round(value, 6)}')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp, path)
+
+# ============================================================
+# 2. CALLBACK HANDLER
+# ============================================================
+
+class _Run:
+    __slots__ = ("graph", "node", "run_id", "started", "counters", "nodes")
+
+    def __init__(self, graph: str, node: Optional[str], run_id):
+        self.graph = graph
+        self.node = node
+        self.run_id = run_id
+        self.started = time.perf_counter()
+        self.counters = _new_counters()
+        self.nodes = 0
+
+
+class MetricsHandler(BaseCallbackHandler):
+    """Tracks graph runs, their node runs and the LLM calls beneath them."""
+
+    run_inline = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._graph_names = set()
+        self._parents: Dict[Any, Any] = {}    # run_id -> parent_run_id, for every live run
+        self._scopes: Dict[Any, _Run] = {}    # run_id -> graph or node run being measured
+        self._llm: Dict[Any, tuple] = {}      # run_id -> (start, prompt chars)
+
+    def register(self, name: str) -> None:
+        with self._lock:
+            self._graph_names.add(name)
+
+    def scope_for(self, run_id) -> Optional[_Run]:
+        """Nearest node run (or, outside any node, graph run) enclosing run_id."""
+        with self._lock:
+            while run_id is not None:
+                scope = self._scopes.get(run_id)
+                if scope is not None:
+                    return scope
+                run_id = self._parents.get(run_id)
+        return None
+
+    def _add(self, run_id, **deltas) -> None:
+        node = self.scope_for(run_id)
+        if node is None:
+            return
+        with self._lock:
+            graph = self._scopes.get(self._parents.get(node.run_id)) if node.node else None
+            for scope in (node, graph):
+                if scope is not None:
+                    for name, delta in deltas.items():
+                        scope.counters[name] += delta
+
+    # --- chains: graph and node runs ---
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        name = kwargs.get("name")
+        with self._lock:
+            self._parents[run_id] = parent_run_id
+            parent = self._scopes.get(parent_run_id)
+            # Node check first: profileAnalysis names its nodes after the graphs they run
+            if parent is not None and parent.node is None and (metadata or {}).get("langgraph_node") == name:
+                self._scopes[run_id] = _Run(parent.graph, name, run_id)
+                parent.nodes += 1
+            elif name in self._graph_names:
+                self._scopes[run_id] = _Run(name, None, run_id)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id, error=None)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error=error)
+
+    def _finish(self, run_id, error) -> None:
+        with self._lock:
+            self._parents.pop(run_id, None)
+            scope = self._scopes.pop(run_id, None)
+        if scope is None:
+            return
+        wall_ms = round((time.perf_counter() - scope.started) * 1000, 1)
+        record = {"type": "node" if scope.node else "run", "graph": scope.graph}
+        if scope.node:
+            record["node"] = scope.node
+        record.update({"run_id": str(scope.run_id), "wall_ms": wall_ms})
+        if not scope.node:
+            record["nodes"] = scope.nodes
+        record.update({k: round(v, 1) if isinstance(v, float) else v for k, v in scope.counters.items()})
+        if error is not None:
+            record["error"] = f"{type(error).__name__}: {error}"
+        emit(record)
+        _prom_add(scope.graph, scope.node or "", wall_ms, scope.counters, error is not None)
+        prom_path = os.getenv("AGENT_METRICS_PROM")
+        if prom_path and not scope.node:
+            try:
+                write_prometheus(prom_path)
+            except OSError as e:
+                print(f"[instrumentation] could not write {prom_path}: {e}", file=sys.stderr)
+
+    # --- chat model calls ---
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        with self._lock:
+            self._parents[run_id] = parent_run_id
+            self._llm[run_id] = (time.perf_counter(), token_usage.prompt_chars(messages))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            started, input_chars = self._llm.pop(run_id, (None, 0))
+        if started is not None:
+            usage = token_usage.response_usage(response, input_chars)
+            deltas = {"llm_calls": 1, "llm_ms": (time.perf_counter() - started) * 1000}
+            if usage["cached"]:
+                deltas["cache_hits"] = 1
+            else:
+                deltas["input_tokens"] = usage["input_tokens"]
+                deltas["output_tokens"] = usage["output_tokens"]
+            self._add(run_id, **deltas)
+        with self._lock:
+            self._parents.pop(run_id, None)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            started, _ = self._llm.pop(run_id, (None, 0))
+        if started is not None:
+            self._add(run_id, llm_calls=1, llm_ms=(time.perf_counter() - started) * 1000)
+        with self._lock:
+            self._parents.pop(run_id, None)
+
+
+_handler = MetricsHandler()
+
+
+def instrument(graph, name: str):
+    """Attach the shared metrics handler to a compiled graph; records carry `name` as their graph."""
+    _handler.register(name)
+    return graph.with_config(callbacks=[_handler], run_name=name)
+
+# ============================================================
+# 3. HOOKS FOR CODE RUNNING INSIDE A NODE
+# ============================================================
+
+def _current_run_id():
+    from langchain_core.runnables.config import var_child_runnable_config
+    config = var_child_runnable_config.get() or {}
+    callbacks = config.get("callbacks")
+    return getattr(callbacks, "parent_run_id", None)
+
+
+def record_http(seconds: float) -> None:
+    """Count one external HTTP call of `seconds` against the current node (no-op outside a graph)."""
+    _handler._add(_current_run_id(), http_calls=1, http_ms=seconds * 1000)
+
+
+def record_retry() -> None:
+    _handler._add(_current_run_id(), retries=1)
+
+
+def record_cache(hit: bool) -> None:
+    _handler._add(_current_run_id(), **({"cache_hits": 1} if hit else {"cache_misses": 1}))
+
+
+class http_timer:
+    """`with http_timer(): requests.get(...)` -> record_http(elapsed), even when the call raises."""
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record_http(time.perf_counter() - self._started)
+        return False
+
+
+def bind(fn):
+    """
+    Wrap fn for a thread pool so it runs in a copy of the submitting context and its
+    HTTP/cache events are attributed to the submitting node.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return run
@@ -4,13 +4,24 @@ Author: Raaj Hackathon Build
 """
 
 import os
+import re
 import json
+import time
+import asyncio
+import random
+import hashlib
+import threading
+import subprocess
+from functools import lru_cache
 from typing import TypedDict, Optional, List, Dict
 import sys
 from dotenv import load_dotenv
 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
+from llm_clients import get_chat_model
+from model_router import route, policy_for, expected_latency
+from prompt_budget import to_prompt_json
+import instrumentation
+import deadline
 # Replace langchain_community Serper wrapper with direct HTTP call to avoid missing module errors
 try:
     import requests  # Preferred if available
@@ -18,7 +29,6 @@ except Exception:
     requests = None
     import urllib.request
     import urllib.error
-from langgraph.graph import StateGraph, START, END
 
 # ============================================================
 # 1. STATE DEFINITIONS (Structured for DB-friendly output)
@@ -59,52 +69,174 @@ class JobAnalysisState(TypedDict):
     salary_data: SalaryInsights
     skills_data: SkillsInsights
     summary: JobMarketSummary
+    partial: List[str]  # optional stages skipped to meet the deadline
+    refresh: bool  # bypass the Serper and LLM caches
 
 # ============================================================
 # 2. INITIALIZE MODELS AND SEARCH
 # ============================================================
 
 def initialize_gemini_llm(temp=0.3):
-    return ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
+    # Shared, lazily-built client (see llm_clients.py)
+    return get_chat_model(
+        route("jobDemand"),
         temperature=temp,
         api_key=os.getenv("GOOGLE_API_KEY")
     )
 
-def serper_search(query: str) -> str:
+# --- Serper transport: pooled keep-alive session, query cache, jittered retries ---
+
+SERPER_URL = "https://google.serper.dev/search"
+SERPER_TIMEOUT_SECONDS = 20.0          # total budget per query, retries included
+SERPER_MAX_ATTEMPTS = 3
+SERPER_BACKOFF_BASE_SECONDS = 0.5
+SERPER_RETRY_STATUSES = {429, 500, 502, 503, 504}
+SERPER_CACHE_DIR = os.getenv(
+    "SERPER_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "serper")
+)
+SERPER_CACHE_TTL_SECONDS = float(os.getenv("SERPER_CACHE_TTL", 6 * 3600))
+
+_session = None
+_session_lock = threading.Lock()
+
+class RetryableSearchError(Exception):
+    pass
+
+def get_http_session():
+    """One keep-alive connection pool shared by every search helper (None without requests)."""
+    global _session
+    if requests is None:
+        return None
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+def _serper_cache_path(query: str) -> str:
+    digest = hashlib.sha256(query.strip().lower().encode("utf-8")).hexdigest()[:32]
+    return os.path.join(SERPER_CACHE_DIR, f"{digest}.json")
+
+def _load_cached_search(query: str) -> Optional[str]:
+    try:
+        with open(_serper_cache_path(query), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - float(entry.get("fetched_at", 0)) > SERPER_CACHE_TTL_SECONDS:
+        return None
+    return entry.get("response")
+
+def _save_cached_search(query: str, response: str) -> None:
+    try:
+        os.makedirs(SERPER_CACHE_DIR, exist_ok=True)
+        path = _serper_cache_path(query)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"query": query, "fetched_at": time.time(), "response": response}, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Could not cache search response: {e}", file=sys.stderr)
+
+def _post_search(headers: dict, payload: dict, timeout: float) -> str:
+    session = get_http_session()
+    if session is not None:
+        try:
+            resp = session.post(SERPER_URL, headers=headers, json=payload, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise RetryableSearchError(str(e))
+        if resp.status_code in SERPER_RETRY_STATUSES:
+            raise RetryableSearchError(f"HTTP {resp.status_code}")
+        resp.raise_for_status()
+        return resp.text
+    data = json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request(SERPER_URL, data=data, headers=headers, method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            return r.read().decode("utf-8")
+    except urllib.error.HTTPError as e:
+        if e.code in SERPER_RETRY_STATUSES:
+            raise RetryableSearchError(f"HTTP {e.code}")
+        raise
+    except (urllib.error.URLError, TimeoutError) as e:
+        raise RetryableSearchError(str(e))
+
+def serper_search(query: str, use_cache: bool = True) -> str:
     key = os.getenv("SERPER_API_KEY")
     if not key:
         return f"Search skipped (no SERPER_API_KEY). Query: {query}"
-    url = "https://google.serper.dev/search"
+    if use_cache:
+        cached = _load_cached_search(query)
+        instrumentation.record_cache(cached is not None)
+        if cached is not None:
+            return cached
+
     headers = {"X-API-KEY": key, "Content-Type": "application/json"}
     payload = {"q": query}
-    try:
-        if requests:
-            resp = requests.post(url, headers=headers, json=payload, timeout=20)
-            resp.raise_for_status()
-            return resp.text
-        else:
-            data = json.dumps(payload).encode("utf-8")
-            req = urllib.request.Request(url, data=data, headers=headers, method="POST")
-            with urllib.request.urlopen(req, timeout=20) as r:
-                return r.read().decode("utf-8")
-    except Exception as e:
-        return f"Search error: {e}"
+    # Overall budget for all attempts, never past the request's deadline
+    budget = SERPER_TIMEOUT_SECONDS
+    if deadline.remaining() is not None:
+        budget = min(budget, deadline.remaining())
+    cutoff = time.monotonic() + budget
+    last_error = None
+    for attempt in range(SERPER_MAX_ATTEMPTS):
+        remaining = cutoff - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            with instrumentation.http_timer():
+                text = _post_search(headers, payload, timeout=remaining)
+            if use_cache:
+                _save_cached_search(query, text)
+            return text
+        except RetryableSearchError as e:
+            last_error = e
+        except Exception as e:
+            return f"Search error: {e}"
+        # Full jitter backoff, never sleeping past the overall budget
+        delay = random.uniform(0, SERPER_BACKOFF_BASE_SECONDS * (2 ** attempt))
+        if time.monotonic() + delay >= cutoff:
+            break
+        instrumentation.record_retry()
+        time.sleep(delay)
+    return f"Search error: {last_error or 'timed out'}"
 
 # ============================================================
 # 3. SEARCH HELPERS
 # ============================================================
-def search_job_postings(location: str) -> str:
+def search_job_postings(location: str, use_cache: bool = True) -> str:
     query = f"current job demand {location} 2025 software engineer data scientist"
-    return serper_search(query)
+    return serper_search(query, use_cache)
 
-def search_salary_data(location: str) -> str:
+def search_salary_data(location: str, use_cache: bool = True) -> str:
     query = f"average salary 2025 {location} tech roles compensation"
-    return serper_search(query)
+    return serper_search(query, use_cache)
 
-def search_skills_data(location: str) -> str:
+def search_skills_data(location: str, use_cache: bool = True) -> str:
     query = f"emerging tech skills {location} 2025 AI ML cloud"
-    return serper_search(query)
+    return serper_search(query, use_cache)
+
+# Async variants: the blocking HTTP call runs on the default executor so the
+# three branches can overlap on a single event loop.
+async def aserper_search(query: str, use_cache: bool = True) -> str:
+    loop = asyncio.get_running_loop()
+    # bind() carries the node's context into the executor thread for metrics attribution
+    return await loop.run_in_executor(None, instrumentation.bind(serper_search), query, use_cache)
+
+async def asearch_job_postings(location: str, use_cache: bool = True) -> str:
+    return await aserper_search(f"current job demand {location} 2025 software engineer data scientist", use_cache)
+
+async def asearch_salary_data(location: str, use_cache: bool = True) -> str:
+    return await aserper_search(f"average salary 2025 {location} tech roles compensation", use_cache)
+
+async def asearch_skills_data(location: str, use_cache: bool = True) -> str:
+    return await aserper_search(f"emerging tech skills {location} 2025 AI ML cloud", use_cache)
 
 # ============================================================
 # 4. LLM ANALYSIS HELPERS
@@ -121,9 +253,7 @@ def parse_json_safe(text: str):
     except Exception:
         return {"raw_text": text}
 
-def analyze_job_demand(location: str, data: str) -> JobDemandData:
-    llm = initialize_gemini_llm()
-    prompt = ChatPromptTemplate.from_template("""
+JOB_DEMAND_TEMPLATE = """
     You are a data-driven analyst. Analyze job demand data for {location}.
     Data:
     {data}
@@ -136,13 +266,9 @@ def analyze_job_demand(location: str, data: str) -> JobDemandData:
         "industries_with_highest_demand": [<list>],
         "remote_vs_on_site_distribution": <string>
     }}
-    """)
-    res = llm.invoke(prompt.invoke({"location": location, "data": data}))
-    return parse_json_safe(res.content)
+    """
 
-def analyze_salary_trends(location: str, data: str) -> SalaryInsights:
-    llm = initialize_gemini_llm()
-    prompt = ChatPromptTemplate.from_template("""
+SALARY_TEMPLATE = """
     You are a compensation analyst. Extract structured salary insights for {location}.
     Data:
     {data}
@@ -155,13 +281,9 @@ def analyze_salary_trends(location: str, data: str) -> SalaryInsights:
         "salary_growth_rate_yoy_percent": <float or null>,
         "cost_of_living_adjustment_factors": <string or null>
     }}
-    """)
-    res = llm.invoke(prompt.invoke({"location": location, "data": data}))
-    return parse_json_safe(res.content)
+    """
 
-def analyze_emerging_skills(location: str, data: str) -> SkillsInsights:
-    llm = initialize_gemini_llm()
-    prompt = ChatPromptTemplate.from_template("""
+SKILLS_TEMPLATE = """
     You are a job skills analyst. Extract skill trends for {location}.
     Data:
     {data}
@@ -174,13 +296,9 @@ def analyze_emerging_skills(location: str, data: str) -> SkillsInsights:
         "skills_with_highest_salary_premium": [<list>],
         "year_over_year_skill_growth_trends": [<list>]
     }}
-    """)
-    res = llm.invoke(prompt.invoke({"location": location, "data": data}))
-    return parse_json_safe(res.content)
+    """
 
-def summarize_market(location: str, demand: dict, salary: dict, skills: dict) -> JobMarketSummary:
-    llm = initialize_gemini_llm()
-    prompt = ChatPromptTemplate.from_template("""
+SUMMARY_TEMPLATE = """
     Synthesize a strategic summary for {location} based on:
 
     JOB DEMAND: {demand}
@@ -196,15 +314,65 @@ def summarize_market(location: str, demand: dict, salary: dict, skills: dict) ->
         "market_outlook": <text>,
         "recommendations": <text>
     }}
-    """)
-    res = llm.invoke(prompt.invoke({
-        "location": location,
-        "demand": json.dumps(demand),
-        "salary": json.dumps(salary),
-        "skills": json.dumps(skills)
-    }))
+    """
+
+@lru_cache(maxsize=None)
+def _prompt(template: str):
+    from langchain_core.prompts import ChatPromptTemplate
+    return ChatPromptTemplate.from_template(template)
+
+def _run_analysis(template: str, variables: dict):
+    llm = initialize_gemini_llm()
+    res = llm.invoke(_prompt(template).invoke(variables))
+    return parse_json_safe(res.content)
+
+async def _arun_analysis(template: str, variables: dict):
+    llm = initialize_gemini_llm()
+    res = await llm.ainvoke(_prompt(template).invoke(variables))
     return parse_json_safe(res.content)
 
+def _summary_variables(location: str, demand: dict, salary: dict, skills: dict) -> dict:
+    return {
+        "location": location,
+        "demand": to_prompt_json(demand),
+        "salary": to_prompt_json(salary),
+        "skills": to_prompt_json(skills)
+    }
+
+def _compact_search(data: str) -> str:
+    """Serper's raw JSON minified with per-field budgets; non-JSON text (errors, skips) passes through."""
+    try:
+        parsed = json.loads(data)
+    except (TypeError, ValueError):
+        return data
+    if isinstance(parsed, dict):
+        parsed = {k: v for k, v in parsed.items() if k not in ("searchParameters", "credits")}
+    return to_prompt_json(parsed, max_items=8, max_chars=300)
+
+def analyze_job_demand(location: str, data: str) -> JobDemandData:
+    return _run_analysis(JOB_DEMAND_TEMPLATE, {"location": location, "data": _compact_search(data)})
+
+def analyze_salary_trends(location: str, data: str) -> SalaryInsights:
+    return _run_analysis(SALARY_TEMPLATE, {"location": location, "data": _compact_search(data)})
+
+def analyze_emerging_skills(location: str, data: str) -> SkillsInsights:
+    return _run_analysis(SKILLS_TEMPLATE, {"location": location, "data": _compact_search(data)})
+
+def summarize_market(location: str, demand: dict, salary: dict, skills: dict) -> JobMarketSummary:
+    return _run_analysis(SUMMARY_TEMPLATE, _summary_variables(location, demand, salary, skills))
+
+async def aanalyze_job_demand(location: str, data: str) -> JobDemandData:
+    return await _arun_analysis(JOB_DEMAND_TEMPLATE, {"location": location, "data": _compact_search(data)})
+
+async def aanalyze_salary_trends(location: str, data: str) -> SalaryInsights:
+    return await _arun_analysis(SALARY_TEMPLATE, {"location": location, "data": _compact_search(data)})
+
+async def aanalyze_emerging_skills(location: str, data: str) -> SkillsInsights:
+    return await _arun_analysis(SKILLS_TEMPLATE, {"location": location, "data": _compact_search(data)})
+
+async def asummarize_market(location: str, demand: dict, salary: dict, skills: dict) -> JobMarketSummary:
+    return await _arun_analysis(SUMMARY_TEMPLATE, _summary_variables(location, demand, salary, skills))
+
 # ============================================================
 # 5. NODES
 # ============================================================
@@ -214,42 +382,90 @@ def node_input(state: JobAnalysisState):
 
 def node_demand(state: JobAnalysisState):
     loc = state["location"]
-    results = search_job_postings(loc)
+    results = search_job_postings(loc, use_cache=not state.get("refresh"))
     analysis = analyze_job_demand(loc, results)
     return {"job_demand_data": analysis}
 
 def node_salary(state: JobAnalysisState):
     loc = state["location"]
-    results = search_salary_data(loc)
+    results = search_salary_data(loc, use_cache=not state.get("refresh"))
     analysis = analyze_salary_trends(loc, results)
     return {"salary_data": analysis}
 
 def node_skills(state: JobAnalysisState):
     loc = state["location"]
-    results = search_skills_data(loc)
+    results = search_skills_data(loc, use_cache=not state.get("refresh"))
     analysis = analyze_emerging_skills(loc, results)
     return {"skills_data": analysis}
 
+def _summary_fits() -> bool:
+    """The summary is optional: skip it when its LLM call won't finish before the deadline."""
+    return deadline.allows(expected_latency(policy_for("jobDemand").model))
+
+def _skipped_summary() -> dict:
+    return {"summary": {}, "partial": ["summary"]}
+
 def node_summary(state: JobAnalysisState):
-    summary = summarize_market(
-        state["location"],
-        state["job_demand_data"],
-        state["salary_data"],
-        state["skills_data"]
-    )
+    if not _summary_fits():
+        return _skipped_summary()
+    try:
+        summary = summarize_market(
+            state["location"],
+            state["job_demand_data"],
+            state["salary_data"],
+            state["skills_data"]
+        )
+    except Exception:
+        if deadline.expired():
+            return _skipped_summary()
+        raise
+    return {"summary": summary}
+
+# Async nodes (used by build_async_workflow / arun_job_analysis)
+
+async def anode_demand(state: JobAnalysisState):
+    loc = state["location"]
+    results = await asearch_job_postings(loc, use_cache=not state.get("refresh"))
+    return {"job_demand_data": await aanalyze_job_demand(loc, results)}
+
+async def anode_salary(state: JobAnalysisState):
+    loc = state["location"]
+    results = await asearch_salary_data(loc, use_cache=not state.get("refresh"))
+    return {"salary_data": await aanalyze_salary_trends(loc, results)}
+
+async def anode_skills(state: JobAnalysisState):
+    loc = state["location"]
+    results = await asearch_skills_data(loc, use_cache=not state.get("refresh"))
+    return {"skills_data": await aanalyze_emerging_skills(loc, results)}
+
+async def anode_summary(state: JobAnalysisState):
+    if not _summary_fits():
+        return _skipped_summary()
+    try:
+        summary = await asummarize_market(
+            state["location"],
+            state["job_demand_data"],
+            state["salary_data"],
+            state["skills_data"]
+        )
+    except Exception:
+        if deadline.expired():
+            return _skipped_summary()
+        raise
     return {"summary": summary}
 
 # ============================================================
 # 6. GRAPH WORKFLOW
 # ============================================================
 
-def build_workflow():
+def _build_graph(nodes: Dict):
+    from langgraph.graph import StateGraph, START, END
+    from instrumentation import instrument
+
     graph = StateGraph(JobAnalysisState)
     graph.add_node("input", node_input)
-    graph.add_node("demand", node_demand)
-    graph.add_node("salary", node_salary)
-    graph.add_node("skills", node_skills)
-    graph.add_node("summary", node_summary)
+    for name in ("demand", "salary", "skills", "summary"):
+        graph.add_node(name, nodes[name])
 
     graph.add_edge(START, "input")
     graph.add_edge("input", "demand")
@@ -259,23 +475,56 @@ def build_workflow():
     graph.add_edge("salary", "summary")
     graph.add_edge("skills", "summary")
     graph.add_edge("summary", END)
-    return graph.compile()
+    return instrument(graph.compile(), "jobDemand")
+
+def build_workflow():
+    return _build_graph({
+        "demand": node_demand,
+        "salary": node_salary,
+        "skills": node_skills,
+        "summary": node_summary,
+    })
+
+def build_async_workflow():
+    return _build_graph({
+        "demand": anode_demand,
+        "salary": anode_salary,
+        "skills": anode_skills,
+        "summary": anode_summary,
+    })
 
 # ============================================================
 # 7. EXECUTION
 # ============================================================
 
-def run_job_analysis(location: str) -> JobAnalysisState:
-    graph = build_workflow()
-    init_state = {
+# Compiled once per process and reused across calls
+_compiled_workflow = None
+
+_compiled_async_workflow = None
+
+def get_workflow():
+    global _compiled_workflow
+    if _compiled_workflow is None:
+        _compiled_workflow = build_workflow()
+    return _compiled_workflow
+
+def get_async_workflow():
+    global _compiled_async_workflow
+    if _compiled_async_workflow is None:
+        _compiled_async_workflow = build_async_workflow()
+    return _compiled_async_workflow
+
+def _initial_state(location: str, refresh: bool = False) -> JobAnalysisState:
+    return {
         "location": location,
         "job_demand_data": {},
         "salary_data": {},
         "skills_data": {},
-        "summary": {}
+        "summary": {},
+        "refresh": refresh
     }
-    result = graph.invoke(init_state)
 
+def _log_result(result: JobAnalysisState) -> None:
     # Route human-readable logs to stderr to keep stdout machine-readable
     print("\n================== DB-Friendly Output ==================", file=sys.stderr)
     print("\n📈 JOB DEMAND DATA:", file=sys.stderr)
@@ -291,19 +540,212 @@ def run_job_analysis(location: str) -> JobAnalysisState:
     print(json.dumps(result["summary"], indent=2), file=sys.stderr)
     print("========================================================\n", file=sys.stderr)
 
+def run_job_analysis(location: str, budget: Optional[float] = None, refresh: bool = False) -> JobAnalysisState:
+    """
+    budget: seconds; the summary is skipped (and listed in "partial") if it won't fit.
+    refresh: fetch new search results and LLM answers instead of cached ones.
+    """
+    import llm_cache
+    with deadline.within(budget), llm_cache.bypass(refresh):
+        result = get_workflow().invoke(_initial_state(location, refresh))
+    result.pop("refresh", None)
+    _log_result(result)
+    return result
+
+async def arun_job_analysis(location: str, budget: Optional[float] = None, refresh: bool = False) -> JobAnalysisState:
+    """Async entry point: the demand/salary/skills branches overlap on one event loop."""
+    import llm_cache
+    with deadline.within(budget), llm_cache.bypass(refresh):
+        result = await get_async_workflow().ainvoke(_initial_state(location, refresh))
+    result.pop("refresh", None)
+    _log_result(result)
     return result
 
 # ============================================================
-# 8. MAIN
+# 8. RESULT CACHE (stale-while-revalidate per location)
+# ============================================================
+
+# Results younger than FRESH are served as-is; older ones up to MAX_STALE are served
+# immediately while a refresh runs in the background; anything older is recomputed.
+JOB_CACHE_DIR = os.getenv(
+    "JOB_ANALYSIS_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "job_analysis")
+)
+JOB_CACHE_FRESH_SECONDS = float(os.getenv("JOB_ANALYSIS_FRESH_SECONDS", 24 * 3600))
+JOB_CACHE_MAX_STALE_SECONDS = float(os.getenv("JOB_ANALYSIS_MAX_STALE_SECONDS", 7 * 24 * 3600))
+
+# A background refresh holds a marker file next to the entry so other processes (one-shot
+# CLI runs, other workers) don't start the same refresh; markers older than this are abandoned
+JOB_REFRESH_MARKER_TTL_SECONDS = float(os.getenv("JOB_ANALYSIS_REFRESH_MARKER_TTL_SECONDS", 15 * 60))
+
+_refreshing = set()
+_refresh_lock = threading.Lock()
+
+def normalize_location(location: str) -> str:
+    """'  Bangalore ,India ' -> 'bangalore, india'"""
+    parts = [re.sub(r"\s+", " ", p).strip().lower() for p in location.split(",")]
+    return ", ".join(p for p in parts if p)
+
+def _cache_path(location: str) -> str:
+    digest = hashlib.sha256(normalize_location(location).encode("utf-8")).hexdigest()[:32]
+    return os.path.join(JOB_CACHE_DIR, f"{digest}.json")
+
+def load_cached_analysis(location: str) -> Optional[Dict]:
+    try:
+        with open(_cache_path(location), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_cached_analysis(location: str, result: Dict) -> None:
+    os.makedirs(JOB_CACHE_DIR, exist_ok=True)
+    path = _cache_path(location)
+    entry = {
+        "location": normalize_location(location),
+        "fetched_at": time.time(),
+        "result": dict(result),
+    }
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(tmp, path)
+
+def _refresh_marker_path(location: str) -> str:
+    return _cache_path(location)[:-len(".json")] + ".refreshing"
+
+def _claim_refresh(location: str) -> bool:
+    """Create the location's refresh marker; False if another live refresh holds it."""
+    os.makedirs(JOB_CACHE_DIR, exist_ok=True)
+    path = _refresh_marker_path(location)
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) <= JOB_REFRESH_MARKER_TTL_SECONDS:
+                    return False
+                os.remove(path)  # left by a refresh that died; take it over
+            except OSError:
+                pass
+            continue
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        return True
+    return False
+
+def _release_refresh(location: str) -> None:
+    try:
+        os.remove(_refresh_marker_path(location))
+    except OSError:
+        pass
+
+def refresh_job_analysis(location: str, budget: Optional[float] = None, refresh: bool = True) -> JobAnalysisState:
+    """
+    Recompute the analysis for a location and store it in the cache (partial results are not stored).
+    With refresh (the default) the searches and LLM calls skip their caches, so the result reflects new data.
+    """
+    result = run_job_analysis(location, budget=budget, refresh=refresh)
+    if not result.get("partial"):
+        save_cached_analysis(location, result)
+    return result
+
+def _refresh_in_background(location: str, background: str) -> None:
+    key = normalize_location(location)
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    try:
+        claimed = _claim_refresh(location)
+    except OSError as e:
+        print(f"Could not mark refresh for '{location}': {e}", file=sys.stderr)
+        claimed = False
+    if not claimed:
+        with _refresh_lock:
+            _refreshing.discard(key)
+        return
+
+    if background == "process":
+        # One-shot CLI runs exit right after printing, so refresh in a detached child,
+        # which removes the marker when it finishes
+        try:
+            subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--background-refresh", location],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL,
+                start_new_session=True,
+                # The refresh is not bound by the caller's deadline
+                env={k: v for k, v in os.environ.items() if k != "AGENT_BUDGET_SECONDS"},
+            )
+        except OSError:
+            _release_refresh(location)
+            raise
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(key)
+        return
+
+    def run():
+        try:
+            # Skip the Serper and LLM caches, or a refresh within their TTLs would store the same data again
+            refresh_job_analysis(location, refresh=True)
+        except Exception as e:
+            print(f"Background refresh for '{location}' failed: {e}", file=sys.stderr)
+        finally:
+            _release_refresh(location)
+            with _refresh_lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=run, name=f"job-refresh-{key}", daemon=True).start()
+
+def get_job_analysis(location: str, force_refresh: bool = False, background: str = "thread",
+                     budget: Optional[float] = None) -> Dict:
+    """
+    Cached entry point: returns the job analysis for a location plus a "cache" block
+    ({"status": "fresh" | "stale" | "miss" | "refreshed", "age_seconds": ...}).
+    Stale results are returned immediately and refreshed in the background
+    (a thread, or a detached process when background="process"). budget only
+    applies when the analysis is computed in the foreground; background refreshes
+    run to completion so the cache gets a full result.
+    """
+    if not force_refresh:
+        entry = load_cached_analysis(location)
+        if entry and isinstance(entry.get("result"), dict):
+            age = time.time() - float(entry.get("fetched_at", 0))
+            if age <= JOB_CACHE_FRESH_SECONDS:
+                return {**entry["result"], "location": location,
+                        "cache": {"status": "fresh", "age_seconds": round(age)}}
+            if age <= JOB_CACHE_MAX_STALE_SECONDS:
+                _refresh_in_background(location, background)
+                return {**entry["result"], "location": location,
+                        "cache": {"status": "stale", "age_seconds": round(age)}}
+
+    # A plain miss may still reuse recent search results; force_refresh fetches everything anew
+    result = refresh_job_analysis(location, budget=budget, refresh=force_refresh)
+    return {**result, "cache": {"status": "refreshed" if force_refresh else "miss", "age_seconds": 0}}
+
+# ============================================================
+# 9. MAIN
 # ============================================================
 
 if __name__ == "__main__":
     load_dotenv()
-    # CLI usage: python jobDemand.py [location]
+    # CLI usage: python jobDemand.py [--force-refresh] [--budget SECONDS] [location]
     # If a location is provided, output JSON to stdout; logs go to stderr
+    # (--background-refresh is the detached child started for a stale entry; it prints nothing)
+    args = sys.argv[1:]
+    budget = deadline.budget_from_argv(args)
+    force = "--force-refresh" in args
+    background_refresh = "--background-refresh" in args
+    args = [a for a in args if a not in ("--force-refresh", "--background-refresh")]
     cli_location = "Bangalore, India"
-    if len(sys.argv) >= 2:
-        cli_location = " ".join(sys.argv[1:]).strip()
-    result = run_job_analysis(cli_location)
+    if args:
+        cli_location = " ".join(args).strip()
+    if background_refresh:
+        try:
+            refresh_job_analysis(cli_location, refresh=True)
+        finally:
+            _release_refresh(cli_location)
+        sys.exit(0)
+    result = get_job_analysis(cli_location, force_refresh=force, background="process", budget=budget)
     # Print pure JSON to stdout so callers can parse cleanly
     print(json.dumps(result))
\ No newline at end of file
@@ -0,0 +1,218 @@
+"""
+Shared on-disk LLM response cache.
+Installed as LangChain's global LLM cache, so every chat model call made by any
+agent is looked up first. Entries are content-addressed: the key is a SHA-256 of
+LangChain's llm_string (model name, temperature and other call parameters,
+bound tools) and the serialized prompt messages, which embed any image data URIs.
+
+Storage is a local SQLite file with a TTL, a total-size cap with LRU eviction and
+per-process hit/miss counters.
+
+Code that must get a fresh answer (force-refresh and regenerate paths) runs its
+calls inside bypass(): lookups miss, but the new responses still overwrite the
+stored ones.
+
+Configuration (environment):
+    LLM_CACHE_PATH      SQLite file (default: .cache/llm_cache.sqlite3 in the repo root)
+    LLM_CACHE_TTL       Entry lifetime in seconds (default: 604800 = 7 days)
+    LLM_CACHE_MAX_MB    Size cap in megabytes (default: 256)
+    LLM_CACHE_DISABLED  Set to 1 to bypass the cache entirely (bypass() does it for one context)
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import warnings
+import threading
+import contextlib
+import contextvars
+from typing import Dict, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "llm_cache.sqlite3")
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_MB = 256
+
+_bypass: contextvars.ContextVar = contextvars.ContextVar("llm_cache_bypass", default=False)
+
+
+@contextlib.contextmanager
+def bypass(enabled: bool = True):
+    """Skip cache lookups for calls made in this context; their responses are still stored."""
+    token = _bypass.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """Content address for one LLM call."""
+    digest = hashlib.sha256()
+    digest.update(llm_string.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(prompt.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SQLiteLLMCache(BaseCache):
+    """LangChain cache backed by SQLite with TTL, LRU size cap and hit/miss counters."""
+
+    def __init__(self, path: str = DEFAULT_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.counters: Dict[str, int] = {"hits": 0, "misses": 0, "expired": 0, "bypassed": 0, "stores": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS llm_cache (
+                   key TEXT PRIMARY KEY,
+                   value TEXT NOT NULL,
+                   size INTEGER NOT NULL,
+                   created_at REAL NOT NULL,
+                   accessed_at REAL NOT NULL
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+        self._conn.commit()
+        # Running total of stored bytes, so writes don't scan the table; re-read from
+        # the file before evicting, since other processes may share it
+        self._total_bytes = self._stored_bytes_locked()
+
+    # --- BaseCache interface ---
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence]:
+        if _bypass.get():
+            with self._lock:
+                self.counters["bypassed"] += 1
+            return None
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.counters["misses"] += 1
+                return None
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self._total_bytes = max(0, self._total_bytes - len(value.encode("utf-8")))
+                self.counters["expired"] += 1
+                self.counters["misses"] += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.counters["hits"] += 1
+        try:
+            with warnings.catch_warnings():
+                # langchain_core.load.loads is flagged beta; the payloads are our own
+                warnings.simplefilter("ignore")
+                return [loads(item) for item in json.loads(value)]
+        except Exception:
+            # Unreadable entry (e.g. written by an incompatible langchain version): treat as a miss
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence) -> None:
+        key = cache_key(prompt, llm_string)
+        value = json.dumps([dumps(gen) for gen in return_val])
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self.counters["stores"] += 1
+            self._total_bytes += size - (previous[0] if previous else 0)
+            self._evict_locked()
+            self._conn.commit()
+
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self._total_bytes = 0
+
+    # --- Maintenance ---
+
+    def _stored_bytes_locked(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+    def _evict_locked(self) -> None:
+        """Drop least-recently-used entries until the cache fits under max_bytes."""
+        if self._total_bytes <= self.max_bytes:
+            return
+        total = self._total_bytes = self._stored_bytes_locked()
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM llm_cache ORDER BY accessed_at ASC"
+        ).fetchall():
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self.counters["evictions"] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+        self._total_bytes = total
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "bytes": total,
+            "path": self.path,
+        }
+
+
+# ============================================================
+# PROCESS-WIDE INSTALLATION
+# ============================================================
+
+_installed: Optional[SQLiteLLMCache] = None
+_install_lock = threading.Lock()
+
+
+def install() -> Optional[SQLiteLLMCache]:
+    """Install the shared cache as LangChain's global LLM cache (idempotent)."""
+    global _installed
+    if os.getenv("LLM_CACHE_DISABLED") == "1":
+        return None
+    if _installed is None:
+        with _install_lock:
+            if _installed is None:
+                from langchain_core.globals import set_llm_cache
+                cache = SQLiteLLMCache(
+                    path=os.getenv("LLM_CACHE_PATH", DEFAULT_PATH),
+                    ttl_seconds=float(os.getenv("LLM_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+                    max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024),
+                )
+                set_llm_cache(cache)
+                _installed = cache
+    return _installed
+
+
+def stats() -> dict:
+    """Counters for the installed cache, or {"enabled": False}."""
+    if _installed is None:
+        return {"enabled": False}
+    return {"enabled": True, **_installed.stats()}
@@ -0,0 +1,40 @@
+"""
+Shared Gemini client factory.
+Clients are created on first use and reused for the life of the process, so
+importing an agent module never pays for langchain imports or client setup.
+The first client also installs the shared on-disk response cache (llm_cache.py),
+every client reports per-call token usage to token_usage.py, and all clients of
+one model share a rate limiter with backoff (rate_limiter.py).
+"""
+
+import threading
+from typing import Dict, Tuple
+
+_clients: Dict[Tuple, object] = {}
+_lock = threading.Lock()
+
+
+def get_chat_model(model: str = "gemini-2.5-flash", temperature: float = 0.2, **kwargs):
+    """Return the process-wide ChatGoogleGenerativeAI for this model/temperature/kwargs."""
+    key = (model, temperature, tuple(sorted(kwargs.items())))
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                from langchain_google_genai import ChatGoogleGenerativeAI
+                import llm_cache
+                import rate_limiter
+                from token_usage import TokenUsageHandler
+                llm_cache.install()
+                client = ChatGoogleGenerativeAI(
+                    model=model, temperature=temperature, callbacks=[TokenUsageHandler(model)], **kwargs
+                )
+                _clients[key] = rate_limiter.attach(client, model)
+    return client
+
+
+def preload() -> None:
+    """Import the provider SDK up front (used by long-lived processes to warm up)."""
+    import langchain_google_genai  # noqa: F401
+    import langgraph.graph  # noqa: F401
@@ -0,0 +1,114 @@
+"""
+Per-node model routing.
+Agents ask route("<graph>.<node>") for the model to use instead of naming one.
+The answer comes from a declared policy: the preferred model, a faster fallback,
+the node's latency budget and its input size limit. A node runs on its fallback
+when any of these holds:
+
+  - fast mode is on (LLM_FAST_MODE=1, or the fast() context),
+  - the prompt is larger than the policy's max_input_chars,
+  - the preferred model's expected latency exceeds the node's latency budget or
+    the time left on the request's deadline (deadline.py).
+
+Expected latency per model is a moving average of observed, uncached calls
+(fed by token_usage.py), seeded with typical values.
+
+Policy lookup goes "<graph>.<node>", then "<graph>", then "default".
+"""
+
+import os
+import threading
+import contextlib
+import contextvars
+from typing import Dict, NamedTuple, Optional
+
+import deadline
+
+FLASH = "gemini-2.5-flash"
+PRO = "gemini-2.5-pro"
+
+
+class RoutePolicy(NamedTuple):
+    model: str
+    fallback: Optional[str] = None          # faster model used when the preferred one won't fit
+    latency_budget: Optional[float] = None  # seconds this node may spend in its model call
+    max_input_chars: Optional[int] = None   # larger prompts go to the fallback
+
+
+POLICIES: Dict[str, RoutePolicy] = {
+    "default": RoutePolicy(FLASH),
+    # The pro explanation dominates skill pathway p95; it is the one step worth downgrading
+    "skillpath.explanation_node": RoutePolicy(PRO, fallback=FLASH, latency_budget=30.0, max_input_chars=16000),
+}
+
+# Seeds for the latency averages (seconds per call)
+EXPECTED_LATENCY = {FLASH: 5.0, PRO: 20.0}
+EWMA_ALPHA = 0.2
+
+_fast: contextvars.ContextVar = contextvars.ContextVar("fast_mode", default=False)
+_lock = threading.Lock()
+_latency: Dict[str, float] = dict(EXPECTED_LATENCY)
+_decisions: Dict[str, Dict[str, Dict[str, int]]] = {}
+
+
+def policy_for(key: str) -> RoutePolicy:
+    graph = key.split(".", 1)[0]
+    return POLICIES.get(key) or POLICIES.get(graph) or POLICIES["default"]
+
+
+def fast_mode() -> bool:
+    return _fast.get() or os.getenv("LLM_FAST_MODE", "").lower() in ("1", "true", "yes")
+
+
+@contextlib.contextmanager
+def fast(enabled: bool = True):
+    """Route every node in this context to its fallback model."""
+    token = _fast.set(enabled)
+    try:
+        yield
+    finally:
+        _fast.reset(token)
+
+
+def expected_latency(model: str) -> float:
+    with _lock:
+        return _latency.get(model, EXPECTED_LATENCY[FLASH])
+
+
+def observe(model: str, seconds: float) -> None:
+    """Fold one uncached call's latency into the model's moving average."""
+    with _lock:
+        previous = _latency.get(model)
+        _latency[model] = seconds if previous is None else previous + EWMA_ALPHA * (seconds - previous)
+
+
+def _downgrade_reason(policy: RoutePolicy, input_chars: int) -> Optional[str]:
+    if fast_mode():
+        return "fast_mode"
+    if policy.max_input_chars is not None and input_chars > policy.max_input_chars:
+        return "input_size"
+    budgets = [b for b in (policy.latency_budget, deadline.remaining()) if b is not None]
+    if budgets and expected_latency(policy.model) > min(budgets):
+        return "budget"
+    return None
+
+
+def route(key: str, input_chars: int = 0) -> str:
+    """Model for the node `key` ("<graph>.<node>") given its prompt size and the request's deadline."""
+    policy = policy_for(key)
+    reason = _downgrade_reason(policy, input_chars) if policy.fallback else None
+    model = policy.fallback if reason else policy.model
+    with _lock:
+        entry = _decisions.setdefault(key, {"models": {}, "downgraded": {}})
+        entry["models"][model] = entry["models"].get(model, 0) + 1
+        if reason:
+            entry["downgraded"][reason] = entry["downgraded"].get(reason, 0) + 1
+    return model
+
+
+def stats() -> dict:
+    with _lock:
+        return {
+            "expected_latency_s": {model: round(value, 2) for model, value in _latency.items()},
+            "routes": {key: {k: dict(v) for k, v in entry.items()} for key, entry in _decisions.items()},
+        }
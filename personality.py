@@ -1,13 +1,19 @@
 import os
 import sys
+import gzip
 import json
-from typing import TypedDict
+import time
+import hashlib
+import itertools
+import contextlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypedDict, Dict, List, Optional
 from dotenv import load_dotenv  # Loads your .env file
 
-from langgraph.graph import StateGraph, END
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+from llm_clients import get_chat_model
+from model_router import policy_for, route
+import deadline
 
 # --- 1. Setup API Key ---
 load_dotenv()  # This line finds and loads your .env file
@@ -29,6 +35,28 @@ class AgentState(TypedDict):
 
 # --- 3. Define the Nodes ---
 
+# The policy's preferred model identifies the precomputed table; each call is routed (fast mode, latency)
+SUMMARY_MODEL = policy_for("personality").model
+SUMMARY_TEMPERATURE = 0.7
+PROMPT_TEMPLATE = """
+        You are an expert career counselor and psychologist specializing in the 
+        Holland Codes (RIASEC) framework.
+
+        The RIASEC codes are:
+        - R: Realistic (Doers) - Practical, hands-on, physical.
+        - I: Investigative (Thinkers) - Analytical, curious, scientific.
+        - A: Artistic (Creators) - Expressive, original, independent.
+        - S: Social (Helpers) - Cooperative, supportive, empathetic.
+        - E: Enterprising (Persuaders) - Competitive, ambitious, leadership-oriented.
+        - C: Conventional (Organizers) - Detail-oriented, organized, structured.
+
+        The user's 3-letter RIASEC code is: *{riasec_code}*
+ 
+        Focus on their strengths, work preferences, and how the combination of these three traits creates a unique personality profile.
+        
+        Address the user directly (e.g., "With an {riasec_code} profile...").
+        """
+
 def generate_summary(state: AgentState):
     """
     Generates a personality trait summary based on the RIASEC code.
@@ -39,35 +67,19 @@ def generate_summary(state: AgentState):
     # Get the input code from the state
     riasec_code = state['riasec_code']
     
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+
     # 1. Define the LLM
     try:
-        llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.7)
+        llm = get_chat_model(route("personality.generate_summary"), temperature=SUMMARY_TEMPERATURE)
     except Exception as e:
         print(f"Error initializing the LLM. Is your GOOGLE_API_KEY in the .env file and correct? Error: {e}")
         return {"summary": "Error: Could not initialize model. Please check your API key."}
 
     
     # 2. Define a specialized prompt
-    prompt_template = ChatPromptTemplate.from_template(
-        """
-        You are an expert career counselor and psychologist specializing in the 
-        Holland Codes (RIASEC) framework.
-
-        The RIASEC codes are:
-        - R: Realistic (Doers) - Practical, hands-on, physical.
-        - I: Investigative (Thinkers) - Analytical, curious, scientific.
-        - A: Artistic (Creators) - Expressive, original, independent.
-        - S: Social (Helpers) - Cooperative, supportive, empathetic.
-        - E: Enterprising (Persuaders) - Competitive, ambitious, leadership-oriented.
-        - C: Conventional (Organizers) - Detail-oriented, organized, structured.
-
-        The user's 3-letter RIASEC code is: *{riasec_code}*
- 
-        Focus on their strengths, work preferences, and how the combination of these three traits creates a unique personality profile.
-        
-        Address the user directly (e.g., "With an {riasec_code} profile...").
-        """
-    )
+    prompt_template = ChatPromptTemplate.from_template(PROMPT_TEMPLATE)
     
     # 3. Create a simple chain
     summary_chain = prompt_template | llm | StrOutputParser()
@@ -80,20 +92,38 @@ def generate_summary(state: AgentState):
 
 # --- 4. Build the Graph ---
 
-# Initialize a new graph
-workflow = StateGraph(AgentState)
+_app = None
+
+def get_workflow():
+    """
+    Builds and compiles the graph on first use, then reuses it.
+    """
+    global _app
+    if _app is None:
+        from langgraph.graph import StateGraph, END
+        from instrumentation import instrument
 
-# Add the single node we defined
-workflow.add_node("generate_summary", generate_summary)
+        # Initialize a new graph
+        workflow = StateGraph(AgentState)
 
-# Set the entry point for the graph
-workflow.set_entry_point("generate_summary")
+        # Add the single node we defined
+        workflow.add_node("generate_summary", generate_summary)
 
-# This node is the last step, so it connects to the END
-workflow.add_edge("generate_summary", END)
+        # Set the entry point for the graph
+        workflow.set_entry_point("generate_summary")
 
-# Compile the graph into a runnable application
-app = workflow.compile()
+        # This node is the last step, so it connects to the END
+        workflow.add_edge("generate_summary", END)
+
+        # Compile the graph into a runnable application
+        _app = instrument(workflow.compile(), "personality")
+    return _app
+
+def __getattr__(name):
+    # Keep `personality.app` working without compiling the graph at import time
+    if name == "app":
+        return get_workflow()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # --- 5. Run the Graph Interactively ---
 
@@ -121,7 +151,7 @@ def main():
     # 5. Run the graph
     try:
         # The .invoke() call will run the graph and print the "Generating..." message
-        result = app.invoke(inputs)
+        result = get_workflow().invoke(inputs)
         
         # 6. Print the final summary
         print("\n✨ FINAL SUMMARY:\n")
@@ -133,36 +163,173 @@ def main():
     
     print("--- Script finished ---")
 
+# --- 6. Programmatic Entry Points ---
+
+INSTRUCTIONS = (
+    "Enter your 3-letter RIASEC code (e.g., RCE, IAS) where each letter must be one of: R (Realistic), "
+    "I (Investigative), A (Artistic), S (Social), E (Enterprising), C (Conventional)."
+)
+VALID_LETTERS = set(["R", "I", "A", "S", "E", "C"])
+
+# Every valid input: 6 letters in 3 positions = 216 codes
+ALL_CODES = ["".join(letters) for letters in itertools.product("RIASEC", repeat=3)]
+
+# --- 7. Precomputed Summary Table ---
+# Built offline with `python personality.py --build`; served at runtime with a dict lookup.
+
+SUMMARIES_PATH = os.getenv(
+    "RIASEC_SUMMARIES_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "riasec_summaries.json.gz")
+)
+
+_summaries: Optional[Dict[str, str]] = None
+_summaries_lock = threading.Lock()
+
+def prompt_fingerprint() -> str:
+    """Identifies the prompt/model a table was built with (recorded in the artifact)."""
+    raw = f"{SUMMARY_MODEL}\x00{SUMMARY_TEMPERATURE}\x00{PROMPT_TEMPLATE}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+def load_summaries() -> Dict[str, str]:
+    """Load the precomputed table once per process ({} if it hasn't been built)."""
+    global _summaries
+    if _summaries is None:
+        with _summaries_lock:
+            if _summaries is None:
+                try:
+                    with gzip.open(SUMMARIES_PATH, "rt", encoding="utf-8") as f:
+                        artifact = json.load(f)
+                    if artifact.get("prompt") != prompt_fingerprint():
+                        print("Warning: RIASEC summary table was built with a different prompt/model; "
+                              "rebuild with --build --force", file=sys.stderr)
+                    _summaries = dict(artifact.get("summaries", {}))
+                except (OSError, ValueError):
+                    _summaries = {}
+    return _summaries
+
+def save_summaries(summaries: Dict[str, str]) -> None:
+    """Write the table atomically as compact gzipped JSON."""
+    artifact = {
+        "version": 1,
+        "model": SUMMARY_MODEL,
+        "temperature": SUMMARY_TEMPERATURE,
+        "prompt": prompt_fingerprint(),
+        "built_at": time.time(),
+        "summaries": {code: summaries[code] for code in sorted(summaries)},
+    }
+    directory = os.path.dirname(os.path.abspath(SUMMARIES_PATH))
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{SUMMARIES_PATH}.{os.getpid()}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(artifact, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, SUMMARIES_PATH)
+
+def generate_entry(riasec_code: str, fresh: bool = False) -> str:
+    """
+    Run the LLM graph for one code; raises if no usable summary came back.
+    fresh skips the LLM response cache, which would otherwise return the previous summary.
+    """
+    import llm_cache
+    with llm_cache.bypass(fresh):
+        summary = get_workflow().invoke({"riasec_code": riasec_code}).get("summary", "")
+    if not summary or summary.startswith("Error:"):
+        raise RuntimeError(summary or "empty summary")
+    return summary
+
+def store_entry(riasec_code: str, summary: str) -> None:
+    table = load_summaries()
+    with _summaries_lock:
+        table[riasec_code] = summary
+        save_summaries(table)
+
+def build_summaries(codes: Optional[List[str]] = None, force: bool = False, workers: int = 4) -> dict:
+    """Offline build: generate every missing (or, with force, every requested) code and save the table."""
+    table = load_summaries()
+    requested = codes or ALL_CODES
+    todo = [c for c in requested if force or c not in table]
+    failed = {}
+
+    def build_one(code):
+        try:
+            return code, generate_entry(code, fresh=force), None
+        except Exception as e:
+            return code, None, str(e)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for code, summary, error in pool.map(build_one, todo):
+            if summary:
+                table[code] = summary
+            else:
+                failed[code] = error
+    with _summaries_lock:
+        save_summaries(table)
+    return {"generated": len(todo) - len(failed), "failed": failed, "total": len(table), "path": SUMMARIES_PATH}
+
+def run_personality_review(code: str, regenerate: bool = False, budget: Optional[float] = None) -> dict:
+    """
+    Validates a RIASEC code and returns {"summary": ...} or {"error": ...}.
+    Served from the precomputed table; a missing entry (or regenerate=True) is generated once and stored.
+    budget (seconds) bounds that generation.
+    """
+    riasec_code = code.strip().upper()
+    if len(riasec_code) != 3 or any(ch not in VALID_LETTERS for ch in riasec_code):
+        return {
+            "error": "Invalid RIASEC code. Provide exactly 3 letters from R, I, A, S, E, C (e.g., RCE, IAS)."
+        }
+    if not regenerate:
+        summary = load_summaries().get(riasec_code)
+        if summary:
+            return {"summary": summary}
+    try:
+        with deadline.within(budget):
+            summary = generate_entry(riasec_code, fresh=regenerate)
+    except Exception as e:
+        return {"error": f"Failed to generate summary: {e}"}
+    try:
+        store_entry(riasec_code, summary)
+    except OSError as e:
+        print(f"Could not store RIASEC summary: {e}", file=sys.stderr)
+    return {"summary": summary}
+
 # This makes sure the main() function runs when you execute the script
 if __name__ == "__main__":
     # Support CLI mode for backend integration
     # Usage:
-    #   python personality.py RCE           -> prints JSON {"summary": "..."}
-    #   python personality.py --instructions -> prints JSON {"instructions": "..."}
+    #   python personality.py RCE                -> prints JSON {"summary": "..."}
+    #   python personality.py RCE --regenerate   -> regenerates and stores that entry
+    #   python personality.py RCE --budget 20    -> gives up on generation after 20 seconds
+    #   python personality.py --instructions     -> prints JSON {"instructions": "..."}
+    #   python personality.py --build [--force] [--codes RCE,IAS] [--workers N]
+    #                                            -> (re)builds the precomputed summary table
+    budget = deadline.budget_from_argv(sys.argv)
     if len(sys.argv) >= 2:
         arg = sys.argv[1].strip()
         # Provide instructions for UI prompt
         if arg == "--instructions":
-            instructions = (
-                "Enter your 3-letter RIASEC code (e.g., RCE, IAS) where each letter must be one of: R (Realistic), "
-                "I (Investigative), A (Artistic), S (Social), E (Enterprising), C (Conventional)."
-            )
-            print(json.dumps({"instructions": instructions}, ensure_ascii=False))
+            print(json.dumps({"instructions": INSTRUCTIONS}, ensure_ascii=False))
             sys.exit(0)
 
-        riasec_code = arg.upper()
-        valid_letters = set(["R", "I", "A", "S", "E", "C"])
-        if len(riasec_code) != 3 or any(ch not in valid_letters for ch in riasec_code):
-            print(json.dumps({
-                "error": "Invalid RIASEC code. Provide exactly 3 letters from R, I, A, S, E, C (e.g., RCE, IAS)."
-            }, ensure_ascii=False))
+        if arg == "--build":
+            import argparse
+            parser = argparse.ArgumentParser(prog="personality.py --build")
+            parser.add_argument("--force", action="store_true", help="Regenerate entries that already exist")
+            parser.add_argument("--codes", help="Comma-separated subset of codes (default: all 216)")
+            parser.add_argument("--workers", type=int, default=4)
+            opts = parser.parse_args(sys.argv[2:])
+            codes = [c.strip().upper() for c in opts.codes.split(",")] if opts.codes else None
+            invalid = [c for c in codes or [] if c not in ALL_CODES]
+            if invalid:
+                print(json.dumps({"error": f"Invalid RIASEC codes: {invalid}"}))
+                sys.exit(1)
+            with contextlib.redirect_stdout(sys.stderr):
+                report = build_summaries(codes, force=opts.force, workers=opts.workers)
+            print(json.dumps(report, ensure_ascii=False))
             sys.exit(0)
 
-        try:
-            result = app.invoke({"riasec_code": riasec_code})
-            print(json.dumps({"summary": result.get("summary", "")}, ensure_ascii=False))
-        except Exception as e:
-            print(json.dumps({"error": f"Failed to generate summary: {e}"}, ensure_ascii=False))
+        regenerate = "--regenerate" in sys.argv[2:]
+        with contextlib.redirect_stdout(sys.stderr):
+            result = run_personality_review(arg, regenerate=regenerate, budget=budget)
+        print(json.dumps(result, ensure_ascii=False))
         sys.exit(0)
 
     # Fallback to interactive mode if no CLI args provided
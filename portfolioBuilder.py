@@ -13,18 +13,32 @@ from dotenv import load_dotenv
 from typing import TypedDict, Optional, List
 from pydantic import BaseModel, Field
 
-# Updated import to use Google's model
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
-from pydantic import BaseModel, Field
-from langchain_core.output_parsers import JsonOutputParser, PydanticOutputParser
+from llm_clients import get_chat_model
+from model_router import route
+from prompt_budget import compact_text, to_prompt_json
+import deadline
 
-from langgraph.graph import StateGraph, END
+# Raw profile text is whitespace-collapsed and capped before it reaches the model
+PROFILE_CHAR_BUDGET = int(os.getenv("PORTFOLIO_PROFILE_CHARS", "12000"))
 
 # --- 1. Define API Key and LLM ---
-# (Will be loaded from .env)
+# (Will be loaded from .env on first use; langchain/langgraph are imported lazily
+# inside the nodes so importing this module stays cheap)
 llm = None
 
+def get_llm():
+    """Return the shared LLM, creating it on first use."""
+    global llm
+    if llm is None:
+        load_dotenv()
+        google_api_key = os.getenv("GOOGLE_API_KEY")
+        if not google_api_key:
+            raise RuntimeError("GOOGLE_API_KEY not set")
+        llm = get_chat_model(route("portfolioBuilder"),
+                             google_api_key=google_api_key,
+                             temperature=0.7)
+    return llm
+
 # --- 2. Define Pydantic Models for Structured Output ---
 # These models ensure our data is structured between steps.
 
@@ -74,6 +88,9 @@ def analyze_profile(state: GraphState) -> GraphState:
     print("--- (1/4) ANALYZING PROFILE ---", file=sys.stderr)
     profile_content = state['profile_content']
     
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import PydanticOutputParser
+
     parser = PydanticOutputParser(pydantic_object=ProfileAnalysis)
     
     prompt = ChatPromptTemplate.from_messages([
@@ -81,11 +98,11 @@ def analyze_profile(state: GraphState) -> GraphState:
         ("human", "Here is the user's profile: \n\n{profile}\n\n{format_instructions}")
     ])
     
-    chain = prompt | llm | parser
+    chain = prompt | get_llm() | parser
     
     try:
         analysis = chain.invoke({
-            "profile": profile_content,
+            "profile": compact_text(profile_content, PROFILE_CHAR_BUDGET),
             "format_instructions": parser.get_format_instructions()
         })
         return {"analysis": analysis}
@@ -103,6 +120,9 @@ def brainstorm_projects(state: GraphState) -> GraphState:
     if not analysis:
         return {"project_ideas": []}
 
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import JsonOutputParser
+
     parser = JsonOutputParser()
     
     prompt = ChatPromptTemplate.from_messages([
@@ -110,9 +130,9 @@ def brainstorm_projects(state: GraphState) -> GraphState:
         ("human", "Here is the profile analysis:\n\n{analysis}\n\nBrainstorm 5-7 project ideas. Format your response as a JSON list of strings, where each string is a project idea (e.g., 'AI-Powered Recipe App: A web app that suggests recipes based on available ingredients').")
     ])
     
-    chain = prompt | llm | parser
+    chain = prompt | get_llm() | parser
     
-    ideas = chain.invoke({"analysis": analysis.model_dump_json()})
+    ideas = chain.invoke({"analysis": to_prompt_json(analysis)})
     return {"project_ideas": ideas}
 
 
@@ -127,6 +147,9 @@ def generate_roadmap(state: GraphState) -> GraphState:
     if not analysis:
         return {"roadmap": None}
 
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import PydanticOutputParser
+
     parser = PydanticOutputParser(pydantic_object=PortfolioRoadmap)
     
     prompt = ChatPromptTemplate.from_messages([
@@ -139,12 +162,12 @@ def generate_roadmap(state: GraphState) -> GraphState:
         ("human", "Profile Analysis:\n{analysis}\n\nBrainstormed Ideas:\n{ideas}\n\n{format_instructions}")
     ])
     
-    chain = prompt | llm | parser
+    chain = prompt | get_llm() | parser
     
     try:
         roadmap = chain.invoke({
-            "analysis": analysis.model_dump_json(),
-            "ideas": "\n".join(ideas),
+            "analysis": to_prompt_json(analysis),
+            "ideas": "\n".join(str(idea) for idea in ideas[:7]),
             "format_instructions": parser.get_format_instructions()
         })
         return {"roadmap": roadmap}
@@ -216,7 +239,9 @@ Good luck! This roadmap is a guide. Feel free to adapt the projects to your inte
 
 def build_graph():
     """Builds the LangGraph workflow."""
-    
+    from langgraph.graph import StateGraph, END
+    from instrumentation import instrument
+
     workflow = StateGraph(GraphState)
 
     # Add the nodes
@@ -234,25 +259,33 @@ def build_graph():
     workflow.add_edge("compile_guide", END)
 
     # Compile the graph
-    app = workflow.compile()
+    app = instrument(workflow.compile(), "portfolioBuilder")
     
     return app
 
 # --- 6. Main execution to run the graph ---
 
-def run_app_from_text(profile_text: str):
-    """Run the workflow given raw profile text and return an organized result dict."""
-    global llm
-    load_dotenv()
-    google_api_key = os.getenv("GOOGLE_API_KEY")
-    if not google_api_key:
-        raise RuntimeError("GOOGLE_API_KEY not set")
-    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash",
-                                 google_api_key=google_api_key,
-                                 temperature=0.7)
-    app = build_graph()
+# Compiled once and reused by run_app_from_text (e.g. inside the resident worker)
+_compiled_app = None
+
+def get_workflow():
+    """Return the compiled workflow, building it on first use."""
+    global _compiled_app
+    if _compiled_app is None:
+        _compiled_app = build_graph()
+    return _compiled_app
+
+def run_app_from_text(profile_text: str, budget: Optional[float] = None):
+    """
+    Run the workflow given raw profile text and return an organized result dict.
+    budget (seconds) bounds the three LLM steps (see deadline.py). None of them is optional and the
+    guide is plain formatting, so nothing is skipped as "partial".
+    """
+    get_llm()
+    app = get_workflow()
     inputs = {"profile_content": profile_text}
-    final_state = app.invoke(inputs)
+    with deadline.within(budget):
+        final_state = app.invoke(inputs)
 
     analysis_obj = final_state.get("analysis")
     roadmap_obj = final_state.get("roadmap")
@@ -263,9 +296,14 @@ def run_app_from_text(profile_text: str):
         "roadmap": roadmap_obj.model_dump() if roadmap_obj else None,
         "final_guide": final_state.get("final_guide") or "",
     }
-
     return result
 
+def stream_app_from_text(profile_text: str):
+    """Yield one event per completed node (analysis, project_ideas, roadmap, final_guide) as the graph runs."""
+    from graph_stream import stream_node_updates
+    get_llm()
+    return stream_node_updates(get_workflow(), {"profile_content": profile_text})
+
 
 def main():
     """
@@ -275,8 +313,6 @@ def main():
     # Load environment variables from .env file
     load_dotenv()
     
-    global llm # Set the global LLM variable
-    
     # Check for Google API key
     google_api_key = os.getenv("GOOGLE_API_KEY")
     if not google_api_key:
@@ -285,9 +321,7 @@ def main():
         return # Exit the script
 
     # Initialize the LLM
-    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", 
-                                 google_api_key=google_api_key, 
-                                 temperature=0.7)
+    get_llm()
 
     print("🚀 Welcome to the Portfolio Roadmap Generator!", file=sys.stderr)
     
@@ -300,7 +334,7 @@ def main():
         
         print(f"✅ Successfully loaded profile from {filepath}", file=sys.stderr)
         
-        app = build_graph()
+        app = get_workflow()
         final_state = app.invoke({"profile_content": profile_text})
         analysis_obj = final_state.get("analysis")
         roadmap_obj = final_state.get("roadmap")
@@ -335,13 +369,22 @@ def main():
         print(f"❌ An unexpected error occurred: {e}")
 
 if __name__ == "__main__":
-    # CLI mode: python portfolioBuilder.py <profile_text_path>
-    if len(sys.argv) >= 2:
+    # CLI mode: python portfolioBuilder.py <profile_text_path> [--stream] [--budget SECONDS]
+    # --stream prints one JSON line per completed node (see graph_stream.py)
+    stream = "--stream" in sys.argv
+    args = [a for a in sys.argv[1:] if a != "--stream"]
+    budget = deadline.budget_from_argv(args)
+    if args:
         try:
-            with open(sys.argv[1], 'r', encoding='utf-8') as f:
+            with open(args[0], 'r', encoding='utf-8') as f:
                 text = f.read()
-            organized = run_app_from_text(text)
-            print(json.dumps(organized, ensure_ascii=False, indent=2))
+            if stream:
+                from graph_stream import emit_jsonl
+                with deadline.within(budget):
+                    emit_jsonl(stream_app_from_text(text))
+            else:
+                organized = run_app_from_text(text, budget=budget)
+                print(json.dumps(organized, ensure_ascii=False, indent=2))
         except Exception as e:
             print(json.dumps({"error": str(e)}))
     else:
@@ -0,0 +1,131 @@
+"""
+Profile Analysis Agent
+Runs the resume, transcript, certificate and GitHub pipelines as concurrent
+branches of one LangGraph graph in a single process and merges their outputs.
+"""
+
+import sys
+import json
+import contextlib
+from typing import TypedDict, Optional, Dict
+from dotenv import load_dotenv
+
+import resume
+import transcript
+import certificate
+import github
+import deadline
+
+load_dotenv()
+
+# ============================================================
+# 1. STATE
+# ============================================================
+
+class ProfileAnalysisState(TypedDict, total=False):
+    resume_path: Optional[str]
+    transcript_path: Optional[str]
+    certificate_path: Optional[str]
+    github_url: Optional[str]
+    resume: Optional[Dict]
+    transcript: Optional[Dict]
+    certificate: Optional[Dict]
+    github: Optional[Dict]
+
+# ============================================================
+# 2. BRANCH NODES
+# ============================================================
+
+def _run_branch(runner, arg: Optional[str]) -> Optional[Dict]:
+    """Run one module's pipeline; a failing branch reports its error instead of failing the rest."""
+    if not arg:
+        return None
+    try:
+        return runner(arg)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+def node_resume(state: ProfileAnalysisState):
+    return {"resume": _run_branch(resume.run_resume_analysis, state.get("resume_path"))}
+
+def node_transcript(state: ProfileAnalysisState):
+    return {"transcript": _run_branch(transcript.run_transcript_analysis, state.get("transcript_path"))}
+
+def node_certificate(state: ProfileAnalysisState):
+    return {"certificate": _run_branch(certificate.run_certificate_analysis, state.get("certificate_path"))}
+
+def node_github(state: ProfileAnalysisState):
+    return {"github": _run_branch(github.run_github_analysis, state.get("github_url"))}
+
+# ============================================================
+# 3. GRAPH WORKFLOW
+# ============================================================
+
+BRANCHES = {
+    "resume": node_resume,
+    "transcript": node_transcript,
+    "certificate": node_certificate,
+    "github": node_github,
+}
+
+_workflow = None
+
+def build_workflow():
+    from langgraph.graph import StateGraph, START, END
+    from instrumentation import instrument
+
+    graph = StateGraph(ProfileAnalysisState)
+    for name, node in BRANCHES.items():
+        graph.add_node(name, node)
+        graph.add_edge(START, name)
+        graph.add_edge(name, END)
+    return instrument(graph.compile(), "profileAnalysis")
+
+def get_workflow():
+    global _workflow
+    if _workflow is None:
+        _workflow = build_workflow()
+    return _workflow
+
+# ============================================================
+# 4. EXECUTION
+# ============================================================
+
+def run_profile_analysis(
+    resume_path: Optional[str] = None,
+    transcript_path: Optional[str] = None,
+    certificate_path: Optional[str] = None,
+    github_url: Optional[str] = None,
+    budget: Optional[float] = None,
+) -> Dict:
+    """
+    Analyze all provided inputs concurrently and return one merged result.
+    budget (seconds) is shared by the branches; a branch that runs out reports its error.
+    """
+    with deadline.within(budget):
+        result = get_workflow().invoke({
+            "resume_path": resume_path,
+            "transcript_path": transcript_path,
+            "certificate_path": certificate_path,
+            "github_url": github_url,
+        })
+    return {name: result.get(name) for name in BRANCHES}
+
+# ============================================================
+# 5. MAIN
+# ============================================================
+
+if __name__ == "__main__":
+    # CLI usage: python profileAnalysis.py <resume_image> <transcript_image> <certificate_image> <github_url>
+    # Pass "-" to skip an input; --budget SECONDS sets a deadline. Outputs merged JSON to stdout; logs go to stderr.
+    budget = deadline.budget_from_argv(sys.argv)
+    if len(sys.argv) < 5:
+        print(json.dumps({
+            "error": "Usage: python profileAnalysis.py <resume_image> <transcript_image> <certificate_image> <github_url>"
+        }))
+        sys.exit(1)
+    inputs = [None if a.strip() == "-" else a.strip() for a in sys.argv[1:5]]
+    # Some agents print progress to stdout; keep stdout for the JSON result only
+    with contextlib.redirect_stdout(sys.stderr):
+        output = run_profile_analysis(*inputs, budget=budget)
+    print(json.dumps(output))
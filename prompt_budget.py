@@ -0,0 +1,70 @@
+"""
+Compact serialization of structured data embedded in prompts.
+Input tokens drive both latency and cost, so everything an agent pastes into a
+prompt goes through here instead of json.dumps(..., indent=2):
+
+- no indentation or spaces after separators
+- None, "", [] and {} fields are dropped
+- lists are cut to a per-field item budget (a trailing "+N more" marks the cut)
+- long strings are cut to a character budget
+
+    to_prompt_json(job_analysis, field_budgets={"top_10_in_demand_skills": 5})
+"""
+
+import re
+import json
+from typing import Any, Dict, Optional
+
+DEFAULT_MAX_ITEMS = 10
+DEFAULT_MAX_CHARS = 600
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or (isinstance(value, (str, list, dict)) and not value)
+
+
+def _truncate_str(text: str, max_chars: int) -> str:
+    if max_chars and len(text) > max_chars:
+        return text[:max_chars].rstrip() + "…"
+    return text
+
+
+def compact(value: Any, max_items: int = DEFAULT_MAX_ITEMS, max_chars: int = DEFAULT_MAX_CHARS,
+            field_budgets: Optional[Dict[str, int]] = None, _field: Optional[str] = None) -> Any:
+    """Recursively drop empty fields and apply the list/string budgets (0 disables a budget)."""
+    if hasattr(value, "model_dump"):
+        value = value.model_dump()
+    if isinstance(value, dict):
+        out = {}
+        for key, item in value.items():
+            item = compact(item, max_items, max_chars, field_budgets, str(key))
+            if not _is_empty(item):
+                out[key] = item
+        return out
+    if isinstance(value, (list, tuple)):
+        limit = (field_budgets or {}).get(_field, max_items) if _field else max_items
+        items = [compact(v, max_items, max_chars, field_budgets) for v in value]
+        items = [v for v in items if not _is_empty(v)]
+        if limit and len(items) > limit:
+            items = items[:limit] + [f"+{len(items) - limit} more"]
+        return items
+    if isinstance(value, str):
+        return _truncate_str(value.strip(), max_chars)
+    return value
+
+
+def to_prompt_json(value: Any, max_items: int = DEFAULT_MAX_ITEMS, max_chars: int = DEFAULT_MAX_CHARS,
+                   field_budgets: Optional[Dict[str, int]] = None) -> str:
+    """compact() rendered as minified JSON."""
+    return json.dumps(
+        compact(value, max_items, max_chars, field_budgets),
+        ensure_ascii=False, separators=(",", ":"), default=str,
+    )
+
+
+def compact_text(text: str, max_chars: int) -> str:
+    """Collapse whitespace runs in free text (keeping paragraph breaks) and cap its length."""
+    text = re.sub(r"[ \t\r\f\v]+", " ", text or "")
+    text = re.sub(r" ?\n[ \n]*\n", "\n\n", text)
+    text = re.sub(r" ?\n ?", "\n", text)
+    return _truncate_str(text.strip(), max_chars)
@@ -0,0 +1,365 @@
+"""
+Process-wide quota control for Gemini calls.
+llm_clients.get_chat_model() attaches the limiter for its model to every client,
+so all agents (and every thread or event loop inside one process) share one view
+of the quota:
+
+  - token buckets for requests per minute and tokens per minute; a call reserves
+    its estimated prompt tokens up front and settles with the reported usage,
+  - a cap on calls in flight,
+  - retries with exponential backoff and jitter on 429 and 5xx/connection errors,
+    honouring the server's retry delay when it sends one. A 429 also pauses every
+    caller of that model and halves its rate, which recovers gradually on success.
+
+Calls wait in the queue instead of failing the pipeline, but never past the
+request's deadline (deadline.py): a call that cannot get a slot, or a retry that
+would sleep past it, raises instead, and each request carries the time left as
+its timeout. Only real API calls are limited; llm_cache hits never reach the limiter. Streaming calls (_stream) are not
+limited; no agent streams model tokens.
+
+Configuration (environment; 0 disables a limit):
+    LLM_RPM              Requests per minute per model (default: per-model table below)
+    LLM_TPM              Tokens per minute per model (default: per-model table below)
+    LLM_MAX_IN_FLIGHT    Concurrent calls per model (default: 8)
+    LLM_MAX_RETRIES      Retries after a 429/5xx before the error is raised (default: 5)
+    LLM_BACKOFF_MAX      Longest single backoff in seconds (default: 60)
+    LLM_LIMITS_<MODEL>   Per-model override, e.g. LLM_LIMITS_GEMINI_2_5_PRO="rpm=150,tpm=2000000,in_flight=4"
+"""
+
+import os
+import re
+import time
+import random
+import asyncio
+import threading
+from typing import Callable, Dict, Optional
+
+import deadline
+import token_usage
+
+# Paid tier 1 quotas; free-tier keys should lower these through the environment
+DEFAULT_LIMITS = {
+    "gemini-2.5-pro": {"rpm": 150, "tpm": 2_000_000},
+    "gemini-2.5-flash": {"rpm": 1000, "tpm": 1_000_000},
+}
+FALLBACK_LIMITS = {"rpm": 1000, "tpm": 1_000_000}
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_MAX = 60.0
+BACKOFF_BASE = 1.0
+IN_FLIGHT_POLL = 0.05
+MIN_RATE_FACTOR = 0.1
+RECOVERY_STEP = 0.05
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+_RETRY_DELAY = re.compile(r"retry(?:Delay['\"]?:\s*['\"]|\s+in\s+)(\d+(?:\.\d+)?)s", re.IGNORECASE)
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def limits_for(model: str) -> Dict[str, float]:
+    """Effective {"rpm", "tpm", "in_flight"} for a model: table, then LLM_* env, then LLM_LIMITS_<MODEL>."""
+    limits = dict(DEFAULT_LIMITS.get(model, FALLBACK_LIMITS))
+    limits["rpm"] = _env_number("LLM_RPM", limits["rpm"])
+    limits["tpm"] = _env_number("LLM_TPM", limits["tpm"])
+    limits["in_flight"] = _env_number("LLM_MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT)
+    override = os.getenv("LLM_LIMITS_" + re.sub(r"[^A-Z0-9]", "_", model.upper()), "")
+    for item in filter(None, (part.strip() for part in override.split(","))):
+        key, _, value = item.partition("=")
+        try:
+            if key.strip() in limits:
+                limits[key.strip()] = float(value)
+        except ValueError:
+            pass
+    return limits
+
+# ============================================================
+# 1. ERROR CLASSIFICATION
+# ============================================================
+
+def _status(error: BaseException) -> Optional[int]:
+    """HTTP status of an error or anything in its cause chain."""
+    seen = 0
+    while error is not None and seen < 5:
+        for attr in ("code", "status_code"):
+            value = getattr(error, attr, None)
+            if isinstance(value, int):
+                return value
+        response = getattr(error, "response", None)
+        if isinstance(getattr(response, "status_code", None), int):
+            return response.status_code
+        error = error.__cause__ or error.__context__
+        seen += 1
+    return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    from langchain_core.exceptions import (
+        ModelAPIError, ModelConnectionError, ModelRateLimitError, ModelTimeoutError,
+    )
+    if isinstance(error, (ModelRateLimitError, ModelAPIError, ModelConnectionError, ModelTimeoutError)):
+        return True
+    return _status(error) in RETRYABLE_STATUS
+
+
+def is_rate_limit(error: BaseException) -> bool:
+    from langchain_core.exceptions import ModelRateLimitError
+    return isinstance(error, ModelRateLimitError) or _status(error) == 429
+
+
+def server_retry_delay(error: BaseException) -> Optional[float]:
+    """Delay requested by the server (Gemini puts retryDelay / "retry in Ns" in the message)."""
+    match = _RETRY_DELAY.search(str(error))
+    return float(match.group(1)) if match else None
+
+# ============================================================
+# 2. LIMITER
+# ============================================================
+
+class ModelLimiter:
+    """Token buckets, in-flight cap and adaptive backoff for one model."""
+
+    def __init__(self, model: str, rpm: float, tpm: float, in_flight: float):
+        self.model = model
+        self.rpm = max(0.0, rpm)
+        self.tpm = max(0.0, tpm)
+        self.max_in_flight = int(in_flight) if in_flight > 0 else 0
+        self.max_retries = int(_env_number("LLM_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+        self.backoff_max = _env_number("LLM_BACKOFF_MAX", DEFAULT_BACKOFF_MAX)
+        self._cond = threading.Condition()
+        self._requests = self.rpm
+        self._tokens = self.tpm
+        self._updated = time.monotonic()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._factor = 1.0
+        self.calls = self.queued = self.retries = self.throttled = self.failures = 0
+        self.queued_seconds = 0.0
+
+    # --- buckets ---
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        per_second = self._factor / 60.0
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm * per_second)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm * per_second)
+
+    def _reserve(self, tokens: int) -> float:
+        """Take a slot and return 0, or return the seconds to wait before trying again."""
+        now = time.monotonic()
+        self._refill(now)
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self.max_in_flight and self._in_flight >= self.max_in_flight:
+            return IN_FLIGHT_POLL
+        wait = 0.0
+        rate = self._factor / 60.0
+        if self.rpm and self._requests < 1:
+            wait = max(wait, (1 - self._requests) / (self.rpm * rate))
+        tokens = min(tokens, self.tpm) if self.tpm else 0
+        if tokens and self._tokens < tokens:
+            wait = max(wait, (tokens - self._tokens) / (self.tpm * rate))
+        if wait > 0:
+            return wait
+        if self.rpm:
+            self._requests -= 1
+        self._tokens -= tokens
+        self._in_flight += 1
+        return 0.0
+
+    def _waited(self, started: float) -> None:
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            self.queued += 1
+            self.queued_seconds += waited
+
+    @staticmethod
+    def _check_deadline(wait: float) -> None:
+        if not deadline.allows(wait):
+            raise deadline.DeadlineExceeded("deadline exceeded waiting for LLM quota")
+
+    def acquire(self, tokens: int) -> None:
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                wait = self._reserve(tokens)
+                if wait <= 0:
+                    break
+                self._check_deadline(wait)
+                self._cond.wait(wait)
+            self._waited(started)
+
+    async def aacquire(self, tokens: int) -> None:
+        started = time.monotonic()
+        while True:
+            with self._cond:
+                wait = self._reserve(tokens)
+                if wait <= 0:
+                    self._waited(started)
+                    return
+            self._check_deadline(wait)
+            await asyncio.sleep(wait)
+
+    def release(self, token_correction: int = 0) -> None:
+        """Free the in-flight slot; token_correction settles the estimate against real usage."""
+        with self._cond:
+            self._in_flight -= 1
+            if self.tpm:
+                self._tokens = min(self.tpm, self._tokens - token_correction)
+            self._cond.notify_all()
+
+    # --- adaptive backoff ---
+
+    def backoff(self, error: BaseException, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying after `error`, or None to give up."""
+        if attempt >= self.max_retries or not is_retryable(error):
+            with self._cond:
+                self.failures += 1
+            return None
+        delay = server_retry_delay(error)
+        if delay is None:
+            delay = min(self.backoff_max, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+        delay = min(delay, self.backoff_max)
+        if not deadline.allows(delay):
+            with self._cond:
+                self.failures += 1
+            return None
+        with self._cond:
+            self.retries += 1
+            if is_rate_limit(error):
+                # Everyone backs off, not just this caller, and the sustained rate drops
+                self.throttled += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                self._factor = max(MIN_RATE_FACTOR, self._factor / 2)
+        try:
+            from instrumentation import record_retry
+            record_retry()
+        except ImportError:
+            pass
+        return delay
+
+    def succeeded(self) -> None:
+        with self._cond:
+            self.calls += 1
+            self._factor = min(1.0, self._factor + RECOVERY_STEP)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "rpm": self.rpm, "tpm": self.tpm, "max_in_flight": self.max_in_flight,
+                "rate_factor": round(self._factor, 2), "in_flight": self._in_flight,
+                "calls": self.calls, "queued": self.queued, "queued_seconds": round(self.queued_seconds, 2),
+                "retries": self.retries, "throttled": self.throttled, "failures": self.failures,
+            }
+
+# ============================================================
+# 3. CALL WRAPPING
+# ============================================================
+
+def _used_tokens(result, estimate: int) -> int:
+    from langchain_core.outputs import LLMResult
+    usage = token_usage.response_usage(LLMResult(generations=[result.generations]), estimate * 4)
+    return usage["input_tokens"] + usage["output_tokens"]
+
+
+def call(limiter: ModelLimiter, fn: Callable, messages) -> object:
+    """Run fn() (one model request) under the limiter, retrying retryable errors."""
+    estimate = token_usage.prompt_chars([messages]) // 4
+    attempt = 0
+    while True:
+        deadline.check("LLM call")
+        limiter.acquire(estimate)
+        try:
+            result = fn()
+        except Exception as e:
+            limiter.release()
+            delay = limiter.backoff(e, attempt)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            attempt += 1
+            continue
+        limiter.release(_used_tokens(result, estimate) - estimate)
+        limiter.succeeded()
+        return result
+
+
+async def acall(limiter: ModelLimiter, fn: Callable, messages) -> object:
+    """Async counterpart of call(); fn() returns an awaitable."""
+    estimate = token_usage.prompt_chars([messages]) // 4
+    attempt = 0
+    while True:
+        deadline.check("LLM call")
+        await limiter.aacquire(estimate)
+        try:
+            result = await fn()
+        except Exception as e:
+            limiter.release()
+            delay = limiter.backoff(e, attempt)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        limiter.release(_used_tokens(result, estimate) - estimate)
+        limiter.succeeded()
+        return result
+
+
+_limiters: Dict[str, ModelLimiter] = {}
+_lock = threading.Lock()
+
+
+def limiter_for(model: str) -> ModelLimiter:
+    """The process-wide limiter for a model (quota is per model, not per client)."""
+    with _lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limiter = _limiters[model] = ModelLimiter(model, **limits_for(model))
+    return limiter
+
+
+def attach(client, model: str):
+    """
+    Route client's model requests through the limiter for `model`. The wrappers are
+    set on the instance, so the class (and with it the llm_cache key) is unchanged.
+    The provider's own retries are turned off per request; backoff happens here,
+    where it is coordinated across callers. Under a deadline each attempt's timeout
+    is capped at the time left.
+    """
+    limiter = limiter_for(model)
+    generate, agenerate = client._generate, client._agenerate
+    fields = getattr(type(client), "model_fields", {})
+
+    def request_kwargs(kwargs: dict) -> dict:
+        kwargs = dict(kwargs)
+        if "max_retries" in fields:
+            kwargs.setdefault("max_retries", 1)
+        if "timeout" in fields and deadline.remaining() is not None:
+            kwargs["timeout"] = deadline.timeout(kwargs.get("timeout") or client.timeout or float("inf"))
+        return kwargs
+
+    def _generate(messages, stop=None, run_manager=None, **kwargs):
+        return call(limiter, lambda: generate(messages, stop=stop, run_manager=run_manager,
+                                              **request_kwargs(kwargs)), messages)
+
+    async def _agenerate(messages, stop=None, run_manager=None, **kwargs):
+        return await acall(limiter, lambda: agenerate(messages, stop=stop, run_manager=run_manager,
+                                                      **request_kwargs(kwargs)), messages)
+
+    object.__setattr__(client, "_generate", _generate)
+    object.__setattr__(client, "_agenerate", _agenerate)
+    return client
+
+
+def stats() -> Dict[str, dict]:
+    """Per-model limiter counters for this process."""
+    with _lock:
+        limiters = list(_limiters.values())
+    return {limiter.model: limiter.stats() for limiter in limiters}
@@ -1,15 +1,13 @@
 import os
 import sys
 import json
-import base64
-from io import BytesIO
-from typing import TypedDict
+from typing import Optional, TypedDict
 from dotenv import load_dotenv
-from PIL import Image
 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import HumanMessage
-from langgraph.graph import StateGraph
+from llm_clients import get_chat_model
+from model_router import route
+from image_loader import image_to_data_uri
+import deadline
 
 load_dotenv()
 
@@ -21,20 +19,13 @@ class ResumeState(TypedDict, total=False):
 
 
 # ====== MODEL SETUP ======
-gemini_model = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0.2,
-    api_key=os.environ.get("GOOGLE_API_KEY")
-)
-
-
-# ====== HELPER FUNCTION ======
-def image_to_base64_str(image: Image.Image, fmt: str = "PNG") -> str:
-    """Convert a PIL image into a base64-encoded data URI."""
-    buffered = BytesIO()
-    image.save(buffered, format=fmt)
-    b64 = base64.b64encode(buffered.getvalue()).decode("utf-8")
-    return f"data:image/{fmt.lower()};base64,{b64}"
+# Built on first use so importing this module stays cheap
+def get_model():
+    return get_chat_model(
+        route("resume"),
+        temperature=0.2,
+        api_key=os.environ.get("GOOGLE_API_KEY")
+    )
 
 
 # ====== EXTRACTION NODE ======
@@ -43,8 +34,10 @@ def extract_resume_info(state: ResumeState) -> ResumeState:
     if not img_path:
         raise ValueError("image_path must be provided in state")
 
-    image = Image.open(img_path)
-    data_uri = image_to_base64_str(image)
+    from langchain_core.messages import HumanMessage
+
+    # Original bytes when already accepted and in budget; re-encoded only to downscale/convert
+    data_uri = image_to_data_uri(img_path)
 
     prompt = """
 You are a professional resume parsing expert.
@@ -96,7 +89,7 @@ Return only valid JSON without commentary or extra text.
         ]
     )
 
-    response = gemini_model.invoke([message])
+    response = get_model().invoke([message])
     text = response.content
     if isinstance(text, list):
         text = " ".join([part["text"] for part in text if isinstance(part, dict) and "text" in part])
@@ -111,6 +104,8 @@ def analyze_resume(state: ResumeState) -> ResumeState:
     if not extracted:
         raise ValueError("extracted_data must be present in state")
 
+    from langchain_core.messages import HumanMessage
+
     analysis_prompt = f"""
 You are a career and recruitment analyst.
 
@@ -133,7 +128,7 @@ Write this as a structured, readable analytical report in natural English with b
 """
 
     message = HumanMessage(content=[{"type": "text", "text": analysis_prompt}])
-    response = gemini_model.invoke([message])
+    response = get_model().invoke([message])
     text = response.content
     if isinstance(text, list):
         text = " ".join([part["text"] for part in text if isinstance(part, dict) and "text" in part])
@@ -143,28 +138,50 @@ Write this as a structured, readable analytical report in natural English with b
 
 
 # ====== WORKFLOW GRAPH ======
-graph = StateGraph(ResumeState)
-graph.add_node("extract", extract_resume_info)
-graph.add_node("analyze", analyze_resume)
-graph.add_edge("extract", "analyze")
-graph.set_entry_point("extract")
-graph.set_finish_point("analyze")
-
-workflow = graph.compile()
+_workflow = None
+
+def get_workflow():
+    """Compile the workflow on first use and reuse it afterwards."""
+    global _workflow
+    if _workflow is None:
+        from langgraph.graph import StateGraph
+        from instrumentation import instrument
+
+        graph = StateGraph(ResumeState)
+        graph.add_node("extract", extract_resume_info)
+        graph.add_node("analyze", analyze_resume)
+        graph.add_edge("extract", "analyze")
+        graph.set_entry_point("extract")
+        graph.set_finish_point("analyze")
+        _workflow = instrument(graph.compile(), "resume")
+    return _workflow
+
+
+def __getattr__(name):
+    # Keep `resume.workflow` / `resume.gemini_model` working without import-time setup
+    if name == "workflow":
+        return get_workflow()
+    if name == "gemini_model":
+        return get_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ====== RUNNER ======
+def run_resume_analysis(image_path: str, budget: Optional[float] = None) -> dict:
+    """Run the resume workflow on an image and return the JSON-ready output (budget: seconds)."""
+    if not os.path.exists(image_path):
+        return {"error": f"Resume file not found at '{image_path}'"}
+    with deadline.within(budget):
+        result = get_workflow().invoke({"image_path": image_path})
+    return {
+        "extracted_data": result.get("extracted_data"),
+        "analysis": result.get("analysis"),
+    }
 
 
 # ====== MAIN RUNNER ======
 if __name__ == "__main__":
-    # Accept CLI path, fallback to default
+    # Accept CLI path (plus optional --budget SECONDS), fallback to default
+    budget = deadline.budget_from_argv(sys.argv)
     resume_file = sys.argv[1] if len(sys.argv) > 1 else "image.png"
-    if not os.path.exists(resume_file):
-        print(json.dumps({
-            "error": f"Resume file not found at '{resume_file}'"
-        }))
-    else:
-        result = workflow.invoke({"image_path": resume_file})
-        output = {
-            "extracted_data": result.get("extracted_data"),
-            "analysis": result.get("analysis"),
-        }
-        print(json.dumps(output))
\ No newline at end of file
+    print(json.dumps(run_resume_analysis(resume_file, budget=budget)))
\ No newline at end of file
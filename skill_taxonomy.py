@@ -0,0 +1,324 @@
+"""
+Canonical skill taxonomy shared by skillpath.py and course.py.
+Maps free-form skill strings ("Proficiency in Python (3.x)", "k8s", "Team work")
+to canonical skill ids so skill gaps can be computed as a set difference.
+
+Matching, cheapest first:
+    1. exact alias lookup on the normalized string
+    2. token trie scan: every alias phrase contained in the text ("Python and SQL for analytics")
+    3. fuzzy similarity against all aliases (typos, spacing: "tensor flow", "scikit learn")
+
+Strings that match nothing are returned as leftovers for the caller to handle (e.g. with an LLM).
+"""
+
+import re
+import difflib
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+class Skill(NamedTuple):
+    id: str
+    name: str
+    category: str  # "technical" or "soft"
+    aliases: Tuple[str, ...]
+
+
+# (id, display name, category, aliases). The display name is always an alias too.
+_SKILLS = [
+    # --- Programming languages ---
+    ("python", "Python", "technical", ("python3", "python 3", "py")),
+    ("java", "Java", "technical", ("core java", "java se")),
+    ("javascript", "JavaScript", "technical", ("js", "ecmascript", "es6", "vanilla js")),
+    ("typescript", "TypeScript", "technical", ("ts",)),
+    ("c", "C", "technical", ("c programming", "ansi c")),
+    ("cpp", "C++", "technical", ("cpp", "c plus plus", "modern c++")),
+    ("csharp", "C#", "technical", ("c sharp", "csharp", ".net c#")),
+    ("go", "Go", "technical", ("golang",)),
+    ("rust", "Rust", "technical", ()),
+    ("kotlin", "Kotlin", "technical", ()),
+    ("swift", "Swift", "technical", ()),
+    ("r", "R", "technical", ("r programming", "r language", "rstudio")),
+    ("scala", "Scala", "technical", ()),
+    ("php", "PHP", "technical", ()),
+    ("ruby", "Ruby", "technical", ("ruby on rails", "rails")),
+    ("matlab", "MATLAB", "technical", ()),
+    ("bash", "Shell Scripting", "technical", ("bash", "shell", "bash scripting", "shell scripting", "unix shell")),
+    ("sql", "SQL", "technical", ("structured query language", "sql queries", "t-sql", "pl/sql", "plsql")),
+    # --- Web ---
+    ("html_css", "HTML/CSS", "technical", ("html", "css", "html5", "css3", "html css")),
+    ("react", "React", "technical", ("reactjs", "react.js", "react js")),
+    ("angular", "Angular", "technical", ("angularjs",)),
+    ("vue", "Vue.js", "technical", ("vue", "vuejs", "vue js")),
+    ("nodejs", "Node.js", "technical", ("node", "nodejs", "node js")),
+    ("express", "Express.js", "technical", ("express", "expressjs")),
+    ("django", "Django", "technical", ()),
+    ("flask", "Flask", "technical", ()),
+    ("fastapi", "FastAPI", "technical", ("fast api",)),
+    ("spring", "Spring Boot", "technical", ("spring", "spring framework")),
+    ("rest_api", "REST APIs", "technical", ("rest", "restful apis", "rest api", "api design", "restful services", "web apis")),
+    ("graphql", "GraphQL", "technical", ()),
+    ("tailwind", "Tailwind CSS", "technical", ("tailwind",)),
+    # --- Data & ML ---
+    ("machine_learning", "Machine Learning", "technical", ("ml", "machine learning algorithms", "ml algorithms")),
+    ("deep_learning", "Deep Learning", "technical", ("dl", "neural networks", "deep neural networks")),
+    ("nlp", "Natural Language Processing", "technical", ("nlp", "text mining", "language models")),
+    ("computer_vision", "Computer Vision", "technical", ("cv", "image processing", "opencv")),
+    ("llm", "Large Language Models", "technical", ("llms", "generative ai", "genai", "prompt engineering", "langchain")),
+    ("reinforcement_learning", "Reinforcement Learning", "technical", ("rl",)),
+    ("statistics", "Statistics", "technical", ("statistical analysis", "probability", "probability and statistics", "inferential statistics", "hypothesis testing")),
+    ("linear_algebra", "Linear Algebra", "technical", ("mathematics for machine learning", "calculus and linear algebra")),
+    ("data_analysis", "Data Analysis", "technical", ("data analytics", "exploratory data analysis", "eda", "analytics")),
+    ("data_visualization", "Data Visualization", "technical", ("visualization", "matplotlib", "seaborn", "plotly", "data viz")),
+    ("tableau", "Tableau", "technical", ()),
+    ("power_bi", "Power BI", "technical", ("powerbi",)),
+    ("excel", "Excel", "technical", ("microsoft excel", "ms excel", "spreadsheets", "advanced excel")),
+    ("pandas", "Pandas", "technical", ()),
+    ("numpy", "NumPy", "technical", ()),
+    ("scikit_learn", "scikit-learn", "technical", ("sklearn", "scikit learn")),
+    ("tensorflow", "TensorFlow", "technical", ("tf", "keras")),
+    ("pytorch", "PyTorch", "technical", ("torch",)),
+    ("data_engineering", "Data Engineering", "technical", ("etl", "data pipelines", "elt", "data pipeline")),
+    ("spark", "Apache Spark", "technical", ("spark", "pyspark")),
+    ("hadoop", "Hadoop", "technical", ("hdfs", "mapreduce")),
+    ("kafka", "Apache Kafka", "technical", ("kafka",)),
+    ("airflow", "Apache Airflow", "technical", ("airflow",)),
+    ("data_warehousing", "Data Warehousing", "technical", ("data warehouse", "snowflake", "bigquery", "redshift")),
+    ("feature_engineering", "Feature Engineering", "technical", ()),
+    ("model_deployment", "Model Deployment", "technical", ("model serving", "ml deployment", "deploying models", "deploying machine learning models")),
+    ("mlops", "MLOps", "technical", ("ml ops", "mlflow", "ml pipelines")),
+    ("big_data", "Big Data", "technical", ("big data technologies",)),
+    # --- Databases ---
+    ("databases", "Databases", "technical", ("database management", "dbms", "relational databases", "database design", "rdbms")),
+    ("postgresql", "PostgreSQL", "technical", ("postgres",)),
+    ("mysql", "MySQL", "technical", ()),
+    ("mongodb", "MongoDB", "technical", ("mongo",)),
+    ("nosql", "NoSQL", "technical", ("nosql databases", "cassandra", "dynamodb")),
+    ("redis", "Redis", "technical", ()),
+    # --- Cloud & DevOps ---
+    ("cloud", "Cloud Computing", "technical", ("cloud platforms", "cloud services", "cloud")),
+    ("aws", "AWS", "technical", ("amazon web services", "ec2", "s3", "aws lambda")),
+    ("azure", "Microsoft Azure", "technical", ("azure",)),
+    ("gcp", "Google Cloud Platform", "technical", ("gcp", "google cloud")),
+    ("docker", "Docker", "technical", ("containers", "containerization")),
+    ("kubernetes", "Kubernetes", "technical", ("k8s", "container orchestration")),
+    ("ci_cd", "CI/CD", "technical", ("ci cd", "continuous integration", "continuous deployment", "github actions", "jenkins")),
+    ("devops", "DevOps", "technical", ()),
+    ("terraform", "Terraform", "technical", ("infrastructure as code", "iac")),
+    ("linux", "Linux", "technical", ("unix", "linux administration")),
+    ("git", "Git", "technical", ("version control", "github", "gitlab", "git version control")),
+    ("networking", "Computer Networking", "technical", ("networking", "tcp/ip", "computer networks", "network protocols")),
+    ("cybersecurity", "Cybersecurity", "technical", ("security", "information security", "network security", "application security")),
+    ("microservices", "Microservices", "technical", ("microservice architecture",)),
+    ("system_design", "System Design", "technical", ("software architecture", "distributed systems", "scalable systems")),
+    # --- CS fundamentals & practice ---
+    ("dsa", "Data Structures and Algorithms", "technical", ("data structures", "algorithms", "dsa")),
+    ("oop", "Object-Oriented Programming", "technical", ("oop", "object oriented programming", "object oriented design")),
+    ("testing", "Software Testing", "technical", ("unit testing", "testing", "test automation", "pytest", "jest", "tdd")),
+    ("agile", "Agile Methodologies", "technical", ("agile", "scrum", "kanban", "agile methodology")),
+    ("mobile_dev", "Mobile Development", "technical", ("android development", "ios development", "mobile app development", "flutter", "react native")),
+    ("web_dev", "Web Development", "technical", ("full stack development", "frontend development", "backend development", "web development")),
+    ("ui_ux", "UI/UX Design", "technical", ("ui design", "ux design", "user experience", "figma", "user interface design")),
+    ("blockchain", "Blockchain", "technical", ("solidity", "smart contracts", "web3")),
+    ("embedded", "Embedded Systems", "technical", ("microcontrollers", "arduino", "raspberry pi", "iot")),
+    # --- Soft skills ---
+    ("communication", "Communication", "soft", ("communication skills", "verbal communication", "written communication", "effective communication")),
+    ("presentation", "Presentation Skills", "soft", ("presentation", "public speaking", "presenting")),
+    ("teamwork", "Teamwork", "soft", ("team work", "collaboration", "team player", "collaborative")),
+    ("leadership", "Leadership", "soft", ("team leadership", "leading teams", "people management")),
+    ("problem_solving", "Problem Solving", "soft", ("problem-solving", "analytical problem solving", "troubleshooting")),
+    ("critical_thinking", "Critical Thinking", "soft", ("analytical thinking", "analytical skills", "logical reasoning")),
+    ("time_management", "Time Management", "soft", ("prioritization", "organization", "organizational skills")),
+    ("adaptability", "Adaptability", "soft", ("flexibility", "continuous learning", "learning agility", "willingness to learn")),
+    ("creativity", "Creativity", "soft", ("innovation", "creative thinking")),
+    ("attention_to_detail", "Attention to Detail", "soft", ("detail oriented", "detail-oriented")),
+    ("stakeholder_management", "Stakeholder Management", "soft", ("stakeholder communication", "client management", "business communication")),
+    ("project_management", "Project Management", "soft", ("project planning", "pmp")),
+    ("business_acumen", "Business Acumen", "soft", ("domain knowledge", "business understanding", "business analysis")),
+    ("storytelling", "Data Storytelling", "soft", ("storytelling", "storytelling with data")),
+    ("mentoring", "Mentoring", "soft", ("coaching",)),
+    ("negotiation", "Negotiation", "soft", ()),
+    ("emotional_intelligence", "Emotional Intelligence", "soft", ("empathy", "interpersonal skills")),
+    ("curiosity", "Curiosity", "soft", ("intellectual curiosity", "research skills", "research")),
+    ("ethics", "Ethics", "soft", ("ai ethics", "responsible ai", "ethical judgment")),
+]
+
+SKILLS: Dict[str, Skill] = {
+    sid: Skill(sid, name, category, tuple(aliases)) for sid, name, category, aliases in _SKILLS
+}
+
+# Having the key skill also satisfies these broader requirements
+IMPLIES: Dict[str, Tuple[str, ...]] = {
+    "pytorch": ("deep_learning", "machine_learning"),
+    "tensorflow": ("deep_learning", "machine_learning"),
+    "deep_learning": ("machine_learning",),
+    "scikit_learn": ("machine_learning",),
+    "nlp": ("machine_learning",),
+    "computer_vision": ("machine_learning",),
+    "reinforcement_learning": ("machine_learning",),
+    "pandas": ("data_analysis",),
+    "aws": ("cloud",),
+    "azure": ("cloud",),
+    "gcp": ("cloud",),
+    "kubernetes": ("docker",),
+    "postgresql": ("sql", "databases"),
+    "mysql": ("sql", "databases"),
+    "mongodb": ("nosql", "databases"),
+    "nosql": ("databases",),
+    "react": ("javascript", "web_dev"),
+    "angular": ("typescript", "web_dev"),
+    "vue": ("javascript", "web_dev"),
+    "nodejs": ("javascript", "web_dev"),
+    "express": ("nodejs",),
+    "django": ("python", "web_dev"),
+    "flask": ("python", "web_dev"),
+    "fastapi": ("python", "rest_api"),
+    "spring": ("java",),
+    "spark": ("big_data", "data_engineering"),
+    "hadoop": ("big_data",),
+    "airflow": ("data_engineering",),
+    "kafka": ("data_engineering",),
+    "tableau": ("data_visualization",),
+    "power_bi": ("data_visualization",),
+    "mlops": ("model_deployment",),
+}
+
+# Qualifiers that don't change which skill is meant
+_NOISE = {
+    "proficiency", "proficient", "fundamentals", "fundamental", "basics", "basic", "advanced", "intermediate",
+    "beginner", "experience", "experienced", "expertise", "expert", "knowledge", "knowledge of", "understanding",
+    "hands-on", "hands", "on", "skills", "skill", "strong", "solid", "good", "excellent", "familiarity",
+    "familiar", "with", "in", "of", "the", "and", "ability", "to", "using", "concepts", "principles",
+    "frameworks", "framework", "tools", "libraries", "development", "deployment", "programming", "working",
+    "for", "or", "a", "an", "as", "like", "such", "etc", "e.g", "practices", "practice", "techniques",
+    "methods", "platforms", "technologies", "applications", "workflows", "at", "scale",
+}
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+FUZZY_CUTOFF = 0.88
+
+
+def _tokens(text: str) -> List[str]:
+    text = re.sub(r"\([^)]*\)", " ", text.lower())  # drop parentheticals: "Python (3.x)"
+    return [t.strip("./-") or t for t in _TOKEN_RE.findall(text)]
+
+
+def normalize(text: str) -> str:
+    return " ".join(_tokens(text))
+
+
+def _core(text: str) -> str:
+    """Normalized text with qualifier words removed ("Proficiency in Python" -> "python")."""
+    return " ".join(t for t in _tokens(text) if t not in _NOISE)
+
+
+# ============================================================
+# INDEXES (built once per process)
+# ============================================================
+
+@lru_cache(maxsize=None)
+def _indexes():
+    aliases: Dict[str, str] = {}
+    trie: Dict = {}
+    for skill in SKILLS.values():
+        for alias in (skill.name,) + skill.aliases:
+            norm = normalize(alias)
+            if not norm:
+                continue
+            aliases.setdefault(norm, skill.id)
+            node = trie
+            for token in norm.split():
+                node = node.setdefault(token, {})
+            node.setdefault("$", skill.id)
+    return aliases, trie, sorted(aliases)
+
+
+def _scan(tokens: List[str]) -> Tuple[List[str], int]:
+    """
+    Longest alias phrases found anywhere in the token list (left to right, non-overlapping),
+    plus how many non-qualifier tokens were left uncovered.
+    """
+    _, trie, _ = _indexes()
+    found: List[str] = []
+    uncovered = 0
+    i = 0
+    while i < len(tokens):
+        node, match, end = trie, None, i
+        for j in range(i, len(tokens)):
+            node = node.get(tokens[j])
+            if node is None:
+                break
+            if "$" in node:
+                match, end = node["$"], j + 1
+        if match:
+            if match not in found:
+                found.append(match)
+            i = end
+        else:
+            uncovered += tokens[i] not in _NOISE
+            i += 1
+    return found, uncovered
+
+
+@lru_cache(maxsize=4096)
+def match_all(text: str) -> Tuple[str, ...]:
+    """All canonical skill ids a free-form skill string refers to (empty if none)."""
+    aliases, _, alias_list = _indexes()
+    for candidate in (normalize(text), _core(text)):
+        if candidate in aliases:
+            return (aliases[candidate],)
+    tokens = _tokens(text)
+    found, uncovered = _scan(tokens)
+    # Single-letter aliases ("c", "r") only count as a whole-string match, never inside phrases
+    found = [sid for sid in found if len(sid) > 1 or len(tokens) == 1]
+    # A phrase must be mostly made of known skills: "Quantum ML" is not just "ML"
+    if found and uncovered <= len(found) // 2:
+        return tuple(found)
+    core = _core(text)
+    if core:
+        close = difflib.get_close_matches(core, alias_list, n=1, cutoff=FUZZY_CUTOFF)
+        if close:
+            return (aliases[close[0]],)
+    return ()
+
+
+def match(text: str) -> Optional[str]:
+    """Best single canonical id for a skill string, or None."""
+    found = match_all(text)
+    return found[0] if found else None
+
+
+def canonicalize(skills: Iterable[str]) -> Tuple[Set[str], List[str]]:
+    """Canonical ids for a list of skill strings, plus the strings that matched nothing."""
+    ids: Set[str] = set()
+    unmatched: List[str] = []
+    for skill in skills:
+        if not isinstance(skill, str) or not skill.strip():
+            continue
+        found = match_all(skill)
+        if found:
+            ids.update(found)
+        else:
+            unmatched.append(skill)
+    return ids, unmatched
+
+
+def expand(skill_ids: Iterable[str]) -> Set[str]:
+    """Add every broader skill implied by the given ones (transitively)."""
+    result: Set[str] = set()
+    stack = list(skill_ids)
+    while stack:
+        sid = stack.pop()
+        if sid not in result:
+            result.add(sid)
+            stack.extend(IMPLIES.get(sid, ()))
+    return result
+
+
+def name(skill_id: str) -> str:
+    return SKILLS[skill_id].name
+
+
+def search_term(text: str) -> Optional[str]:
+    """Course search query for a skill string: the canonical name, lowercased, when it matches."""
+    skill_id = match(text)
+    return SKILLS[skill_id].name.lower() if skill_id else None
@@ -3,19 +3,35 @@
 import os
 import sys
 import json
-from typing import TypedDict, Dict, List, Optional
+import time
+import hashlib
+import operator
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TypedDict, Dict, List, Optional, Annotated
 from dotenv import load_dotenv
 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
-from langgraph.graph import StateGraph, END
+from llm_clients import get_chat_model
+from model_router import policy_for, route, expected_latency
+import deadline
+from prompt_budget import to_prompt_json
 
 # ======== LOAD ENV ========
 load_dotenv()
 
-# ======== MODEL ========
-model = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.3)
-model_final = ChatGoogleGenerativeAI(model="gemini-2.5-pro", temperature=0.3)
+# ======== MODEL (built on first use; model per model_router.POLICIES) ========
+MODEL_NAME = policy_for("skillpath").model
+TEMPERATURE = 0.3
+
+def get_model():
+    return get_chat_model(MODEL_NAME, temperature=TEMPERATURE)
+
+def get_model_final(input_chars: int = 0):
+    # Pro by policy; flash under fast mode, for oversized prompts or when the deadline is near
+    return get_chat_model(final_model_name(input_chars), temperature=0.3)
+
+def final_model_name(input_chars: int = 0) -> str:
+    return route("skillpath.explanation_node", input_chars)
 # ======== STATE SCHEMA ========
 class SkillPathwayState(TypedDict, total=False):
     user_document: str
@@ -25,6 +41,9 @@ class SkillPathwayState(TypedDict, total=False):
     skill_gaps: Dict[str, List[str]]
     skill_pathway: Dict[str, List[Dict[str, str]]]
     final_explanation: str
+    partial: List[str]  # optional stages skipped to meet the deadline
+    # One {"node", "start", "end"} record per node; parallel branches append concurrently
+    node_timings: Annotated[List[Dict], operator.add]
 
 
 # ======== HELPER FUNCTION ========
@@ -51,8 +70,15 @@ def parse_json_response(response_text: str):
         return {"error": "Invalid JSON returned by model", "raw": response_text}
 
 
+@lru_cache(maxsize=None)
+def chat_prompt(messages: tuple):
+    """Build (once) the ChatPromptTemplate for a tuple of (role, template) messages."""
+    from langchain_core.prompts import ChatPromptTemplate
+    return ChatPromptTemplate.from_messages(list(messages))
+
+
 # ======== NODE 1: USER PROFILE EXTRACTOR ========
-user_profile_prompt = ChatPromptTemplate.from_messages([
+user_profile_prompt = (
     ("system",
      "You are an intelligent profile analyzer. Extract structured information from a user's background document."),
     ("human",
@@ -67,16 +93,16 @@ Extract this information in JSON format:
   "experience_level": "",
   "interests": []
 }}""")
-])
+)
 
 def user_profile_node(state: SkillPathwayState):
-    prompt = user_profile_prompt.format_messages(user_document=state["user_document"])
-    response = model.invoke(prompt)
+    prompt = chat_prompt(user_profile_prompt).format_messages(user_document=state["user_document"])
+    response = get_model().invoke(prompt)
     return {"user_profile": parse_json_response(response.content)}
 
 
 # ======== NODE 2: CAREER ANALYZER ========
-career_analyzer_prompt = ChatPromptTemplate.from_messages([
+career_analyzer_prompt = (
     ("system",
      "You are a career intelligence assistant. Analyze a given career and list essential technical and soft skills required in 2025."),
     ("human",
@@ -88,16 +114,105 @@ Return in JSON:
   "required_technical_skills": [],
   "required_soft_skills": []
 }}""")
-])
+)
+
+# Warmed by `python skillpath.py --prefetch` when fewer careers have been requested so far
+POPULAR_CAREERS = [
+    "Software Engineer", "Data Scientist", "Data Analyst", "Machine Learning Engineer",
+    "Frontend Developer", "Backend Developer", "Full Stack Developer", "DevOps Engineer",
+    "Cloud Engineer", "Cybersecurity Analyst", "Product Manager", "UX Designer",
+    "Mobile App Developer", "Data Engineer", "AI Engineer", "Business Analyst",
+    "QA Engineer", "Site Reliability Engineer", "Network Engineer", "Project Manager",
+]
+
+
+def career_requirements_version() -> str:
+    """Identifies the prompt/model cached requirements were generated with."""
+    raw = f"{MODEL_NAME}\x00{TEMPERATURE}\x00{json.dumps(career_analyzer_prompt)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def generate_career_requirements(target_career: str) -> dict:
+    """One LLM call; stores the result in the career cache when it parsed cleanly."""
+    import career_cache
+
+    prompt = chat_prompt(career_analyzer_prompt).format_messages(target_career=target_career)
+    response = get_model().invoke(prompt)
+    requirements = parse_json_response(response.content)
+    cache = career_cache.get_cache()
+    if cache is not None and "error" not in requirements and (
+        requirements.get("required_technical_skills") or requirements.get("required_soft_skills")
+    ):
+        cache.put(target_career, career_requirements_version(), requirements)
+    return requirements
+
 
 def career_analyzer_node(state: SkillPathwayState):
-    prompt = career_analyzer_prompt.format_messages(target_career=state["target_career"])
-    response = model.invoke(prompt)
-    return {"career_requirements": parse_json_response(response.content)}
+    """Career requirements don't depend on the user, so they're served from career_cache.py when known."""
+    import career_cache
+
+    target = state["target_career"]
+    cache = career_cache.get_cache()
+    if cache is not None:
+        cache.record_request(target)
+        cached = cache.get(target, career_requirements_version())
+        if cached is not None:
+            return {"career_requirements": {**cached, "career": target}}
+    return {"career_requirements": generate_career_requirements(target)}
+
+
+def prefetch_career_requirements(careers: Optional[List[str]] = None, top: int = 20,
+                                 force: bool = False, workers: int = 4) -> dict:
+    """
+    Warm the career cache: the given careers, or the `top` most-requested ones
+    (topped up from POPULAR_CAREERS). Entries past half their TTL are refreshed
+    so popular careers don't expire between prefetch runs.
+    """
+    import career_cache
+
+    cache = career_cache.get_cache()
+    if cache is None:
+        return {"error": "Career cache is disabled (CAREER_CACHE_DISABLED=1)"}
+    explicit = bool(careers)
+    if not explicit:
+        careers = [career for career, _ in cache.most_requested(top)] + POPULAR_CAREERS
+    unique = {}
+    for career in careers:
+        key = career_cache.normalize_career(career)
+        if key and key not in unique and (explicit or len(unique) < top):
+            unique[key] = career.strip()
+    careers = list(unique.values())
+
+    version = career_requirements_version()
+    todo = []
+    for career in careers:
+        age = cache.age(career, version)
+        if force or age is None or (cache.ttl_seconds and age > cache.ttl_seconds / 2):
+            todo.append(career)
+
+    def fetch_one(career):
+        try:
+            requirements = generate_career_requirements(career)
+            return career, requirements.get("error")
+        except Exception as e:
+            return career, str(e)
+
+    failed = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for career, error in pool.map(fetch_one, todo):
+            if error:
+                failed[career] = error
+    return {
+        "careers": careers,
+        "generated": len(todo) - len(failed),
+        "already_cached": len(careers) - len(todo),
+        "failed": failed,
+        "cache": cache.stats(),
+    }
 
 
 # ======== NODE 3: GAP ANALYZER ========
-gap_analyzer_prompt = ChatPromptTemplate.from_messages([
+gap_analyzer_prompt = (
     ("system",
      "You are a skill gap analyst. Compare a user's current skills with the required skills for the target career."),
     ("human",
@@ -112,19 +227,52 @@ Return JSON:
   "missing_technical_skills": [],
   "missing_soft_skills": []
 }}""")
-])
+)
 
 def gap_analyzer_node(state: SkillPathwayState):
-    prompt = gap_analyzer_prompt.format_messages(
-        user_profile=json.dumps(state["user_profile"], indent=2),
-        career_requirements=json.dumps(state["career_requirements"], indent=2)
-    )
-    response = model.invoke(prompt)
-    return {"skill_gaps": parse_json_response(response.content)}
+    """
+    Deterministic gap analysis over canonical skill ids (skill_taxonomy.py).
+    Only required skills the taxonomy can't place are sent to the LLM.
+    """
+    import skill_taxonomy
+
+    profile = state.get("user_profile") or {}
+    requirements = state.get("career_requirements") or {}
+    user_skills = list(profile.get("technical_skills") or []) + list(profile.get("soft_skills") or [])
+    user_ids, user_unmatched = skill_taxonomy.canonicalize(user_skills)
+    user_ids = skill_taxonomy.expand(user_ids)
+    user_unmatched_norm = {skill_taxonomy.normalize(s) for s in user_unmatched}
+
+    gaps = {"missing_technical_skills": [], "missing_soft_skills": []}
+    leftovers = {"required_technical_skills": [], "required_soft_skills": []}
+    for required_key, missing_key in (("required_technical_skills", "missing_technical_skills"),
+                                      ("required_soft_skills", "missing_soft_skills")):
+        for skill in requirements.get(required_key) or []:
+            if not isinstance(skill, str):
+                continue
+            ids = skill_taxonomy.match_all(skill)
+            if ids:
+                if not set(ids) <= user_ids:
+                    gaps[missing_key].append(skill)
+            elif skill_taxonomy.normalize(skill) not in user_unmatched_norm:
+                leftovers[required_key].append(skill)
+
+    if any(leftovers.values()):
+        prompt = chat_prompt(gap_analyzer_prompt).format_messages(
+            user_profile=to_prompt_json(profile),
+            career_requirements=to_prompt_json(leftovers)
+        )
+        response = get_model().invoke(prompt)
+        llm_gaps = parse_json_response(response.content)
+        for key in gaps:
+            for skill in llm_gaps.get(key) or []:
+                if isinstance(skill, str) and skill not in gaps[key]:
+                    gaps[key].append(skill)
+    return {"skill_gaps": gaps}
 
 
 # ======== NODE 4: PATHWAY BUILDER ========
-pathway_builder_prompt = ChatPromptTemplate.from_messages([
+pathway_builder_prompt = (
     ("system",
      "You are a professional skill development advisor. Create a progressive skill pathway to reach the target career."),
     ("human",
@@ -145,19 +293,19 @@ Output JSON:
     {{"stage": "Growth", "skills": [], "reasoning": ""}}
   ]
 }}""")
-])
+)
 
 def pathway_builder_node(state: SkillPathwayState):
-    prompt = pathway_builder_prompt.format_messages(
+    prompt = chat_prompt(pathway_builder_prompt).format_messages(
         target_career=state["target_career"],
-        skill_gaps=json.dumps(state["skill_gaps"], indent=2)
+        skill_gaps=to_prompt_json(state["skill_gaps"], max_items=25)
     )
-    response = model.invoke(prompt)
+    response = get_model().invoke(prompt)
     return {"skill_pathway": parse_json_response(response.content)}
 
 
 # ======== NODE 5: EXPLANATION NODE ========
-explanation_prompt = ChatPromptTemplate.from_messages([
+explanation_prompt = (
     ("system",
      "You are a career mentor AI. Write a clear and motivating explanation of the recommended skill pathway."),
     ("human",
@@ -168,67 +316,219 @@ Skill Pathway:
 {skill_pathway}
 
 Generate a detailed explanation in human-readable paragraphs.""")
-])
+)
 
 def explanation_node(state: SkillPathwayState):
-    prompt = explanation_prompt.format_messages(
-        user_profile=json.dumps(state["user_profile"], indent=2),
-        skill_pathway=json.dumps(state["skill_pathway"], indent=2)
+    import token_usage
+    prompt = chat_prompt(explanation_prompt).format_messages(
+        user_profile=to_prompt_json(state["user_profile"]),
+        skill_pathway=to_prompt_json(state["skill_pathway"])
     )
-    response = model_final.invoke(prompt)
+    # The explanation is optional: without time for even the fallback model, return the pathway without it
+    model = final_model_name(token_usage.prompt_chars([prompt]))
+    if not deadline.allows(expected_latency(model)):
+        return {"final_explanation": "", "partial": ["final_explanation"]}
+    try:
+        response = get_chat_model(model, temperature=0.3).invoke(prompt)
+    except Exception:
+        if deadline.expired():
+            return {"final_explanation": "", "partial": ["final_explanation"]}
+        raise
     return {"final_explanation": response.content}
 
 
-# ======== BUILD LANGGRAPH ========
-graph = StateGraph(SkillPathwayState)
-graph.add_node("user_profile_extractor", user_profile_node)
-graph.add_node("career_analyzer", career_analyzer_node)
-graph.add_node("gap_analyzer", gap_analyzer_node)
-graph.add_node("pathway_builder", pathway_builder_node)
-graph.add_node("explanation_node", explanation_node)
-
-graph.add_edge("user_profile_extractor", "career_analyzer")
-graph.add_edge("career_analyzer", "gap_analyzer")
-graph.add_edge("gap_analyzer", "pathway_builder")
-graph.add_edge("pathway_builder", "explanation_node")
+# ======== NODE TIMINGS ========
+def timed(name: str, node):
+    """Wrap a node so it appends its start/end (perf_counter seconds) to node_timings."""
+    def run(state: SkillPathwayState):
+        start = time.perf_counter()
+        update = node(state)
+        return {**update, "node_timings": [{"node": name, "start": start, "end": time.perf_counter()}]}
+    return run
+
+
+def timing_report(node_timings: List[Dict], wall_seconds: Optional[float] = None) -> dict:
+    """
+    Per-node offsets plus the overlap between branches: node_seconds_total is the
+    sequential cost, busy_seconds the time at least one node was running, and
+    overlap_seconds the difference (time saved by running branches concurrently).
+    """
+    if not node_timings:
+        return {"nodes": []}
+    origin = min(t["start"] for t in node_timings)
+    intervals = sorted((t["start"], t["end"]) for t in node_timings)
+    busy, current_start, current_end = 0.0, intervals[0][0], intervals[0][1]
+    for start, end in intervals[1:]:
+        if start > current_end:
+            busy += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    busy += current_end - current_start
+    total = sum(t["end"] - t["start"] for t in node_timings)
+    report = {
+        "nodes": [
+            {
+                "node": t["node"],
+                "start_ms": round((t["start"] - origin) * 1000, 1),
+                "end_ms": round((t["end"] - origin) * 1000, 1),
+                "duration_ms": round((t["end"] - t["start"]) * 1000, 1),
+            }
+            for t in sorted(node_timings, key=lambda t: t["start"])
+        ],
+        "node_seconds_total": round(total, 3),
+        "busy_seconds": round(busy, 3),
+        "overlap_seconds": round(total - busy, 3),
+    }
+    if wall_seconds is not None:
+        report["wall_seconds"] = round(wall_seconds, 3)
+    return report
 
-graph.set_entry_point("user_profile_extractor")
-graph.set_finish_point("explanation_node")
 
-skill_pathway_agent = graph.compile()
+# ======== BUILD LANGGRAPH ========
+_skill_pathway_agent = None
+
+def get_workflow():
+    """Compile the skill pathway graph on first use and reuse it afterwards."""
+    global _skill_pathway_agent
+    if _skill_pathway_agent is None:
+        from langgraph.graph import StateGraph, START, END
+        from instrumentation import instrument
+
+        graph = StateGraph(SkillPathwayState)
+        graph.add_node("user_profile_extractor", timed("user_profile_extractor", user_profile_node))
+        graph.add_node("career_analyzer", timed("career_analyzer", career_analyzer_node))
+        graph.add_node("gap_analyzer", timed("gap_analyzer", gap_analyzer_node))
+        graph.add_node("pathway_builder", timed("pathway_builder", pathway_builder_node))
+        graph.add_node("explanation_node", timed("explanation_node", explanation_node))
+
+        # The profile extractor and the career analyzer are independent: run both
+        # branches in the same superstep and join before the gap analysis.
+        graph.add_edge(START, "user_profile_extractor")
+        graph.add_edge(START, "career_analyzer")
+        graph.add_edge(["user_profile_extractor", "career_analyzer"], "gap_analyzer")
+        graph.add_edge("gap_analyzer", "pathway_builder")
+        graph.add_edge("pathway_builder", "explanation_node")
+        graph.add_edge("explanation_node", END)
+
+        _skill_pathway_agent = instrument(graph.compile(), "skillpath")
+    return _skill_pathway_agent
+
+
+def __getattr__(name):
+    # Keep `skill_pathway_agent`, `model` and `model_final` importable without import-time setup
+    if name == "skill_pathway_agent":
+        return get_workflow()
+    if name == "model":
+        return get_model()
+    if name == "model_final":
+        return get_model_final()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def run_skill_pathway(target_career: str, user_document: str, timings: bool = False,
+                      budget: Optional[float] = None, fast: bool = False) -> dict:
+    """
+    Run the skill pathway agent and return the JSON-ready output (plus timing/token reports if asked).
+    budget (seconds) lets the explanation step fall back to flash when pro would not finish in time,
+    and skips it (listed in "partial") when neither would; fast routes it to flash unconditionally
+    (see model_router.py).
+    """
+    import contextlib
+    import token_usage
+    import model_router
+
+    inputs = {"user_document": user_document.strip(), "target_career": target_career}
+    started = time.perf_counter()
+    speed = model_router.fast() if fast else contextlib.nullcontext()
+    try:
+        with token_usage.track() as calls, deadline.within(budget), speed:
+            result = get_workflow().invoke(inputs)
+    except Exception as e:
+        return {"error": f"Failed to generate skill pathway: {e}"}
+    output = {
+        "user_profile": result.get("user_profile"),
+        "career_requirements": result.get("career_requirements"),
+        "skill_gaps": result.get("skill_gaps"),
+        "skill_pathway": result.get("skill_pathway"),
+        "final_explanation": result.get("final_explanation"),
+    }
+    if result.get("partial"):
+        output["partial"] = result["partial"]
+    if timings:
+        output["timings"] = timing_report(result.get("node_timings") or [], time.perf_counter() - started)
+        output["tokens"] = token_usage.summarize(calls)
+    return output
+
+
+def stream_skill_pathway(target_career: str, user_document: str):
+    """
+    Yield one event per completed node (user_profile, career_requirements, ...) as the graph runs.
+    Nodes see the caller's context: run it inside deadline.within() / model_router.fast() to set those.
+    """
+    from graph_stream import stream_node_updates
+    inputs = {"user_document": user_document.strip(), "target_career": target_career}
+    for event in stream_node_updates(get_workflow(), inputs):
+        # Events carry their own elapsed_ms; raw perf_counter stamps mean nothing to a client
+        if event.get("event") == "node":
+            event["output"].pop("node_timings", None)
+        yield event
 
 
 def main():
     # CLI usage:
-    #   python skillpath.py <target_career> <user_doc_path>
-    # Outputs JSON with user_profile, career_requirements, skill_gaps, skill_pathway, final_explanation
-    if len(sys.argv) >= 3:
-        target = sys.argv[1]
-        user_doc_path = sys.argv[2]
+    #   python skillpath.py <target_career> <user_doc_path> [--stream] [--timings]
+    # Outputs JSON with user_profile, career_requirements, skill_gaps, skill_pathway, final_explanation.
+    # With --stream, prints one JSON line per completed node instead (see graph_stream.py).
+    # With --timings, adds a "timings" report (per-node offsets, branch overlap) and per-node "tokens".
+    # --budget SECONDS and --fast choose the explanation model (see model_router.py).
+    #
+    #   python skillpath.py --prefetch [--top N] [--force] [--workers N] [career ...]
+    # Warms the career requirements cache (see career_cache.py) and prints a JSON report.
+    if len(sys.argv) >= 2 and sys.argv[1] == "--prefetch":
+        import argparse
+        import contextlib
+        parser = argparse.ArgumentParser(prog="skillpath.py --prefetch")
+        parser.add_argument("careers", nargs="*", help="Careers to warm (default: most requested)")
+        parser.add_argument("--top", type=int, default=20, help="How many careers to warm (default: 20)")
+        parser.add_argument("--force", action="store_true", help="Regenerate entries that are still fresh")
+        parser.add_argument("--workers", type=int, default=4)
+        opts = parser.parse_args(sys.argv[2:])
+        with contextlib.redirect_stdout(sys.stderr):
+            report = prefetch_career_requirements(opts.careers, top=opts.top, force=opts.force, workers=opts.workers)
+        print(json.dumps(report, ensure_ascii=False))
+        sys.exit(0)
+
+    stream = "--stream" in sys.argv
+    timings = "--timings" in sys.argv
+    fast = "--fast" in sys.argv
+    argv = [a for a in sys.argv[1:] if a not in ("--stream", "--timings", "--fast")]
+    budget = deadline.budget_from_argv(argv)
+    if len(argv) >= 2:
+        target = argv[0]
+        user_doc_path = argv[1]
         try:
             user_doc = load_user_document(user_doc_path)
         except Exception as e:
             print(json.dumps({"error": f"Failed to load user document: {e}"}))
             sys.exit(0)
-        inputs = {"user_document": user_doc, "target_career": target}
-        try:
-            result = skill_pathway_agent.invoke(inputs)
-            print(json.dumps({
-                "user_profile": result.get("user_profile"),
-                "career_requirements": result.get("career_requirements"),
-                "skill_gaps": result.get("skill_gaps"),
-                "skill_pathway": result.get("skill_pathway"),
-                "final_explanation": result.get("final_explanation"),
-            }, ensure_ascii=False))
-        except Exception as e:
-            print(json.dumps({"error": f"Failed to generate skill pathway: {e}"}, ensure_ascii=False))
+        if stream:
+            import contextlib
+            import model_router
+            from graph_stream import emit_jsonl
+            speed = model_router.fast() if fast else contextlib.nullcontext()
+            with deadline.within(budget), speed:
+                emit_jsonl(stream_skill_pathway(target, user_doc))
+        else:
+            print(json.dumps(run_skill_pathway(target, user_doc, timings=timings, budget=budget, fast=fast),
+                             ensure_ascii=False))
         sys.exit(0)
 
     # Fallback demo run for manual execution
     try:
         user_doc = load_user_document("user.txt")
         target = "Machine Learning Engineer"
-        result = skill_pathway_agent.invoke({"user_document": user_doc, "target_career": target})
+        result = get_workflow().invoke({"user_document": user_doc, "target_career": target})
         print(json.dumps(result, ensure_ascii=False))
     except Exception as e:
         print(json.dumps({"error": str(e)}))
@@ -0,0 +1,109 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from certificate_cache import CertificateCache
+from image_loader import hamming_distance
+
+
+def _font(size):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1 has a single bitmap font
+        return ImageFont.load_default()
+
+
+def make_certificate(title, recipient="Alex Bench"):
+    """Same template every time: only the course title and recipient vary."""
+    image = Image.new("RGB", (1600, 1130), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([30, 30, 1570, 1100], outline=(20, 60, 120), width=12)
+    draw.text((800, 200), "CERTIFICATE OF COMPLETION", fill=(20, 60, 120), font=_font(64), anchor="mm")
+    draw.text((800, 380), "This certifies that", fill="black", font=_font(36), anchor="mm")
+    draw.text((800, 480), recipient, fill="black", font=_font(72), anchor="mm")
+    draw.text((800, 600), "has successfully completed", fill="black", font=_font(36), anchor="mm")
+    draw.text((800, 700), title, fill=(20, 60, 120), font=_font(56), anchor="mm")
+    draw.text((800, 950), "Academy of Testing - 2025", fill="gray", font=_font(30), anchor="mm")
+    return _encode(image, "PNG")
+
+
+def _encode(image, fmt, **kwargs):
+    buffer = BytesIO()
+    image.save(buffer, format=fmt, **kwargs)
+    return buffer.getvalue()
+
+
+def reencode(data, scale=1.0, quality=70):
+    image = Image.open(BytesIO(data)).convert("RGB")
+    if scale != 1.0:
+        image = image.resize((int(image.width * scale), int(image.height * scale)), Image.LANCZOS)
+    return _encode(image, "JPEG", quality=quality)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CertificateCache(path=str(tmp_path / "certificates.sqlite3"))
+
+
+def remember(cache, data, name):
+    image_hash, thumbnail = cache.fingerprint(data)
+    cache.store_name(image_hash, name, thumbnail)
+
+
+def lookup(cache, data):
+    return cache.lookup_name(*cache.fingerprint(data))
+
+
+def test_same_template_different_title_is_not_reused(cache):
+    analytics = make_certificate("Data Analytics Professional Certificate")
+    engineering = make_certificate("Data Engineering Professional Certificate")
+    remember(cache, analytics, "Data Analytics Professional Certificate")
+
+    assert lookup(cache, engineering) is None
+
+
+def test_title_differing_in_one_character_is_not_reused(cache):
+    level_two = make_certificate("Machine Learning Level II")
+    level_one = make_certificate("Machine Learning Level I")
+    # The hashes alone can't tell these apart
+    assert hamming_distance(cache.fingerprint(level_two)[0], cache.fingerprint(level_one)[0]) <= cache.max_distance
+    remember(cache, level_two, "Machine Learning Level II")
+
+    assert lookup(cache, level_one) is None
+    assert cache.counters["name_rejected"] == 1
+
+
+def test_same_certificate_for_another_recipient_is_reused(cache):
+    remember(cache, make_certificate("Cloud Practitioner"), "Cloud Practitioner")
+
+    for recipient in ("Sam Other", "Maximilian Featherstonehaugh", "Li Wu"):
+        assert lookup(cache, make_certificate("Cloud Practitioner", recipient=recipient)) == "Cloud Practitioner"
+
+
+def test_recipient_is_compared_when_the_band_is_disabled(tmp_path):
+    cache = CertificateCache(path=str(tmp_path / "certificates.sqlite3"), recipient_band=None)
+    remember(cache, make_certificate("Cloud Practitioner"), "Cloud Practitioner")
+
+    assert lookup(cache, make_certificate("Cloud Practitioner", recipient="Sam Other")) is None
+
+
+@pytest.mark.parametrize("scale,quality", [(1.0, 70), (0.6, 40), (0.35, 85)])
+def test_reencoded_copy_is_reused(cache, scale, quality):
+    original = make_certificate("Data Analytics Professional Certificate")
+    remember(cache, original, "Data Analytics Professional Certificate")
+
+    assert lookup(cache, reencode(original, scale, quality)) == "Data Analytics Professional Certificate"
+
+
+def test_rows_without_thumbnail_never_match(tmp_path):
+    path = str(tmp_path / "certificates.sqlite3")
+    data = make_certificate("Data Analytics Professional Certificate")
+    old = CertificateCache(path=path)
+    old._conn.execute(
+        "INSERT INTO image_names (hash, name, created_at) VALUES (?, ?, 0)",
+        (f"{old.fingerprint(data)[0]:064x}", "Data Analytics Professional Certificate"),
+    )
+    old._conn.commit()
+
+    assert lookup(CertificateCache(path=path), data) is None
@@ -0,0 +1,46 @@
+import struct
+from io import BytesIO
+
+from PIL import Image
+
+from image_loader import load_image, load_image_bytes, sniff_format
+
+
+def heic_header(brand=b"heic"):
+    """A minimal ISO-BMFF ftyp box, as at the start of a HEIC/HEIF file."""
+    body = brand + b"\x00\x00\x00\x00" + b"mif1" + brand
+    return struct.pack(">I", 8 + len(body)) + b"ftyp" + body + b"\x00" * 64
+
+
+def test_heic_passes_through_unchanged(tmp_path):
+    data = heic_header()
+    path = tmp_path / "certificate.heic"
+    path.write_bytes(data)
+
+    loaded = load_image(str(path))
+
+    assert sniff_format(data) == "heic"
+    assert loaded.data == data
+    assert loaded.mime_type == "image/heic"
+    assert not loaded.reencoded
+
+
+def test_heif_passes_through_unchanged():
+    data = heic_header(b"mif1")
+
+    loaded = load_image_bytes(data)
+
+    assert loaded.data == data
+    assert loaded.mime_type == "image/heif"
+
+
+def test_small_png_passes_through_and_large_one_is_downscaled():
+    buffer = BytesIO()
+    Image.new("RGB", (300, 200), "white").save(buffer, format="PNG")
+    data = buffer.getvalue()
+
+    small = load_image_bytes(data)
+    large = load_image_bytes(data, max_side=150)
+
+    assert small.data == data and not small.reencoded
+    assert large.reencoded and (large.width, large.height) == (150, 100)
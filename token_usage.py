@@ -0,0 +1,146 @@
+"""
+Per-call token accounting for every chat model created by llm_clients.py.
+A LangChain callback attached to each shared client records, for every call,
+the graph node it ran in (LangGraph's `langgraph_node` metadata), the model,
+input/output tokens and latency. Counts come from the provider's usage metadata
+and fall back to a chars/4 estimate (flagged "estimated") when there is none.
+Calls answered by llm_cache.py are flagged "cached" and kept out of the totals.
+Uncached latencies also feed model_router's per-model latency estimates.
+
+    with token_usage.track() as calls:   # records made in this context (request)
+        run_skill_pathway(...)
+    token_usage.stats()                  # process-wide totals per node
+
+Configuration (environment):
+    TOKEN_USAGE_RECENT  How many recent call records stats() keeps (default: 200)
+"""
+
+import os
+import time
+import threading
+import contextlib
+import contextvars
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+import model_router
+
+_lock = threading.Lock()
+_totals: Dict[str, Dict[str, int]] = {}
+_recent = deque(maxlen=int(os.getenv("TOKEN_USAGE_RECENT", "200")))
+_collector: contextvars.ContextVar = contextvars.ContextVar("token_usage_collector", default=None)
+
+
+def _text_chars(content: Any) -> int:
+    """Characters of text in a message content (image parts don't count toward the estimate)."""
+    if isinstance(content, str):
+        return len(content)
+    if isinstance(content, list):
+        return sum(len(part.get("text", "")) if isinstance(part, dict) else len(str(part)) for part in content)
+    return 0
+
+
+def prompt_chars(messages) -> int:
+    """Text characters across the message batches passed to on_chat_model_start."""
+    return sum(_text_chars(m.content) for batch in messages for m in batch)
+
+
+def response_usage(response, input_chars: int) -> dict:
+    """{"input_tokens", "output_tokens", "cached"[, "estimated"]} for one LLMResult."""
+    usage, output_chars = {}, 0
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            usage = getattr(message, "usage_metadata", None) or usage
+            output_chars += len(generation.text or "")
+    # langchain_core adds total_cost=0 to usage replayed from a cache hit
+    result = {"cached": "total_cost" in usage}
+    if usage.get("input_tokens") is not None:
+        result["input_tokens"] = usage.get("input_tokens", 0)
+        result["output_tokens"] = usage.get("output_tokens", 0)
+    else:
+        result["input_tokens"] = input_chars // 4
+        result["output_tokens"] = output_chars // 4
+        result["estimated"] = True
+    return result
+
+
+class TokenUsageHandler(BaseCallbackHandler):
+    """Records one usage entry per chat model call."""
+
+    def __init__(self, model: str):
+        self.model = model
+        self._pending: Dict[Any, dict] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self._pending[run_id] = {
+            "node": (metadata or {}).get("langgraph_node"),
+            "started": time.perf_counter(),
+            "input_chars": prompt_chars(messages),
+            "collector": _collector.get(),
+        }
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        pending = self._pending.pop(run_id, None)
+        if pending is None:
+            return
+        record = {
+            "node": pending["node"],
+            "model": self.model,
+            "latency_ms": round((time.perf_counter() - pending["started"]) * 1000, 1),
+            **response_usage(response, pending["input_chars"]),
+        }
+        if not record["cached"]:
+            model_router.observe(self.model, record["latency_ms"] / 1000)
+        _record(record, pending["collector"])
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._pending.pop(run_id, None)
+
+
+def _record(record: dict, collector: Optional[list]) -> None:
+    with _lock:
+        _recent.append(record)
+        if not record["cached"]:
+            totals = _totals.setdefault(record["node"] or "-", {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+            totals["calls"] += 1
+            totals["input_tokens"] += record["input_tokens"]
+            totals["output_tokens"] += record["output_tokens"]
+    if collector is not None:
+        collector.append(record)
+
+
+@contextlib.contextmanager
+def track():
+    """Collect the usage records of LLM calls made in this context (threads spawned by LangGraph included)."""
+    calls: List[dict] = []
+    token = _collector.set(calls)
+    try:
+        yield calls
+    finally:
+        _collector.reset(token)
+
+
+def summarize(calls: List[dict]) -> dict:
+    """Per-node totals for a list of records from track()."""
+    nodes: Dict[str, Dict[str, int]] = {}
+    for call in calls:
+        entry = nodes.setdefault(call["node"] or "-", {"calls": 0, "cached": 0, "input_tokens": 0, "output_tokens": 0})
+        entry["calls"] += 1
+        if call["cached"]:
+            entry["cached"] += 1
+            continue
+        entry["input_tokens"] += call["input_tokens"]
+        entry["output_tokens"] += call["output_tokens"]
+    return {
+        "nodes": nodes,
+        "input_tokens": sum(n["input_tokens"] for n in nodes.values()),
+        "output_tokens": sum(n["output_tokens"] for n in nodes.values()),
+    }
+
+
+def stats() -> dict:
+    with _lock:
+        return {"nodes": {k: dict(v) for k, v in _totals.items()}, "recent": list(_recent)}
@@ -3,15 +3,13 @@
 import os
 import sys
 import json
-import base64
-from io import BytesIO
-from typing import TypedDict
+from typing import Optional, TypedDict
 from dotenv import load_dotenv
-from PIL import Image
 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import HumanMessage
-from langgraph.graph import StateGraph
+from llm_clients import get_chat_model
+from model_router import route
+from image_loader import image_to_data_uri
+import deadline
 
 load_dotenv()
 
@@ -21,27 +19,23 @@ class TranscriptState(TypedDict, total=False):
     extracted_data: str
     analysis: str
 
-# Initialize Gemini model (multimodal)
-gemini_model = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",   # adjust model name as per your access
-    temperature=0.2,
-    api_key=os.environ.get("GOOGLE_API_KEY")
-)
-
-def image_to_base64_str(image: Image.Image, fmt: str = "PNG") -> str:
-    """Convert a PIL Image into a base64-encoded data URI string."""
-    buffered = BytesIO()
-    image.save(buffered, format=fmt)
-    b64 = base64.b64encode(buffered.getvalue()).decode("utf-8")
-    return f"data:image/{fmt.lower()};base64,{b64}"
+# Gemini model (multimodal), built on first use so importing stays cheap
+def get_model():
+    return get_chat_model(
+        route("transcript"),   # model per model_router.POLICIES
+        temperature=0.2,
+        api_key=os.environ.get("GOOGLE_API_KEY")
+    )
 
 def extract_transcript_info(state: TranscriptState) -> TranscriptState:
     img_path = state.get("image_path")
     if not img_path:
         raise ValueError("image_path must be provided in state")
 
-    image = Image.open(img_path)
-    data_uri = image_to_base64_str(image)
+    from langchain_core.messages import HumanMessage
+
+    # Original bytes when already accepted and in budget; re-encoded only to downscale/convert
+    data_uri = image_to_data_uri(img_path)
 
     prompt = """
 You are an expert academic data extractor.
@@ -71,7 +65,7 @@ Return only valid JSON.
         ]
     )
 
-    response = gemini_model.invoke([message])
+    response = get_model().invoke([message])
     text = response.content
     if isinstance(text, list):
         text = " ".join([part["text"] for part in text if isinstance(part, dict) and "text" in part])
@@ -84,6 +78,8 @@ def analyze_transcript(state: TranscriptState) -> TranscriptState:
     if not extracted:
         raise ValueError("extracted_data must be present in state")
 
+    from langchain_core.messages import HumanMessage
+
     analysis_prompt = f"""
 You are an education analyst.
 Given this extracted data (JSON):
@@ -98,7 +94,7 @@ Generate an analytical report including:
 """
 
     message = HumanMessage(content=[{"type": "text", "text": analysis_prompt}])
-    response = gemini_model.invoke([message])
+    response = get_model().invoke([message])
     text = response.content
     if isinstance(text, list):
         text = " ".join([part["text"] for part in text if isinstance(part, dict) and "text" in part])
@@ -106,22 +102,43 @@ Generate an analytical report including:
     state["analysis"] = text
     return state
 
-# Build LangGraph workflow
-graph = StateGraph(TranscriptState)
-graph.add_node("extract", extract_transcript_info)
-graph.add_node("analyze", analyze_transcript)
-graph.add_edge("extract", "analyze")
-graph.set_entry_point("extract")
-graph.set_finish_point("analyze")
-
-workflow = graph.compile()
-
-if __name__ == "__main__":
-    # Allow passing image path via CLI, fallback to default
-    img_path = sys.argv[1] if len(sys.argv) > 1 else "transcript.png"
-    result = workflow.invoke({"image_path": img_path})
-    output = {
+# Build LangGraph workflow (compiled on first use)
+_workflow = None
+
+def get_workflow():
+    global _workflow
+    if _workflow is None:
+        from langgraph.graph import StateGraph
+        from instrumentation import instrument
+
+        graph = StateGraph(TranscriptState)
+        graph.add_node("extract", extract_transcript_info)
+        graph.add_node("analyze", analyze_transcript)
+        graph.add_edge("extract", "analyze")
+        graph.set_entry_point("extract")
+        graph.set_finish_point("analyze")
+        _workflow = instrument(graph.compile(), "transcript")
+    return _workflow
+
+def __getattr__(name):
+    # Keep `transcript.workflow` / `transcript.gemini_model` working without import-time setup
+    if name == "workflow":
+        return get_workflow()
+    if name == "gemini_model":
+        return get_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def run_transcript_analysis(image_path: str, budget: Optional[float] = None) -> dict:
+    """Run the transcript workflow on an image and return the JSON-ready output (budget: seconds)."""
+    with deadline.within(budget):
+        result = get_workflow().invoke({"image_path": image_path})
+    return {
         "extracted_data": result.get("extracted_data"),
         "analysis": result.get("analysis"),
     }
-    print(json.dumps(output))
\ No newline at end of file
+
+if __name__ == "__main__":
+    # Allow passing image path (plus optional --budget SECONDS) via CLI, fallback to default
+    budget = deadline.budget_from_argv(sys.argv)
+    img_path = sys.argv[1] if len(sys.argv) > 1 else "transcript.png"
+    print(json.dumps(run_transcript_analysis(img_path, budget=budget)))
\ No newline at end of file
@@ -0,0 +1,300 @@
+"""
+Resident Agent Worker
+Loads every LangGraph agent once and serves requests as JSON lines, so the
+backend no longer pays interpreter + import + graph compilation per request.
+
+Protocol (one JSON object per line):
+    request:  {"id": "1", "agent": "resume", "args": {"image_path": "uploads/a.png"}}
+    response: {"id": "1", "ok": true, "result": {...}}
+              {"id": "1", "ok": false, "error": "..."}
+
+Every request may carry "budget" (seconds) in its args, defaulting to
+AGENT_BUDGET_SECONDS: the agent runs under that deadline (deadline.py), counted
+from when the request was read, and returns what it has, or an error, when it
+runs out. Requests whose budget ran out while queued are answered with an error
+without running.
+
+Usage:
+    python -m worker                          # serve over stdin/stdout
+    python -m worker --socket /tmp/agents.sock  # serve over a local Unix socket
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import threading
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+import deadline
+
+# ============================================================
+# 1. AGENT REGISTRY
+# ============================================================
+
+# Agent modules living next to this file, loaded once at startup
+AGENT_MODULES = [
+    "resume",
+    "transcript",
+    "certificate",
+    "github",
+    "personality",
+    "jobDemand",
+    "skillpath",
+    "portfolioBuilder",
+    "CareerRole",
+    "profileAnalysis",
+]
+
+_modules: Dict[str, object] = {}
+_load_errors: Dict[str, str] = {}
+
+
+def load_agents() -> None:
+    """Import every agent module once; failures are recorded, not fatal."""
+    for name in AGENT_MODULES:
+        if name in _modules:
+            continue
+        try:
+            _modules[name] = importlib.import_module(name)
+        except Exception as e:
+            _load_errors[name] = f"{type(e).__name__}: {e}"
+            print(f"[worker] failed to load {name}: {_load_errors[name]}", file=sys.stderr)
+
+
+def warm_agents() -> None:
+    """Pay SDK imports and graph compilation up front instead of on the first request."""
+    try:
+        import llm_clients
+        llm_clients.preload()
+    except Exception as e:
+        print(f"[worker] could not preload LLM SDK: {type(e).__name__}: {e}", file=sys.stderr)
+    for name, module in _modules.items():
+        try:
+            module.get_workflow()
+        except Exception as e:
+            print(f"[worker] could not compile {name} graph: {type(e).__name__}: {e}", file=sys.stderr)
+    if "personality" in _modules:
+        _modules["personality"].load_summaries()
+
+
+def _module(name: str):
+    if name not in _modules:
+        raise RuntimeError(f"Agent module '{name}' is not available: {_load_errors.get(name, 'not loaded')}")
+    return _modules[name]
+
+
+def _ping(args: dict) -> dict:
+    return {"pong": True, "agents": sorted(AGENTS), "load_errors": dict(_load_errors)}
+
+
+def _cache_stats(args: dict) -> dict:
+    import llm_cache
+    import career_cache
+    cache = career_cache.get_cache()
+    return {"llm_cache": llm_cache.stats(), "career_cache": cache.stats() if cache else None}
+
+
+def _token_usage(args: dict) -> dict:
+    import token_usage
+    return token_usage.stats()
+
+
+def _metrics(args: dict) -> dict:
+    import instrumentation
+    return instrumentation.totals()
+
+
+def _rate_limits(args: dict) -> dict:
+    import rate_limiter
+    return rate_limiter.stats()
+
+
+def _routing(args: dict) -> dict:
+    import model_router
+    return model_router.stats()
+
+
+# Each handler takes the request "args" dict and returns the same JSON payload
+# the matching CLI script prints to stdout.
+AGENTS: Dict[str, Callable[[dict], dict]] = {
+    "ping": _ping,
+    "cache_stats": _cache_stats,
+    "token_usage": _token_usage,
+    "metrics": _metrics,
+    "rate_limits": _rate_limits,
+    "routing": _routing,
+    "resume": lambda a: _module("resume").run_resume_analysis(a["image_path"]),
+    "transcript": lambda a: _module("transcript").run_transcript_analysis(a["image_path"]),
+    "certificate": lambda a: _module("certificate").run_certificate_analysis(a["image_path"]),
+    "github": lambda a: _module("github").run_github_analysis(
+        a["github_url"], force_refresh=bool(a.get("force_refresh"))
+    ),
+    "personality": lambda a: _module("personality").run_personality_review(
+        a["riasec_code"], regenerate=bool(a.get("regenerate"))
+    ),
+    "personality_instructions": lambda a: {"instructions": _module("personality").INSTRUCTIONS},
+    "job_demand": lambda a: _module("jobDemand").get_job_analysis(
+        a["location"], force_refresh=bool(a.get("force_refresh", False))
+    ),
+    "skill_pathway": lambda a: _module("skillpath").run_skill_pathway(
+        a["target_career"], a["user_document"], fast=bool(a.get("fast"))
+    ),
+    "portfolio": lambda a: _module("portfolioBuilder").run_app_from_text(a["profile_text"]),
+    "profile": lambda a: _module("profileAnalysis").run_profile_analysis(
+        a.get("resume_path"), a.get("transcript_path"), a.get("certificate_path"), a.get("github_url")
+    ),
+    "career_role": lambda a: _module("CareerRole").run_career_roles(a["job_analysis"], a["user_profile"]),
+}
+
+# Args each agent cannot run without; checked before dispatch so a KeyError raised
+# inside an agent is reported as an agent error, not as a missing argument
+REQUIRED_ARGS: Dict[str, Tuple[str, ...]] = {
+    "resume": ("image_path",),
+    "transcript": ("image_path",),
+    "certificate": ("image_path",),
+    "github": ("github_url",),
+    "personality": ("riasec_code",),
+    "job_demand": ("location",),
+    "skill_pathway": ("target_career", "user_document"),
+    "portfolio": ("profile_text",),
+    "career_role": ("job_analysis", "user_profile"),
+}
+
+# ============================================================
+# 2. REQUEST HANDLING
+# ============================================================
+
+def handle_request(request: dict, received_at: Optional[float] = None) -> dict:
+    """
+    Dispatch one decoded request and build its response envelope.
+    The budget counts from received_at (time.monotonic() when the request was read), so time
+    spent queued for a pool thread is part of it, as it is for the client waiting on the reply.
+    """
+    req_id = request.get("id")
+    agent = request.get("agent")
+    handler = AGENTS.get(agent)
+    if handler is None:
+        return {"id": req_id, "ok": False, "error": f"Unknown agent '{agent}'"}
+    args = request.get("args") or {}
+    missing = [name for name in REQUIRED_ARGS.get(agent, ()) if name not in args]
+    if missing:
+        return {"id": req_id, "ok": False, "error": f"Missing argument(s) {', '.join(missing)} for agent '{agent}'"}
+    try:
+        budget = args.get("budget")
+        budget = deadline.default_budget() if budget is None else deadline.parse_budget(budget)
+    except ValueError as e:
+        return {"id": req_id, "ok": False, "error": f"Invalid argument: {e}"}
+    if budget is not None and received_at is not None:
+        budget -= time.monotonic() - received_at
+        if budget <= 0:
+            # The client has given up or is about to; don't spend quota on a reply it will drop
+            return {"id": req_id, "ok": False, "error": "DeadlineExceeded: deadline exceeded while queued"}
+    try:
+        with deadline.within(budget):
+            result = handler(args)
+        return {"id": req_id, "ok": True, "result": result}
+    except Exception as e:
+        return {"id": req_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+
+def serve_lines(lines, write: Callable[[str], None], executor: ThreadPoolExecutor) -> None:
+    """
+    Read requests from an iterable of lines and write responses as they finish.
+    Requests run concurrently on the executor, so responses may arrive out of order;
+    callers match them by "id".
+    """
+    lock = threading.Lock()
+
+    def respond(response: dict) -> None:
+        line = json.dumps(response, ensure_ascii=False, default=str)
+        with lock:
+            write(line + "\n")
+
+    def run(request: dict, received_at: float) -> None:
+        respond(handle_request(request, received_at))
+
+    for raw in lines:
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            request = json.loads(raw)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            respond({"id": None, "ok": False, "error": f"Invalid request: {e}"})
+            continue
+        executor.submit(run, request, time.monotonic())
+
+# ============================================================
+# 3. TRANSPORTS
+# ============================================================
+
+def serve_stdio(executor: ThreadPoolExecutor) -> None:
+    # Agents print progress to stdout; keep the real stdout for the protocol only
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+
+    def write(line: str) -> None:
+        protocol_out.write(line)
+        protocol_out.flush()
+
+    serve_lines(sys.stdin, write, executor)
+
+
+def serve_socket(path: str, executor: ThreadPoolExecutor) -> None:
+    sys.stdout = sys.stderr
+    if os.path.exists(path):
+        os.unlink(path)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            def write(line: str) -> None:
+                self.wfile.write(line.encode("utf-8"))
+                self.wfile.flush()
+
+            lines = (raw.decode("utf-8") for raw in self.rfile)
+            serve_lines(lines, write, executor)
+
+    server = socketserver.ThreadingUnixStreamServer(path, Handler)
+    print(f"[worker] listening on {path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+# ============================================================
+# 4. MAIN
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve all agents from one resident process.")
+    parser.add_argument("--socket", help="Serve on this Unix socket path instead of stdin/stdout")
+    parser.add_argument("--workers", type=int, default=4, help="Maximum concurrent requests (default: 4)")
+    args = parser.parse_args()
+
+    # Agents resolve relative paths (.env, default files) against the repo root
+    root = os.path.dirname(os.path.abspath(__file__))
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    os.chdir(root)
+    load_agents()
+    warm_agents()
+    print(f"[worker] ready ({len(_modules)}/{len(AGENT_MODULES)} agent modules loaded)", file=sys.stderr)
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        if args.socket:
+            serve_socket(args.socket, executor)
+        else:
+            serve_stdio(executor)
+
+
+if __name__ == "__main__":
+    main()